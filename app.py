@@ -16,6 +16,8 @@ from PIL import Image
 # Add the current directory to the path to import local modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from sheets_integration import SheetsIntegration
+from sheets_metrics import get_metrics, traced_action
+from records import Booking
 
 # Import logo utilities from the root directory instead of assets folder
 from logo_utils import get_logo_as_base64
@@ -47,6 +49,9 @@ if 'current_status_filter' not in st.session_state:
     st.session_state.current_status_filter = None
 if 'data_source' not in st.session_state:
     st.session_state.data_source = 'app'  # 'app' or 'sheet'
+if 'show_diagnostics' not in st.session_state:
+    # Hidden admin panel, enabled by opening the app with ?diagnostics=1
+    st.session_state.show_diagnostics = st.query_params.get("diagnostics") == "1"
 
 # Initialize Google Sheets integration
 @st.cache_resource
@@ -363,17 +368,25 @@ def display_header():
     st.markdown("<p style='text-align: center; color: #daa520; font-size: 1rem;'>Schedule, manage, and track real estate project presentations</p>", unsafe_allow_html=True)
     st.markdown("<hr>", unsafe_allow_html=True)
 
-# Generate available dates (only Saturdays and Tuesdays)
-def get_available_dates(num_weeks=4):
+# Generate available dates (only the booking days in the app settings)
+def get_available_dates(num_weeks=None):
     """
-    Generate a list of available dates (Saturdays and Tuesdays) for the next few weeks.
+    Generate a list of available dates (the configured booking days) for the next few weeks.
+    
+    Booking days and the default number of weeks come from the app settings cached
+    by the appointments integration, so they follow its Settings worksheet without
+    downloading it on every rerun.
     
     Args:
-        num_weeks: Number of weeks to generate dates for
+        num_weeks: Number of weeks to generate dates for (defaults to the weeks_ahead setting)
         
     Returns:
         list: List of date objects
     """
+    settings = sheets.get_app_settings()
+    if num_weeks is None:
+        num_weeks = settings.weeks_ahead
+    
     today = datetime.now().date()
     dates = []
     
@@ -382,8 +395,8 @@ def get_available_dates(num_weeks=4):
     
     # Generate dates for the specified number of weeks
     for _ in range(num_weeks * 7):  # 7 days per week
-        # Check if the day is Saturday (5) or Tuesday (1)
-        if current_date.weekday() == 5 or current_date.weekday() == 1:
+        # Check if the day is one of the booking days
+        if settings.is_booking_day(current_date):
             # Only include dates from today onwards
             if current_date >= today:
                 dates.append(current_date)
@@ -427,13 +440,19 @@ def is_date_available(date_obj):
     return sheets.is_slot_available(date_str, "12:00")
 
 # Display calendar view
+@traced_action
 def display_calendar_view():
     """Display the calendar view for selecting dates."""
     st.markdown("### Select a Date for Presentation")
-    st.markdown("Presentations are available on **Saturdays** and **Tuesdays** at **12:00 PM** for 30 minutes.")
+    booking_days = " and ".join(f"**{day}s**" for day in sheets.get_app_settings().booking_days)
+    st.markdown(f"Presentations are available on {booking_days} at **12:00 PM** for 30 minutes.")
     
     # Get available dates
-    available_dates = get_available_dates(num_weeks=4)
+    available_dates = get_available_dates()
+    
+    # Check all displayed dates against a single availability index
+    availability = sheets.are_slots_available(
+        [date.strftime("%Y-%m-%d") for date in available_dates], "12:00")
     
     # For mobile, display dates in a 2-column grid instead of by week
     # This ensures better display on narrow screens
@@ -444,7 +463,7 @@ def display_calendar_view():
         cols = st.columns(len(date_pair))
         for i, date in enumerate(date_pair):
             # Check if the date is available
-            is_available = is_date_available(date)
+            is_available = availability[date.strftime("%Y-%m-%d")]
             
             # Check if this is the selected date
             is_selected = st.session_state.selected_date == date
@@ -472,6 +491,7 @@ def display_calendar_view():
                     st.rerun()
 
 # Display booking form
+@traced_action
 def display_booking_form():
     """Display the booking form for the selected date."""
     if st.session_state.selected_date:
@@ -526,21 +546,17 @@ def display_appointment_card(appointment, index):
     Display an appointment card.
     
     Args:
-        appointment: Dictionary containing appointment details
+        appointment: Booking record with the appointment details
         index: Unique index for this card to avoid duplicate keys
     """
-    # Parse the date
-    try:
-        date_obj = datetime.strptime(appointment['Presentation Date'], "%Y-%m-%d").date()
-        formatted_date = format_date(date_obj)
-    except:
-        formatted_date = appointment['Presentation Date']
+    # The date is parsed once when the record is built
+    formatted_date = format_date(appointment.booking_date) if appointment.booking_date else ""
     
     # Determine the status badge class
-    status = appointment['Status']
-    if status == "Confirmed":
+    status = appointment.status
+    if appointment.status_code == "confirmed":
         badge_class = "badge badge-confirmed"
-    elif status == "Cancelled":
+    elif appointment.status_code == "cancelled":
         badge_class = "badge badge-cancelled"
     else:  # Rescheduled
         badge_class = "badge badge-rescheduled"
@@ -548,12 +564,12 @@ def display_appointment_card(appointment, index):
     # Create the card with a more mobile-friendly layout
     st.markdown(f"""
     <div class="card">
-        <div class="card-title">{appointment['Company Name']} - {appointment['Project Name']}</div>
-        <div class="card-subtitle">{appointment['Area']}</div>
+        <div class="card-title">{appointment.company_name} - {appointment.project_name}</div>
+        <div class="card-subtitle">{appointment.area_name}</div>
         <div class="card-content">
             <p><strong>Date:</strong> {formatted_date}</p>
-            <p><strong>Time:</strong> {appointment['Time']} PM</p>
-            <p><strong>Representative:</strong> {appointment['Developer Representative']}</p>
+            <p><strong>Time:</strong> {appointment.booking_time} PM</p>
+            <p><strong>Representative:</strong> {appointment.representative_name}</p>
         </div>
         <div class="card-footer">
             <span class="{badge_class}">{status}</span>
@@ -566,14 +582,14 @@ def display_appointment_card(appointment, index):
     
     with col1:
         if st.button("Edit", key=f"edit_{index}", help="Edit this appointment", type="primary", use_container_width=True):
-            st.session_state.edit_appointment_id = appointment['ID']
+            st.session_state.edit_appointment_id = appointment.booking_id
             st.session_state.view = 'edit'
             st.rerun()
     
     with col2:
         if st.button("Cancel", key=f"cancel_{index}", help="Cancel this appointment", type="secondary", use_container_width=True):
             # Cancel the appointment
-            success = sheets.cancel_appointment(appointment['ID'])
+            success = sheets.cancel_appointment(appointment.booking_id)
             
             if success:
                 # Show success message
@@ -629,6 +645,7 @@ def display_pagination_controls(total_pages):
             st.rerun()
 
 # Display data source toggle
+@traced_action
 def display_data_source_toggle():
     """Display toggle for switching between app data and sheet data."""
     st.markdown("### Data Source")
@@ -668,11 +685,13 @@ def display_data_source_toggle():
     # Add refresh button for sheet data
     if st.session_state.data_source == 'sheet':
         if st.button("🔄 Refresh Data", key="refresh_btn", help="Refresh data from Google Sheets", use_container_width=True):
+            sheets.refresh()
             st.session_state.show_success = True
             st.session_state.success_message = "Data refreshed from Google Sheets."
             st.rerun()
 
 # Display all appointments with pagination
+@traced_action
 def display_appointments_paginated():
     """Display all appointments with pagination."""
     # Display data source toggle
@@ -704,8 +723,8 @@ def display_appointments_paginated():
         )
         
         if not appointments_df.empty:
-            # Convert DataFrame to list of dictionaries
-            appointments = appointments_df.to_dict('records')
+            # Convert DataFrame to Booking records
+            appointments = Booking.from_appointments(appointments_df)
             
             # Display appointments
             for i, appointment in enumerate(appointments):
@@ -729,8 +748,8 @@ def display_appointments_paginated():
         )
         
         if not appointments_df.empty:
-            # Convert DataFrame to list of dictionaries
-            appointments = appointments_df.to_dict('records')
+            # Convert DataFrame to Booking records
+            appointments = Booking.from_appointments(appointments_df)
             
             # Display appointments
             for i, appointment in enumerate(appointments):
@@ -754,8 +773,8 @@ def display_appointments_paginated():
         )
         
         if not appointments_df.empty:
-            # Convert DataFrame to list of dictionaries
-            appointments = appointments_df.to_dict('records')
+            # Convert DataFrame to Booking records
+            appointments = Booking.from_appointments(appointments_df)
             
             # Display appointments
             for i, appointment in enumerate(appointments):
@@ -779,8 +798,8 @@ def display_appointments_paginated():
         )
         
         if not appointments_df.empty:
-            # Convert DataFrame to list of dictionaries
-            appointments = appointments_df.to_dict('records')
+            # Convert DataFrame to Booking records
+            appointments = Booking.from_appointments(appointments_df)
             
             # Display appointments
             for i, appointment in enumerate(appointments):
@@ -792,11 +811,13 @@ def display_appointments_paginated():
             st.info("No cancelled appointments found.")
 
 # Display edit form
+@traced_action
 def display_edit_form():
     """Display the form for editing an appointment."""
     if st.session_state.edit_appointment_id:
         # Get the appointment details
         appointment = sheets.get_appointment_by_id(st.session_state.edit_appointment_id)
+        appointment = Booking.from_appointment(appointment) if appointment else None
         
         if appointment:
             st.markdown(f"### Edit Appointment")
@@ -805,20 +826,19 @@ def display_edit_form():
             # Create a form
             with st.form(key="edit_form"):
                 # Company details
-                company_name = st.text_input("Company Name", value=appointment['Company Name'])
-                project_name = st.text_input("Project Name", value=appointment['Project Name'])
-                area = st.text_input("Area/Location", value=appointment['Area'])
-                representative = st.text_input("Developer Representative Name", value=appointment['Developer Representative'])
+                company_name = st.text_input("Company Name", value=appointment.company_name)
+                project_name = st.text_input("Project Name", value=appointment.project_name)
+                area = st.text_input("Area/Location", value=appointment.area_name)
+                representative = st.text_input("Developer Representative Name", value=appointment.representative_name)
                 
                 # Get available dates for the dropdown
-                available_dates = get_available_dates(num_weeks=8)
+                available_dates = get_available_dates()
                 
                 # Format dates for the dropdown
                 date_options = [format_date(date) for date in available_dates]
                 
                 # Add the current date to the options if it's not already there
-                current_date_obj = datetime.strptime(appointment['Presentation Date'], "%Y-%m-%d").date()
-                current_date_str = format_date(current_date_obj)
+                current_date_str = format_date(appointment.booking_date)
                 if current_date_str not in date_options:
                     date_options.insert(0, current_date_str)
                 
@@ -838,10 +858,10 @@ def display_edit_form():
                             selected_date_obj = datetime.strptime(selected_date_str, "%A, %d %B %Y").date()
                             date_str = selected_date_obj.strftime("%Y-%m-%d")
                         except:
-                            date_str = appointment['Presentation Date']
+                            date_str = appointment.date_str
                         
                         # Determine if this is a reschedule
-                        is_reschedule = date_str != appointment['Presentation Date']
+                        is_reschedule = date_str != appointment.date_str
                         
                         if is_reschedule:
                             # Reschedule the appointment
@@ -898,9 +918,79 @@ def display_edit_form():
             # Rerun the app to update the UI
             st.rerun()
 
+# Display Google Sheets diagnostics in the sidebar
+def display_diagnostics_sidebar(trace):
+    """
+    Display per-rerun Google Sheets traces and latency percentiles in the sidebar.
+    
+    Args:
+        trace: RerunTrace of the current rerun
+    """
+    metrics = get_metrics()
+    
+    with st.sidebar:
+        st.markdown("### 🩺 Sheets Diagnostics")
+        
+        # Calls made by the current rerun so far, per UI action
+        st.markdown("**This rerun**")
+        lines = trace.describe()
+        if lines:
+            st.code("\n".join(lines), language=None)
+        else:
+            st.caption("No Google Sheets calls.")
+        
+        # Recent reruns, newest first
+        st.markdown("**Recent reruns**")
+        recent = [
+            {
+                "Started": datetime.fromtimestamp(past.started_at).strftime("%H:%M:%S"),
+                "Calls": len(past.events),
+                "Sheets time (s)": round(sum(event['latency'] for event in past.events), 3),
+                "Rerun time (s)": round(past.duration or 0.0, 3),
+                "Actions": "; ".join(past.describe())
+            }
+            for past in metrics.traces()
+        ]
+        if recent:
+            st.dataframe(pd.DataFrame(recent), hide_index=True, use_container_width=True)
+        
+        # Latency percentiles per data-access function and per UI action
+        for group, label in (("function", "Per function"), ("action", "Per UI action")):
+            stats = metrics.get_stats(group)
+            if not stats:
+                continue
+            st.markdown(f"**{label}**")
+            st.dataframe(pd.DataFrame([
+                {
+                    "Name": name,
+                    "Calls": info['calls'],
+                    "p50 (ms)": round(info['p50'] * 1000, 1),
+                    "p95 (ms)": round(info['p95'] * 1000, 1)
+                }
+                for name, info in sorted(stats.items(), key=lambda item: -item[1]['p95'])
+            ]), hide_index=True, use_container_width=True)
+        
+        totals = metrics.get_totals()
+        st.caption(f"{totals['calls']} calls, {totals['errors']} errors, "
+                   f"{totals['bytes'] / 1024:.0f} KB, {totals['latency']:.2f}s in total")
+        
+        if st.button("Reset metrics", key="reset_metrics", use_container_width=True):
+            metrics.reset()
+            st.rerun()
+
 # Main application
 def main():
     """Main application function."""
+    # Record every Google Sheets call made during this rerun
+    with get_metrics().rerun("main") as trace:
+        render_app()
+        
+        if st.session_state.show_diagnostics:
+            display_diagnostics_sidebar(trace)
+
+# Render the application pages
+def render_app():
+    """Render the header, messages and tabs of the application."""
     # Load custom CSS
     load_css()
     
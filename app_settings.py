@@ -0,0 +1,140 @@
+"""
+وحدة إعدادات التطبيق: قيم ورقة الإعدادات فوق القيم الافتراضية في config.py
+كل إعداد معروف يحول إلى نوعه مرة واحدة عند التحميل، والقيمة غير الصالحة في الورقة
+تترك القيمة الافتراضية كما هي
+"""
+
+import re
+
+import config
+
+# أرقام أيام الأسبوع كما في date.weekday()، بالأسماء الإنجليزية والعربية
+WEEKDAYS = {
+    'Monday': 0,
+    'Tuesday': 1,
+    'Wednesday': 2,
+    'Thursday': 3,
+    'Friday': 4,
+    'Saturday': 5,
+    'Sunday': 6,
+    'الإثنين': 0,
+    'الاثنين': 0,
+    'الثلاثاء': 1,
+    'الأربعاء': 2,
+    'الخميس': 3,
+    'الجمعة': 4,
+    'السبت': 5,
+    'الأحد': 6
+}
+
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+WEEKDAY_NAMES_AR = ('الإثنين', 'الثلاثاء', 'الأربعاء', 'الخميس', 'الجمعة', 'السبت', 'الأحد')
+
+
+def parse_days(value):
+    """
+    قائمة أيام مفصولة بفواصل ("Saturday,Tuesday" أو "السبت، الثلاثاء") إلى أسماء إنجليزية
+    """
+    if isinstance(value, str):
+        value = value.replace('،', ',').split(',')
+    days = []
+    for name in value:
+        weekday = WEEKDAYS.get(str(name).strip().capitalize())
+        if weekday is None:
+            raise ValueError(f"يوم غير معروف: {name}")
+        if WEEKDAY_NAMES[weekday] not in days:
+            days.append(WEEKDAY_NAMES[weekday])
+    if not days:
+        raise ValueError("لا توجد أيام حجز")
+    return tuple(days)
+
+
+def parse_positive_int(value):
+    number = int(float(str(value).strip()))
+    if number <= 0:
+        raise ValueError(f"قيمة غير صالحة: {value}")
+    return number
+
+
+def parse_text(value):
+    text = str(value).strip()
+    if not text:
+        raise ValueError("قيمة فارغة")
+    return text
+
+
+def parse_time_range(value):
+    """
+    فترة وقت ("12:00-12:30" أو "12:00 - 12:30") بالصيغة المكتوبة في ورقة المواعيد "12:00 - 12:30"
+    """
+    text = parse_text(value)
+    match = re.fullmatch(r'(\d{1,2}:\d{2})\s*[-–]\s*(\d{1,2}:\d{2})', text)
+    return f"{match.group(1)} - {match.group(2)}" if match else text
+
+
+def settings_from_frame(df):
+    """
+    تحويل صفوف ورقة الإعدادات إلى قاموس {المفتاح: القيمة}
+    أعمدة key و value، أو setting_name و setting_value في الأوراق المنشأة بسكربت الإعداد
+    """
+    if len(df.columns) < 2:
+        return {}
+
+    key_column = next((name for name in ('key', 'setting_name') if name in df.columns), df.columns[0])
+    value_column = next((name for name in ('value', 'setting_value') if name in df.columns), df.columns[1])
+
+    return {str(key): value for key, value in zip(df[key_column], df[value_column]) if str(key)}
+
+
+# الإعدادات المعروفة: (القيمة الافتراضية من config، دالة التحويل)
+SETTINGS = {
+    'booking_days': (lambda: config.BOOKING_DAYS, parse_days),
+    'booking_time': (lambda: config.BOOKING_TIME, parse_time_range),
+    'weeks_ahead': (lambda: config.WEEKS_AHEAD, parse_positive_int),
+    'company_name': (lambda: config.COMPANY_NAME, parse_text),
+    'app_title': (lambda: config.APP_TITLE, parse_text)
+}
+
+
+class AppSettings:
+    """
+    الإعدادات المدمجة (للقراءة فقط)
+    sheet_values: القيم كما في الورقة، values: جميع الإعدادات بعد الدمج والتحويل
+    """
+
+    def __init__(self, sheet_values=None):
+        self.sheet_values = dict(sheet_values or {})
+        self.errors = {}
+
+        values = {}
+        for key, (default, parse) in SETTINGS.items():
+            values[key] = parse(default())
+            raw = self.sheet_values.get(key)
+            if raw is None or str(raw).strip() == '':
+                continue
+            try:
+                values[key] = parse(raw)
+            except (TypeError, ValueError) as e:
+                self.errors[key] = str(e)
+
+        # الإعدادات الأخرى في الورقة تبقى كما هي
+        for key, raw in self.sheet_values.items():
+            values.setdefault(key, raw)
+
+        self.values = values
+        self.booking_days = values['booking_days']
+        self.booking_weekdays = frozenset(WEEKDAYS[day] for day in self.booking_days)
+        self.booking_days_ar = tuple(WEEKDAY_NAMES_AR[WEEKDAYS[day]] for day in self.booking_days)
+        self.booking_time = values['booking_time']
+        self.weeks_ahead = values['weeks_ahead']
+        self.company_name = values['company_name']
+        self.app_title = values['app_title']
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def is_booking_day(self, day):
+        """
+        التحقق من أن التاريخ (date أو datetime) في أحد أيام الحجز
+        """
+        return day.weekday() in self.booking_weekdays
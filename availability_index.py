@@ -0,0 +1,96 @@
+"""
+وحدة فهرس توفر المواعيد حسب (التاريخ، الوقت)
+"""
+
+
+class AvailabilityIndex:
+    """
+    فهرس توفر المواعيد مبني من لقطة واحدة.
+    يتم التحقق من تاريخ واحد أو مجموعة تواريخ بزمن ثابت لكل تاريخ
+    دون تحميل البيانات أو البحث في القوائم.
+    """
+
+    def __init__(self, slots=None, default=False, version=None):
+        """
+        slots: قاموس {(التاريخ، الوقت): هل الموعد متاح}
+        default: حالة المواعيد غير الموجودة في الفهرس
+        """
+        self.default = default
+        self.version = version
+
+        self._slots = {}
+        self._dates = {}
+        for (date, time), is_available in (slots or {}).items():
+            self._add(date, time, is_available)
+
+    def _add(self, date, time, is_available):
+        date = str(date)
+        time = str(time) if time is not None else None
+        is_available = bool(is_available)
+
+        self._slots[(date, time)] = is_available
+
+        # التاريخ متاح إذا كان فيه موعد واحد متاح على الأقل
+        self._dates[date] = self._dates.get(date, False) or is_available
+
+    @classmethod
+    def from_slots(cls, dates, times, available, default=False, version=None):
+        """
+        بناء الفهرس من أعمدة المواعيد (التاريخ، الوقت، هل هو متاح)
+        """
+        index = cls(default=default, version=version)
+        for date, time, is_available in zip(dates, times, available):
+            index._add(date, time, is_available)
+        return index
+
+    @classmethod
+    def from_bookings(cls, dates, times, version=None):
+        """
+        بناء الفهرس من المواعيد المحجوزة فقط، وكل موعد غير محجوز يعتبر متاحاً
+        """
+        index = cls(default=True, version=version)
+        for date, time in zip(dates, times):
+            index._add(date, time, False)
+        return index
+
+    def is_available(self, date, time=None):
+        """
+        التحقق من توفر موعد محدد، أو من توفر أي موعد في التاريخ إذا لم يحدد الوقت
+        """
+        date = str(date)
+
+        if time is None:
+            return self._dates.get(date, self.default)
+
+        return self._slots.get((date, str(time)), self.default)
+
+    def is_booked(self, date):
+        """
+        التحقق مما إذا كان التاريخ مسجلاً في الفهرس وغير متاح
+        """
+        date = str(date)
+        return date in self._dates and not self._dates[date]
+
+    def check_many(self, dates, time=None):
+        """
+        التحقق من توفر مجموعة من التواريخ وإرجاع قاموس {التاريخ: هل هو متاح}
+        """
+        return {date: self.is_available(date, time) for date in dates}
+
+    def available_dates(self):
+        """
+        مجموعة التواريخ التي فيها موعد متاح واحد على الأقل
+        """
+        return {date for date, is_available in self._dates.items() if is_available}
+
+    def booked_dates(self):
+        """
+        مجموعة التواريخ المسجلة التي ليس فيها أي موعد متاح
+        """
+        return {date for date, is_available in self._dates.items() if not is_available}
+
+    def __contains__(self, date):
+        return self.is_available(date)
+
+    def __len__(self):
+        return len(self._slots)
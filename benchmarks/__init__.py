@@ -0,0 +1,3 @@
+"""
+قياس أداء طبقة البيانات على بيانات اصطناعية
+"""
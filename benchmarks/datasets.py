@@ -0,0 +1,115 @@
+"""
+وحدة توليد بيانات اصطناعية ثابتة (حسب البذرة) لقياس أداء طبقة البيانات
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# أعمدة الأوراق كما في جدول البيانات
+BOOKING_COLUMNS = ['booking_id', 'company_name', 'area_name', 'project_name', 'company_representative',
+                   'contact_info', 'booking_date', 'booking_time', 'status', 'notes']
+APPOINTMENT_COLUMNS = ["ID", "Company Name", "Project Name", "Area", "Presentation Date",
+                       "Time", "Developer Representative", "Status", "Created At", "Updated At"]
+
+AREAS = ['الرياض', 'جدة', 'الدمام', 'مكة', 'المدينة', 'الخبر', 'أبها', 'تبوك']
+BOOKING_STATUSES = ['مؤكد', 'ملغي', 'مرحل']
+APPOINTMENT_STATUSES = ['Confirmed', 'Cancelled', 'Rescheduled']
+STATUS_WEIGHTS = [0.7, 0.2, 0.1]
+SLOT_TIME = '12:00 - 12:30'
+
+# نسبة المواعيد السابقة لليوم الحالي
+PAST_SHARE = 0.3
+
+
+def _dates(start, count):
+    return [(start + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(count)]
+
+
+def generate_tables(rows, seed=42, today=None):
+    """
+    توليد أوراق Bookings و Available_Slots و Companies و Projects و Settings و Appointments
+    rows: عدد صفوف الحجوزات والمواعيد (Appointments)
+    المواعيد المتاحة موعد واحد لكل يوم بعدد rows / 10 يوماً (60 على الأقل)،
+    ثلثها تقريباً في الماضي، والحجوزات موزعة على نصف الأيام (المؤكدة منها غير متاحة)
+    تعيد قاموساً {اسم الورقة: DataFrame} بقيم نصية كما تظهر في الورقة
+    """
+    rng = np.random.default_rng(seed)
+    today = today or date.today()
+
+    # الشركات والمشاريع
+    company_count = max(10, rows // 1000)
+    companies = pd.DataFrame({
+        'company_id': [f"CO{i:05d}" for i in range(company_count)],
+        'company_name': [f"شركة التطوير {i}" for i in range(company_count)],
+        'area_name': rng.choice(AREAS, company_count)
+    })
+
+    project_count = company_count * 3
+    project_company = rng.integers(0, company_count, project_count)
+    projects = pd.DataFrame({
+        'project_id': [f"PR{i:06d}" for i in range(project_count)],
+        'project_name': [f"مشروع {i}" for i in range(project_count)],
+        'company_id': companies['company_id'].to_numpy()[project_company],
+        'company_name': companies['company_name'].to_numpy()[project_company],
+        'area_name': companies['area_name'].to_numpy()[project_company]
+    })
+
+    # المواعيد: موعد واحد لكل يوم
+    slot_count = max(60, rows // 10)
+    slot_dates = _dates(today - timedelta(days=int(slot_count * PAST_SHARE)), slot_count)
+
+    # الحجوزات على نصف الأيام فقط، فيبقى النصف الآخر متاحاً
+    booking_days = rng.choice(slot_count, slot_count // 2, replace=False)
+    booking_project = rng.integers(0, project_count, rows)
+    booking_dates = np.asarray(slot_dates)[booking_days[rng.integers(0, len(booking_days), rows)]]
+    statuses = rng.choice(BOOKING_STATUSES, rows, p=STATUS_WEIGHTS)
+    bookings = pd.DataFrame({
+        'booking_id': [f"BK{i:010d}" for i in range(rows)],
+        'company_name': projects['company_name'].to_numpy()[booking_project],
+        'area_name': projects['area_name'].to_numpy()[booking_project],
+        'project_name': projects['project_name'].to_numpy()[booking_project],
+        'company_representative': [f"ممثل {i % 500}" for i in range(rows)],
+        'contact_info': [f"rep{i % 500}@example.com" for i in range(rows)],
+        'booking_date': booking_dates,
+        'booking_time': SLOT_TIME,
+        'status': statuses,
+        'notes': ''
+    }, columns=BOOKING_COLUMNS)
+
+    booked = set(booking_dates[statuses != 'ملغي'].tolist())
+    slots = pd.DataFrame({
+        'date': slot_dates,
+        'time': SLOT_TIME,
+        'is_available': ['FALSE' if slot_date in booked else 'TRUE' for slot_date in slot_dates]
+    })
+
+    settings = pd.DataFrame({
+        'key': ['company_name', 'app_title', 'booking_time', 'weeks_ahead'],
+        'value': ['شركة التطوير العقاري الرائدة', 'نظام حجز مواعيد العروض التقديمية', SLOT_TIME, '8']
+    })
+
+    # مواعيد SheetsIntegration بنفس توزيع الحجوزات
+    created_at = [f"{booking_date} 09:00:00" for booking_date in booking_dates]
+    appointments = pd.DataFrame({
+        "ID": [f"{20000000000000 + i}" for i in range(rows)],
+        "Company Name": bookings['company_name'],
+        "Project Name": bookings['project_name'],
+        "Area": bookings['area_name'],
+        "Presentation Date": booking_dates,
+        "Time": '12:00',
+        "Developer Representative": bookings['company_representative'],
+        "Status": rng.choice(APPOINTMENT_STATUSES, rows, p=STATUS_WEIGHTS),
+        "Created At": created_at,
+        "Updated At": created_at
+    }, columns=APPOINTMENT_COLUMNS)
+
+    return {
+        'Bookings': bookings,
+        'Available_Slots': slots,
+        'Companies': companies,
+        'Projects': projects,
+        'Settings': settings,
+        'Appointments': appointments
+    }
@@ -0,0 +1,329 @@
+"""
+قياس أداء دوال sheets_api و SheetsIntegration على بيانات اصطناعية بعدة أحجام
+
+التشغيل من جذر المشروع:
+    python -m benchmarks.run                       # الأحجام 1k و 100k ومقارنة بالأساس
+    python -m benchmarks.run --scales 1m --backend memory
+    python -m benchmarks.run --update-baseline     # حفظ النتائج الحالية كأساس
+    python -m benchmarks.run --output before.json  # ثم بعد التعديل:
+    python -m benchmarks.run --reference before.json
+
+لكل دالة يتم قياس الزمن (الوسيط)، وعدد استدعاءات API (في خدمة fake_sheets)
+وذروة الذاكرة المخصصة أثناء الاستدعاء. ينتهي التشغيل برمز 1 إذا زاد عدد استدعاءات API عن الأساس.
+الزمن والذاكرة يعتمدان على الجهاز، لذلك لا تتم مقارنتهما إلا عند الطلب (--check-time)
+أو بنتائج تشغيل سابق على نفس الجهاز (--reference).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+
+import config
+
+# لا حصص ولا تحديث في الخلفية أثناء القياس، حتى لا يؤثر الانتظار على الأزمنة
+config.SHEETS_READ_QUOTA = 10 ** 9
+config.SHEETS_WRITE_QUOTA = 10 ** 9
+config.SHEETS_REFRESH_INTERVAL = 10 ** 6
+
+import sheets_api
+import sheets_async
+from benchmarks.datasets import generate_tables
+from fake_sheets import FakeSheetsService, frame_to_values
+from sheets_integration import SPREADSHEET_NAME as APPOINTMENTS_SPREADSHEET, SheetsIntegration
+from storage_backends import GSpreadBackend, MemoryBackend
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# أقل فرق يعتبر تراجعاً، لتجاهل تذبذب القياسات الصغيرة
+MIN_WALL_DELTA_MS = 2.0
+MIN_MEMORY_DELTA_KB = 256
+
+
+class Context:
+    """
+    البيانات والكائنات المشتركة بين حالات القياس لحجم واحد
+    """
+
+    def __init__(self, tables, service, integration):
+        self.tables = tables
+        self.service = service
+        self.integration = integration
+
+        bookings = tables['Bookings']
+        slots = tables['Available_Slots']
+        today = time.strftime('%Y-%m-%d')
+
+        self.booking_id = bookings['booking_id'].iloc[len(bookings) // 2]
+        self.appointment_id = tables['Appointments']['ID'].iloc[len(bookings) // 2]
+        self.date = slots['date'].iloc[len(slots) // 2]
+        self.year, self.month = int(self.date[:4]), int(self.date[5:7])
+
+        # مواعيد مستقبلية متاحة لحالات إنشاء الحجز
+        free = slots[(slots['is_available'] == 'TRUE') & (slots['date'] >= today)]['date'].tolist()
+        self._free_dates = iter(free)
+        self._counter = 0
+
+    def next_free_date(self):
+        return next(self._free_dates)
+
+    def next_value(self):
+        self._counter += 1
+        return f"benchmark {self._counter}"
+
+    def api_calls(self):
+        return self.service.get_stats()['total_calls'] if self.service is not None else 0
+
+
+def _reset_api():
+    sheets_api.invalidate_cache()
+
+
+def _reset_integration(ctx):
+    ctx.integration.snapshots.invalidate()
+
+
+def _booking(date):
+    return {
+        'company_name': 'شركة القياس', 'area_name': 'الرياض', 'project_name': 'مشروع القياس',
+        'company_representative': 'ممثل', 'contact_info': 'bench@example.com',
+        'booking_date': date, 'booking_time': '12:00 - 12:30'
+    }
+
+
+# حالات القياس: (الاسم، الدالة، دالة إعادة الضبط قبل كل تكرار أو None للقياس مع ذاكرة مؤقتة دافئة)
+CASES = [
+    ('sheets_api.get_all_bookings[cold]', lambda ctx: sheets_api.get_all_bookings(), lambda ctx: _reset_api()),
+    ('sheets_api.get_all_bookings[warm]', lambda ctx: sheets_api.get_all_bookings(), None),
+    ('sheets_api.get_booking_records[cold]', lambda ctx: sheets_api.get_booking_records(), lambda ctx: _reset_api()),
+    ('sheets_api.get_booking_records[warm]', lambda ctx: sheets_api.get_booking_records(), None),
+    ('sheets_api.get_booking_by_id[cold]', lambda ctx: sheets_api.get_booking_by_id(ctx.booking_id), lambda ctx: _reset_api()),
+    ('sheets_api.get_available_dates[cold]', lambda ctx: sheets_api.get_available_dates(), lambda ctx: _reset_api()),
+    ('sheets_api.get_booked_dates[cold]', lambda ctx: sheets_api.get_booked_dates(), lambda ctx: _reset_api()),
+    ('sheets_api.get_upcoming_bookings[warm]', lambda ctx: sheets_api.get_upcoming_bookings(), None),
+    ('sheets_api.get_calendar_data[cold]', lambda ctx: sheets_api.get_calendar_data(ctx.year, ctx.month), lambda ctx: _reset_api()),
+    ('sheets_api.get_calendar_data[warm]', lambda ctx: sheets_api.get_calendar_data(ctx.year, ctx.month), None),
+    ('sheets_api.check_date_availability[warm]', lambda ctx: sheets_api.check_date_availability(ctx.date), None),
+    ('sheets_api.get_booking_statistics[cold]', lambda ctx: sheets_api.get_booking_statistics(), lambda ctx: _reset_api()),
+    ('sheets_api.get_booking_statistics[warm]', lambda ctx: sheets_api.get_booking_statistics(), None),
+    ('sheets_api.get_companies', lambda ctx: sheets_api.get_companies(), None),
+    ('sheets_api.get_projects', lambda ctx: sheets_api.get_projects(), None),
+    ('sheets_api.get_settings', lambda ctx: sheets_api.get_settings(), None),
+    ('sheets_api.get_reference_data[cold]', lambda ctx: sheets_api.get_reference_data(), lambda ctx: _reset_api()),
+    ('sheets_async.get_booking_page_data[cold]', lambda ctx: sheets_async.get_booking_page_data(), lambda ctx: _reset_api()),
+    ('sheets_api.update_booking[warm]', lambda ctx: sheets_api.update_booking(ctx.booking_id, {'notes': ctx.next_value()}), None),
+    ('sheets_api.create_booking[warm]', lambda ctx: sheets_api.create_booking(_booking(ctx.next_free_date())), None),
+    ('SheetsIntegration.get_all_appointments[cold]', lambda ctx: ctx.integration.get_all_appointments(), _reset_integration),
+    ('SheetsIntegration.get_paginated_appointments[warm]', lambda ctx: ctx.integration.get_paginated_appointments(3, 12, 'Confirmed'), None),
+    ('SheetsIntegration.get_appointments_by_date[warm]', lambda ctx: ctx.integration.get_appointments_by_date(ctx.date), None),
+    ('SheetsIntegration.is_slot_available[warm]', lambda ctx: ctx.integration.is_slot_available(ctx.date, '12:00'), None),
+    ('SheetsIntegration.get_appointment_by_id', lambda ctx: ctx.integration.get_appointment_by_id(ctx.appointment_id), None),
+    ('SheetsIntegration.update_appointment', lambda ctx: ctx.integration.update_appointment(ctx.appointment_id, status='Confirmed'), None),
+    ('SheetsIntegration.add_appointment', lambda ctx: ctx.integration.add_appointment(
+        'شركة القياس', 'مشروع القياس', 'الرياض', ctx.date, '12:00', 'ممثل'), None),
+]
+
+
+def build_context(rows, backend, latency, seed):
+    """
+    توليد البيانات وتهيئة sheets_api و SheetsIntegration على مصدر التخزين المطلوب
+    """
+    tables = generate_tables(rows, seed=seed)
+    appointments = tables.pop('Appointments')
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if backend == 'memory':
+            service = None
+            sheets_api.set_backend(MemoryBackend(tables))
+            integration = SheetsIntegration(None)
+            integration.backend = MemoryBackend({integration.sheet_name: appointments})
+            integration.snapshots.invalidate()
+        else:
+            service = FakeSheetsService(latency=latency, seed=seed)
+            service.quotas = {'read': None, 'write': None}
+            connection = sheets_api.create_fake_connection(service, tables)
+            sheets_api.set_backend(GSpreadBackend(connection))
+            service.create_spreadsheet(APPOINTMENTS_SPREADSHEET, {'Appointments': frame_to_values(appointments)})
+            integration = SheetsIntegration(None, client_factory=service.client)
+            integration.refresher.stop()
+
+    tables['Appointments'] = appointments
+    return Context(tables, service, integration)
+
+
+def measure(ctx, func, reset, repeat):
+    """
+    قياس دالة: الزمن الوسيط بالمللي ثانية، وعدد استدعاءات API وذروة الذاكرة لأول تكرار
+    """
+    # تكرار أول لقياس الذاكرة وعدد الاستدعاءات، بعد التحميل المسبق في حالات الذاكرة الدافئة
+    if reset is not None:
+        reset(ctx)
+    else:
+        func(ctx)
+    calls_before = ctx.api_calls()
+    tracemalloc.start()
+    func(ctx)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    api_calls = ctx.api_calls() - calls_before
+
+    # تكرارات قياس الزمن دون تتبع الذاكرة
+    walls = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset(ctx)
+        started_at = time.perf_counter()
+        func(ctx)
+        walls.append((time.perf_counter() - started_at) * 1000)
+
+    return {
+        'wall_ms': round(statistics.median(walls), 3),
+        'api_calls': api_calls,
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def run(scales, backend, repeat, latency, seed, only=None):
+    results = {}
+    for scale in scales:
+        ctx = build_context(SCALES[scale], backend, latency, seed)
+        results[scale] = {}
+        for name, func, reset in CASES:
+            if only and only not in name:
+                continue
+            results[scale][name] = measure(ctx, func, reset, repeat)
+            print(f"{scale:>5} {name:<55} {_format(results[scale][name])}", flush=True)
+    return results
+
+
+def _format(result):
+    return f"{result['wall_ms']:>10.2f} ms {result['api_calls']:>4} calls {result['peak_kb']:>12.1f} KB"
+
+
+def _pairs(results, reference):
+    for scale, cases in results.items():
+        for name, result in cases.items():
+            base = reference.get(scale, {}).get(name)
+            if base is not None:
+                yield scale, name, result, base
+
+
+def compare_calls(results, baseline):
+    """
+    مقارنة عدد استدعاءات API بالأساس وإرجاع قائمة التراجعات (أي زيادة تعتبر تراجعاً)
+    عدد الاستدعاءات لا يعتمد على الجهاز، فيمكن مقارنته بأساس مسجل على جهاز آخر
+    """
+    return [
+        f"{scale} {name}: api calls {base['api_calls']} -> {result['api_calls']}"
+        for scale, name, result, base in _pairs(results, baseline)
+        if result['api_calls'] > base['api_calls']
+    ]
+
+
+def compare_time(results, reference, threshold):
+    """
+    مقارنة الزمن والذاكرة بنتائج مرجعية وإرجاع قائمة التراجعات
+    يعتبر تراجعاً: زيادة بأكثر من threshold وفوق حد أدنى مطلق
+    النتائج المرجعية يجب أن تكون من نفس الجهاز
+    """
+    regressions = []
+    for scale, name, result, base in _pairs(results, reference):
+        if (result['wall_ms'] > base['wall_ms'] * (1 + threshold)
+                and result['wall_ms'] - base['wall_ms'] > MIN_WALL_DELTA_MS):
+            regressions.append(f"{scale} {name}: wall {base['wall_ms']} -> {result['wall_ms']} ms")
+        if (result['peak_kb'] > base['peak_kb'] * (1 + threshold)
+                and result['peak_kb'] - base['peak_kb'] > MIN_MEMORY_DELTA_KB):
+            regressions.append(f"{scale} {name}: peak {base['peak_kb']} -> {result['peak_kb']} KB")
+    return regressions
+
+
+def _load(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    # تحذيرات pandas المتكررة من نفس السطر تخفي جدول النتائج
+    warnings.simplefilter('ignore')
+
+    parser = argparse.ArgumentParser(description='Benchmark the sheets data-access layer')
+    parser.add_argument('--scales', default='1k,100k', help=f"comma separated: {', '.join(SCALES)}")
+    parser.add_argument('--backend', choices=('fake', 'memory'), default='fake')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated seconds per API call (fake backend)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', help='run only cases whose name contains this text')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed relative wall time and memory regression')
+    parser.add_argument('--check-time', action='store_true',
+                        help='also fail on wall time and memory regressions against the baseline '
+                             '(only meaningful when it was recorded on this machine)')
+    parser.add_argument('--reference',
+                        help='results written by --output on this machine; wall time and memory '
+                             'are compared with them')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    scales = [scale.strip().lower() for scale in args.scales.split(',') if scale.strip()]
+    for scale in scales:
+        if scale not in SCALES:
+            parser.error(f"unknown scale: {scale}")
+
+    results = run(scales, args.backend, args.repeat, args.latency, args.seed, args.only)
+    key = f"{args.backend}@{args.latency:g}s"
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({key: results}, f, indent=2, ensure_ascii=False)
+
+    baseline = _load(args.baseline)
+
+    if args.update_baseline:
+        merged = baseline.setdefault(key, {})
+        for scale, cases in results.items():
+            merged.setdefault(scale, {}).update(cases)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False, sort_keys=True)
+            f.write('\n')
+        print(f"baseline updated: {args.baseline}")
+        return 0
+
+    regressions = []
+    if key in baseline:
+        regressions += compare_calls(results, baseline[key])
+    else:
+        print(f"no baseline for {key}; run with --update-baseline to record one")
+
+    # الزمن والذاكرة: بتشغيل سابق على نفس الجهاز، أو بالأساس عند الطلب فقط
+    if args.reference:
+        reference = _load(args.reference)
+        if key not in reference:
+            parser.error(f"no {key} results in {args.reference}")
+        regressions += compare_time(results, reference[key], args.threshold)
+    elif args.check_time and key in baseline:
+        regressions += compare_time(results, baseline[key], args.threshold)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\nno regressions against {key}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
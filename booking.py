@@ -3,7 +3,6 @@
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
 
 import config
@@ -16,37 +15,71 @@ from utils import (
     format_date
 )
 import sheets_api
+import sheets_async
+from sheets_metrics import traced_action
 
+@traced_action
 def render_booking_page():
     """
     عرض صفحة حجز موعد جديد
     """
     st.title("حجز موعد عرض تقديمي جديد")
     
-    st.markdown("""
+    # تحميل المواعيد والشركات والمشاريع والإعدادات معاً
+    page_data = sheets_async.get_booking_page_data()
+    reference = page_data["reference"]
+    settings = page_data["settings"]
+    
+    # أيام الحجز ووقته من الإعدادات
+    st.markdown(f"""
     يرجى ملء النموذج التالي لحجز موعد عرض تقديمي جديد.
     
-    **ملاحظة**: المواعيد متاحة فقط أيام السبت والثلاثاء من الساعة 12:00 ظهرًا إلى 12:30 ظهرًا.
+    **ملاحظة**: المواعيد متاحة فقط أيام {" و".join(settings.booking_days_ar)} في الوقت {settings.booking_time}.
     """)
     
-    # نموذج الحجز
-    with st.form("booking_form"):
-        # بيانات الشركة
-        st.subheader("بيانات الشركة")
-        
+    # بيانات الشركة
+    st.subheader("بيانات الشركة")
+    
+    # قوائم اختيار متتابعة (المنطقة ثم الشركة ثم المشروع) من فهارس البيانات المرجعية في الذاكرة،
+    # خارج النموذج حتى تتحدث كل قائمة عند تغيير التي قبلها
+    use_reference = not reference.is_empty()
+    if use_reference:
         col1, col2 = st.columns(2)
         with col1:
-            company_name = st.text_input(config.BOOKING_FORM_LABELS["company_name"], key="company_name")
+            area_name = st.selectbox(
+                config.BOOKING_FORM_LABELS["area_name"],
+                options=reference.areas(),
+                key="area_name"
+            )
         
         with col2:
-            area_name = st.text_input(config.BOOKING_FORM_LABELS["area_name"], key="area_name")
+            company_name = st.selectbox(
+                config.BOOKING_FORM_LABELS["company_name"],
+                options=[company.company_name for company in reference.companies_in_area(area_name)],
+                key="company_name"
+            )
         
-        col1, col2 = st.columns(2)
-        with col1:
+        company = reference.company_by_name(company_name)
+        project_name = st.selectbox(
+            config.BOOKING_FORM_LABELS["project_name"],
+            options=[project.project_name for project in reference.projects_of(company)] if company else [],
+            key="project_name"
+        )
+    
+    # نموذج الحجز
+    with st.form("booking_form"):
+        # إدخال بيانات الشركة يدوياً إذا لم تكن هناك بيانات مرجعية
+        if not use_reference:
+            col1, col2 = st.columns(2)
+            with col1:
+                company_name = st.text_input(config.BOOKING_FORM_LABELS["company_name"], key="company_name")
+            
+            with col2:
+                area_name = st.text_input(config.BOOKING_FORM_LABELS["area_name"], key="area_name")
+            
             project_name = st.text_input(config.BOOKING_FORM_LABELS["project_name"], key="project_name")
         
-        with col2:
-            representative_name = st.text_input(config.BOOKING_FORM_LABELS["representative_name"], key="representative_name")
+        representative_name = st.text_input(config.BOOKING_FORM_LABELS["representative_name"], key="representative_name")
         
         # بيانات الاتصال
         st.subheader("بيانات الاتصال")
@@ -61,26 +94,17 @@ def render_booking_page():
         # بيانات الحجز
         st.subheader("بيانات الحجز")
         
-        # الحصول على المواعيد المتاحة
-        available_slots = sheets_api.get_available_slots()
+        # المواعيد كسجلات Slot
+        slots = page_data["slots"]
         
-        # تحويل البيانات إلى DataFrame
-        if available_slots:
-            df = pd.DataFrame(available_slots)
-            
-            # تصفية المواعيد المتاحة فقط
-            df = df[df["is_available"] == "Yes"]
-            
-            # ترتيب المواعيد حسب التاريخ
-            df = df.sort_values(by="slot_date")
-            
-            # إنشاء قائمة بالتواريخ المتاحة
-            available_dates = df["slot_date"].unique().tolist()
+        if slots:
+            # إنشاء قائمة مرتبة بتواريخ المواعيد المتاحة فقط
+            available_dates = sorted({slot.date for slot in slots if slot.is_available and slot.date})
             
             # تنسيق التواريخ لعرضها في القائمة المنسدلة
             date_options = []
-            for date_str in available_dates:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+            for date_obj in available_dates:
+                date_str = date_obj.strftime("%Y-%m-%d")
                 day_name = date_obj.strftime("%A")
                 
                 # ترجمة اسم اليوم إلى العربية
@@ -109,8 +133,8 @@ def render_booking_page():
                 booking_date = date_dict[selected_date_label]
                 
                 # عرض وقت الحجز (ثابت)
-                st.info(f"{config.BOOKING_FORM_LABELS['booking_time']}: {config.BOOKING_TIME}")
-                booking_time = config.BOOKING_TIME
+                st.info(f"{config.BOOKING_FORM_LABELS['booking_time']}: {page_data['settings'].booking_time}")
+                booking_time = page_data["settings"].booking_time
             else:
                 st.error("لا توجد مواعيد متاحة حاليًا. يرجى المحاولة لاحقًا.")
                 booking_date = None
@@ -0,0 +1,150 @@
+"""
+وحدة أرشفة الحجوزات: نقل الصفوف القديمة من الورقة النشطة إلى أوراق أرشيف شهرية
+(مثل Bookings_Archive_2025_04) في نفس جدول البيانات
+تبقى الورقة النشطة صغيرة فتكون تكلفة كل قراءة لها بحجم البيانات الحالية فقط،
+ويقرأ التاريخ الكامل عند الطلب من أوراق الأشهر المطلوبة فقط
+
+للتشغيل كمهمة دورية (مثلاً يومياً):
+    python booking_archive.py
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import config
+from sheet_schema import format_dates, to_sheet_value
+
+
+# اسم ورقة أرشيف شهر
+def archive_sheet_name(sheet, month):
+    """
+    اسم ورقة أرشيف الورقة sheet للشهر month بصيغة YYYY-MM
+    """
+    return f"{sheet}_Archive_{month.replace('-', '_')}"
+
+
+# أشهر الأرشيف الموجودة
+def archive_months(backend, sheet):
+    """
+    الأشهر التي لها ورقة أرشيف للورقة sheet، مرتبة بصيغة YYYY-MM
+    """
+    pattern = re.compile(rf"^{re.escape(sheet)}_Archive_(\d{{4}})_(\d{{2}})$")
+    months = []
+    for name in backend.get_sheet_names():
+        match = pattern.match(name)
+        if match:
+            months.append(f"{match.group(1)}-{match.group(2)}")
+    return sorted(months)
+
+
+# تاريخ حد الأرشفة
+def archive_cutoff(days=None):
+    """
+    الصفوف التي تاريخها قبل هذا التاريخ (بصيغة YYYY-MM-DD) تنقل إلى الأرشيف
+    days: عدد الأيام قبل اليوم، وإلا config.ARCHIVE_AFTER_DAYS
+    """
+    days = config.ARCHIVE_AFTER_DAYS if days is None else days
+    return (datetime.now().date() - timedelta(days=max(days, 1))).strftime("%Y-%m-%d")
+
+
+# الصفوف المطلوب أرشفتها
+def plan_archive(df, date_column, cutoff):
+    """
+    مواضع الصفوف (بدءاً من 0 بعد الرؤوس) التي تاريخها قبل cutoff، وشهر كل منها
+    الصفوف بدون تاريخ تبقى في الورقة النشطة
+    """
+    if date_column not in df.columns:
+        return [], []
+
+    dates = format_dates(df[date_column]).tolist()
+    positions = [position for position, date in enumerate(dates) if date and date < cutoff]
+    return positions, [dates[position][:7] for position in positions]
+
+
+# نقل الصفوف القديمة إلى أوراق الأرشيف
+def archive_rows(backend, sheet, df, date_column, cutoff, schema):
+    """
+    نقل الصفوف الأقدم من cutoff إلى أوراق أرشيف شهرية ثم حذفها من الورقة النشطة
+    df: لقطة الورقة المحملة للتو بنفس ترتيب صفوفها في المصدر
+    تتم الإضافة إلى الأرشيف أولاً ثم الحذف، وتتخطى الإضافة الصفوف الموجودة في الأرشيف بالفعل،
+    فإذا توقفت العملية بين الخطوتين تكمل الأرشفة التالية دون تكرار
+    تعيد قاموس {الشهر YYYY-MM: عدد الصفوف المنقولة}
+    """
+    positions, months = plan_archive(df, date_column, cutoff)
+    if not positions:
+        return {}
+
+    # قيم الصفوف كما تظهر في الورقة
+    columns = [str(column) for column in df.columns]
+    kinds = [schema.get(column) for column in columns]
+    by_month = {}
+    for month, row in zip(months, df.iloc[positions].itertuples(index=False)):
+        record = {column: to_sheet_value(value, kind) for column, kind, value in zip(columns, kinds, row)}
+        by_month.setdefault(month, []).append(record)
+
+    existing = set(archive_months(backend, sheet))
+    appends = []
+    for month, records in by_month.items():
+        name = archive_sheet_name(sheet, month)
+        if month in existing:
+            archive_columns = backend.get_columns(name)
+            archived = backend.get_range(name, [record[columns[0]] for record in records])
+        else:
+            backend.create_sheet(name, columns)
+            archive_columns = columns
+            archived = {}
+
+        # بترتيب أعمدة ورقة الأرشيف، والصفوف المؤرشفة سابقاً لا تضاف مرة أخرى
+        for record in records:
+            if str(record[columns[0]]) not in archived:
+                appends.append((name, [record.get(column, '') for column in archive_columns]))
+
+    # جميع الإضافات في طلب واحد، ثم حذف الصفوف المنقولة في طلب واحد
+    if appends:
+        backend.batch_update([], appends)
+    backend.replace_rows(sheet, positions, [])
+
+    return {month: len(records) for month, records in by_month.items()}
+
+
+# قراءة الأرشيف
+def read_archive(backend, sheet, date_column, start_date=None, end_date=None):
+    """
+    قراءة الصفوف المؤرشفة بين تاريخين (بصيغة YYYY-MM-DD، شاملين) كـ DataFrame بقيم الورقة
+    تقرأ أوراق الأشهر التي تتقاطع مع النطاق فقط، معاً في طلب واحد إن دعمه المصدر
+    """
+    months = [
+        month for month in archive_months(backend, sheet)
+        if (start_date is None or month >= str(start_date)[:7]) and (end_date is None or month <= str(end_date)[:7])
+    ]
+    frames = backend.get_many([archive_sheet_name(sheet, month) for month in months]) if months else {}
+    frames = [df for df in frames.values() if len(df.columns) > 0]
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+
+    # تصفية الأيام في الشهرين الأول والأخير
+    if date_column in df.columns and (start_date is not None or end_date is not None):
+        dates = df[date_column].astype(str).str[:10]
+        mask = pd.Series(True, index=df.index)
+        if start_date is not None:
+            mask &= dates >= str(start_date)[:10]
+        if end_date is not None:
+            mask &= dates <= str(end_date)[:10]
+        df = df[mask].reset_index(drop=True)
+
+    return df
+
+
+if __name__ == '__main__':
+    import sheets_api
+
+    moved = sheets_api.archive_old_bookings()
+    if moved:
+        for month, count in sorted(moved.items()):
+            print(f"{month}: تم نقل {count} حجز إلى {archive_sheet_name('Bookings', month)}")
+    else:
+        print("لا توجد حجوزات للأرشفة")
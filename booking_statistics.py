@@ -0,0 +1,141 @@
+"""
+وحدة حساب إحصائيات الحجوزات
+"""
+
+import threading
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# أسماء الأيام بالعربية حسب رقم اليوم (الإثنين = 0)
+DAY_NAMES_AR = ('الإثنين', 'الثلاثاء', 'الأربعاء', 'الخميس', 'الجمعة', 'السبت', 'الأحد')
+
+# أسماء الشهور بالعربية حسب رقم الشهر (يناير = 1)
+MONTH_NAMES_AR = ('', 'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
+                  'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر')
+
+# مفاتيح الإحصائيات حسب حالة الحجز
+STATUS_KEYS = {
+    'مؤكد': 'confirmed_bookings',
+    'ملغي': 'cancelled_bookings',
+    'مرحل': 'rescheduled_bookings'
+}
+
+
+def _counts_to_dict(counter, labels=None):
+    """
+    تحويل العدادات إلى قاموس مرتب تنازلياً حسب العدد مع حذف الأصفار
+    """
+    items = [(key, count) for key, count in counter.items() if count > 0]
+    items.sort(key=lambda item: -item[1])
+    if labels is not None:
+        return {labels[key]: count for key, count in items}
+    return dict(items)
+
+
+class BookingStatistics:
+    """
+    إحصائيات الحجوزات محسوبة في تمريرة واحدة ومخزنة حسب إصدار البيانات.
+    يتم تحديثها تدريجياً عند إنشاء حجز واحد أو إلغائه أو ترحيله
+    بدلاً من إعادة الحساب من البداية.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._total = 0
+        self._by_status = Counter()
+        self._by_day = Counter()
+        self._by_month = Counter()
+        self._by_company = Counter()
+
+    def _compute(self, bookings):
+        """
+        حساب جميع العدادات من إطار الحجوزات دون تعديله
+        """
+        self._total = len(bookings)
+        self._by_status = Counter()
+        self._by_day = Counter()
+        self._by_month = Counter()
+        self._by_company = Counter()
+
+        if self._total == 0:
+            return
+
+        # الحالة كعمود فئوي
+        if 'status' in bookings.columns:
+            status_counts = bookings['status'].astype('category').value_counts(sort=False)
+            self._by_status = Counter({key: int(count) for key, count in status_counts.items()})
+
+        # رموز الأيام والشهور محسوبة مرة واحدة
+        if 'booking_date' in bookings.columns:
+            dates = pd.to_datetime(bookings['booking_date'], errors='coerce')
+            valid = dates.notna().to_numpy()
+            day_codes = dates.dt.dayofweek.to_numpy()[valid].astype(int)
+            month_codes = dates.dt.month.to_numpy()[valid].astype(int)
+            self._by_day = Counter(dict(enumerate(np.bincount(day_codes, minlength=7).tolist())))
+            self._by_month = Counter(dict(enumerate(np.bincount(month_codes, minlength=13).tolist())))
+
+        if 'company_name' in bookings.columns:
+            company_counts = bookings['company_name'].astype('category').value_counts(sort=False)
+            self._by_company = Counter({key: int(count) for key, count in company_counts.items()})
+
+    def _apply_row(self, row, sign):
+        """
+        إضافة مساهمة صف واحد إلى العدادات أو طرحها
+        """
+        self._total += sign
+        self._by_status[row.get('status')] += sign
+        self._by_company[row.get('company_name')] += sign
+
+        try:
+            date = datetime.strptime(str(row.get('booking_date')), "%Y-%m-%d")
+        except ValueError:
+            return
+        self._by_day[date.weekday()] += sign
+        self._by_month[date.month] += sign
+
+    def get(self, version, bookings):
+        """
+        الحصول على الإحصائيات لإصدار البيانات، مع إعادة الحساب فقط عند تغيره
+        version يساوي None عندما لا يكون للبيانات إصدار معروف، فيعاد الحساب دائماً
+        """
+        with self._lock:
+            if version is None or self._version != version:
+                self._compute(bookings)
+                self._version = version
+            return self._to_dict()
+
+    def apply_change(self, old_row, new_row, from_version, to_version):
+        """
+        تحديث الإحصائيات تدريجياً بعد تغيير حجز واحد
+        old_row يساوي None عند إنشاء حجز جديد
+        يتم تجاهل التغيير إذا كانت الإحصائيات المخزنة لا تطابق الإصدار السابق
+        """
+        with self._lock:
+            if self._version is None or self._version != from_version:
+                return False
+            if old_row is not None:
+                self._apply_row(old_row, -1)
+            if new_row is not None:
+                self._apply_row(new_row, 1)
+            self._version = to_version
+            return True
+
+    def _to_dict(self):
+        statistics = {'total_bookings': self._total}
+        for status, key in STATUS_KEYS.items():
+            statistics[key] = self._by_status.get(status, 0)
+        statistics['bookings_by_day'] = _counts_to_dict(self._by_day, DAY_NAMES_AR)
+        statistics['bookings_by_month'] = _counts_to_dict(self._by_month, MONTH_NAMES_AR)
+        statistics['bookings_by_company'] = _counts_to_dict(self._by_company)
+        return statistics
+
+    def clear(self):
+        """
+        إبطال الإحصائيات المخزنة
+        """
+        with self._lock:
+            self._version = None
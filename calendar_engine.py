@@ -0,0 +1,106 @@
+"""
+وحدة توليد بيانات التقويم من حالة المواعيد
+"""
+
+import calendar
+import threading
+from datetime import datetime
+
+
+class CalendarEngine:
+    """
+    محرك تقويم يحتفظ بحالة المواعيد كمجموعات مفهرسة بالتاريخ
+    ويخزن شبكة كل شهر حسب (السنة، الشهر، إصدار البيانات).
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._grids = {}
+        self._state = None
+        self._state_version = None
+
+    def _get_state(self, version, load_state):
+        """
+        الحصول على مجموعتي التواريخ المتاحة والمحجوزة لإصدار البيانات
+        """
+        if self._state_version != version:
+            available, booked = load_state()
+            self._state = (frozenset(available), frozenset(booked))
+            self._state_version = version
+
+            # الشبكات المخزنة لإصدارات سابقة لم تعد صالحة
+            self._grids = {}
+        return self._state
+
+    def _build_month(self, year, month, available, booked, today):
+        """
+        بناء شبكة شهر واحد كقائمة أسابيع من قواميس الأيام
+        """
+        calendar_data = []
+
+        for week in calendar.monthcalendar(year, month):
+            week_data = []
+            for day in week:
+                if day == 0:
+                    # يوم فارغ
+                    week_data.append({
+                        'day': 0,
+                        'date': '',
+                        'is_available': False,
+                        'is_booked': False,
+                        'is_past': False
+                    })
+                else:
+                    # التواريخ بصيغة YYYY-MM-DD قابلة للمقارنة كنصوص
+                    date_str = f"{year}-{month:02d}-{day:02d}"
+                    week_data.append({
+                        'day': day,
+                        'date': date_str,
+                        'is_available': date_str in available,
+                        'is_booked': date_str in booked,
+                        'is_past': date_str < today
+                    })
+
+            calendar_data.append(week_data)
+
+        return calendar_data
+
+    def get_months(self, year, month, count, version, load_state, today=None):
+        """
+        الحصول على شبكات عدد من الأشهر المتتالية بدءاً من (year, month)
+        الدالة load_state تعيد (التواريخ المتاحة، التواريخ المحجوزة) ولا تُستدعى
+        إلا عند تغير إصدار البيانات
+        """
+        if today is None:
+            today = datetime.now().strftime("%Y-%m-%d")
+
+        with self._lock:
+            available, booked = self._get_state(version, load_state)
+
+            grids = []
+            for offset in range(count):
+                current_year = year + (month - 1 + offset) // 12
+                current_month = (month - 1 + offset) % 12 + 1
+
+                key = (current_year, current_month, version, today)
+                grid = self._grids.get(key)
+                if grid is None:
+                    if len(self._grids) >= self.max_entries:
+                        self._grids.clear()
+                    grid = self._build_month(current_year, current_month, available, booked, today)
+                    self._grids[key] = grid
+                grids.append(grid)
+
+        # إرجاع نسخ حتى لا يؤثر تعديل المستدعي على الشبكات المخزنة
+        return [[[dict(day) for day in week] for week in grid] for grid in grids]
+
+    def clear(self):
+        """
+        مسح الشبكات والحالة المخزنة
+        """
+        with self._lock:
+            self._grids = {}
+            self._state = None
+            self._state_version = None
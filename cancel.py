@@ -8,7 +8,9 @@ from datetime import datetime
 import config
 from utils import create_success_message, create_error_message, format_date
 import sheets_api
+from sheets_metrics import traced_action
 
+@traced_action
 def render_cancel_page():
     """
     عرض صفحة إلغاء الحجز
@@ -29,7 +31,7 @@ def render_cancel_page():
     booking_id = st.session_state.selected_booking_id
     
     # الحصول على بيانات الحجز
-    booking = sheets_api.get_booking_by_id(booking_id)
+    booking = sheets_api.get_booking_record(booking_id)
     
     if not booking:
         st.error("لم يتم العثور على الحجز المحدد.")
@@ -45,8 +47,8 @@ def render_cancel_page():
     st.markdown("### بيانات الحجز")
     
     # تنسيق التاريخ
-    date_obj = datetime.strptime(booking["booking_date"], "%Y-%m-%d").date()
-    day_name = date_obj.strftime("%A")
+    date_obj = booking.booking_date
+    day_name = date_obj.strftime("%A") if date_obj else ""
     day_name_ar = {
         "Saturday": "السبت",
         "Sunday": "الأحد",
@@ -56,16 +58,16 @@ def render_cancel_page():
         "Thursday": "الخميس",
         "Friday": "الجمعة"
     }.get(day_name, day_name)
-    date_formatted = date_obj.strftime("%d/%m/%Y")
+    date_formatted = date_obj.strftime("%d/%m/%Y") if date_obj else ""
     
     st.markdown(f"""
     <div class="booking-card">
-        <div class="booking-header">{booking["company_name"]} - {booking["project_name"]}</div>
-        <div class="booking-info">رقم الحجز: {booking["booking_id"]}</div>
-        <div class="booking-info">اسم المنطقة: {booking["area_name"]}</div>
-        <div class="booking-info">اسم ممثل الشركة: {booking["representative_name"]}</div>
+        <div class="booking-header">{booking.company_name} - {booking.project_name}</div>
+        <div class="booking-info">رقم الحجز: {booking.booking_id}</div>
+        <div class="booking-info">اسم المنطقة: {booking.area_name}</div>
+        <div class="booking-info">اسم ممثل الشركة: {booking.representative_name}</div>
         <div class="booking-info">تاريخ الحجز: {day_name_ar} - {date_formatted}</div>
-        <div class="booking-info">وقت الحجز: {booking["booking_time"]}</div>
+        <div class="booking-info">وقت الحجز: {booking.booking_time}</div>
     </div>
     """, unsafe_allow_html=True)
     
@@ -83,7 +85,7 @@ def render_cancel_page():
             # تحديث بيانات الحجز
             updated_data = {
                 "status": "Cancelled",
-                "notes": f"{booking.get('notes', '')} | سبب الإلغاء: {cancel_reason}" if cancel_reason else booking.get('notes', '')
+                "notes": f"{booking.notes} | سبب الإلغاء: {cancel_reason}" if cancel_reason else booking.notes
             }
             
             # إلغاء الحجز
@@ -97,12 +99,12 @@ def render_cancel_page():
                 
                 st.markdown(f"""
                 <div class="booking-card">
-                    <div class="booking-header">{booking["company_name"]} - {booking["project_name"]}</div>
-                    <div class="booking-info">رقم الحجز: {booking["booking_id"]}</div>
-                    <div class="booking-info">اسم المنطقة: {booking["area_name"]}</div>
-                    <div class="booking-info">اسم ممثل الشركة: {booking["representative_name"]}</div>
+                    <div class="booking-header">{booking.company_name} - {booking.project_name}</div>
+                    <div class="booking-info">رقم الحجز: {booking.booking_id}</div>
+                    <div class="booking-info">اسم المنطقة: {booking.area_name}</div>
+                    <div class="booking-info">اسم ممثل الشركة: {booking.representative_name}</div>
                     <div class="booking-info">تاريخ الحجز: {day_name_ar} - {date_formatted}</div>
-                    <div class="booking-info">وقت الحجز: {booking["booking_time"]}</div>
+                    <div class="booking-info">وقت الحجز: {booking.booking_time}</div>
                     <div class="booking-info">حالة الحجز: <span class="booking-status-cancelled">ملغي</span></div>
                 </div>
                 """, unsafe_allow_html=True)
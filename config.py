@@ -24,11 +24,41 @@ BACKGROUND_COLOR = "#F5F5F5"  # رمادي فاتح
 TEXT_COLOR = "#212121"  # أسود
 ACCENT_COLOR = "#4CAF50"  # أخضر
 
-# إعدادات الحجز
+# إعدادات الحجز الافتراضية، تحل محلها قيم ورقة الإعدادات (Settings) إن وجدت
 BOOKING_DAYS = ["Saturday", "Tuesday"]  # أيام الحجز المسموح بها
-BOOKING_TIME = "12:00-12:30"  # وقت الحجز
+BOOKING_TIME = "12:00 - 12:30"  # وقت الحجز
 WEEKS_AHEAD = 8  # عدد الأسابيع المتاحة للحجز مسبقاً
 
+# إعدادات التخزين المؤقت لبيانات Google Sheets
+SHEETS_CACHE_TTL = 60  # مدة صلاحية لقطة الورقة في الذاكرة (بالثواني)
+SHEETS_REFRESH_INTERVAL = 15  # الفترة بين فحوص تغير الأوراق في الخلفية (بالثواني)
+REFERENCE_CACHE_TTL = 6 * 60 * 60  # مدة صلاحية الشركات والمشاريع في الذاكرة، تتغير بضع مرات في الشهر (بالثواني)
+
+# أرشفة الحجوزات: الحجوزات الأقدم من هذا العدد من الأيام تنقل إلى أوراق أرشيف شهرية
+ARCHIVE_AFTER_DAYS = 90
+
+# وضع التخزين: 'sheets' للقراءة والكتابة مباشرة في Google Sheets،
+# أو 'sqlite' للعمل على نسخة محلية ترسل تعديلاتها إلى Google Sheets في الخلفية،
+# أو 'memory' لبيانات مؤقتة في الذاكرة (يستخدم تلقائياً عند عدم وجود ملف الاعتماد)،
+# أو 'fake' لخدمة Google Sheets محلية تمر بنفس مسار الكود الفعلي (للقياس دون اتصال)
+STORAGE_MODE = 'sheets'
+SQLITE_MIRROR_PATH = 'data/sheets_mirror.db'  # مسار ملف النسخة المحلية
+WRITE_BEHIND_INTERVAL = 5  # الفترة بين دفعات إرسال التعديلات المؤجلة (بالثواني)
+
+# خدمة Google Sheets المحلية في وضع التخزين 'fake'
+FAKE_SHEETS_LATENCY = 0.2  # زمن كل استدعاء (بالثواني)
+FAKE_SHEETS_QUOTA = 60  # عدد الطلبات المسموح بها في الدقيقة لكل من القراءة والكتابة
+FAKE_SHEETS_ERROR_RATE = 0.0  # نسبة الاستدعاءات التي تفشل عشوائياً بخطأ 503
+
+# حصص Google Sheets API لكل دقيقة وإعادة المحاولة
+SHEETS_READ_QUOTA = 60  # عدد طلبات القراءة المسموح بها في الدقيقة
+SHEETS_WRITE_QUOTA = 60  # عدد طلبات الكتابة المسموح بها في الدقيقة
+SHEETS_MAX_RETRIES = 5  # عدد مرات إعادة المحاولة عند أخطاء الحصة والخادم
+
+# قياس استدعاءات Google Sheets API
+SHEETS_METRICS_SAMPLES = 1000  # عدد الأزمنة المحفوظة لكل دالة لحساب p50 و p95
+SHEETS_TRACE_HISTORY = 20  # عدد سجلات إعادة تشغيل الواجهة المحفوظة
+
 # رسائل النظام
 MESSAGES = {
     "booking_success": "تم إنشاء الحجز بنجاح!",
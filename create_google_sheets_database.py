@@ -264,7 +264,7 @@ def create_settings_sheet(spreadsheet):
             # إضافة بعض الإعدادات الافتراضية
             default_settings = [
                 ["booking_days", "Saturday,Tuesday", "أيام الحجز المسموح بها"],
-                ["booking_time", "12:00-12:30", "وقت الحجز"],
+                ["booking_time", "12:00 - 12:30", "وقت الحجز"],
                 ["weeks_ahead", "8", "عدد الأسابيع المتاحة للحجز مسبقًا"],
                 ["company_name", "شركة التطوير العقاري الرائدة", "اسم الشركة"],
                 ["app_title", "نظام حجز مواعيد العروض التقديمية للتطوير العقاري", "عنوان التطبيق"]
@@ -319,7 +319,7 @@ def generate_available_slots(slots_sheet, weeks_ahead=8):
                         slot_id,
                         date_str,
                         day_name,
-                        "12:00-12:30",
+                        "12:00 - 12:30",
                         "Yes",
                         ""
                     ])
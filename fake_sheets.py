@@ -0,0 +1,685 @@
+"""
+وحدة خدمة Google Sheets محلية متوافقة مع gspread للقياس والاختبار دون اتصال
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from gspread.cell import Cell
+from gspread.exceptions import APIError, WorksheetNotFound, SpreadsheetNotFound
+from gspread.utils import a1_range_to_grid_range, numericise_all, rowcol_to_a1, to_records
+
+import config
+
+# نافذة حساب حصص الطلبات (بالثواني)
+QUOTA_WINDOW = 60
+
+
+class _ErrorResponse:
+    """
+    استجابة HTTP بسيطة لإنشاء APIError بنفس شكل أخطاء Google
+    """
+
+    def __init__(self, code, message):
+        self.status_code = code
+        self._error = {'code': code, 'message': message, 'status': 'FAKE_ERROR'}
+        self.text = json.dumps({'error': self._error})
+
+    def json(self):
+        return {'error': self._error}
+
+
+def _api_error(code, message):
+    return APIError(_ErrorResponse(code, message))
+
+
+def _cell_text(value):
+    """
+    تحويل قيمة مكتوبة إلى النص الذي تعيده الورقة عند القراءة
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    return str(value)
+
+
+# أرقام بصيغة يحولها Sheets إلى رقم عند الإدخال USER_ENTERED
+_NUMBER = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)$')
+_DATE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+_DATETIME = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})[ T](\d{1,2}):(\d{2})(?::(\d{2}))?$')
+
+
+def _user_entered_text(value):
+    """
+    النص الذي تعرضه الورقة لقيمة مكتوبة بـ USER_ENTERED (بإعدادات اللغة en_US):
+    الأرقام تفقد الأصفار في بدايتها، والتواريخ تعرض بصيغة M/D/YYYY، و true/false تصبح TRUE/FALSE
+    """
+    if not isinstance(value, str):
+        return _cell_text(value)
+
+    text = value.strip()
+    if text.startswith("'"):
+        return text[1:]
+    if _NUMBER.match(text):
+        number = float(text)
+        return str(int(number)) if number.is_integer() else f"{number:g}"
+    if text.lower() in ('true', 'false'):
+        return text.upper()
+
+    match = _DATE.match(text)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+        return f"{month}/{day}/{year}"
+
+    match = _DATETIME.match(text)
+    if match:
+        year, month, day, hour, minute = (int(part) for part in match.groups()[:5])
+        second = int(match.group(6) or 0)
+        return f"{month}/{day}/{year} {hour}:{minute:02d}:{second:02d}"
+
+    return value
+
+
+def _input_text(value_input_option):
+    """
+    دالة تحويل القيم المكتوبة حسب valueInputOption
+    """
+    option = getattr(value_input_option, 'value', value_input_option)
+    return _user_entered_text if option == 'USER_ENTERED' else _cell_text
+
+
+def _split_range(a1, default_sheet=None):
+    """
+    فصل اسم الورقة عن نطاق A1 مثل 'Bookings'!A2:J2
+    """
+    a1 = str(a1)
+    if '!' in a1:
+        sheet, cells = a1.rsplit('!', 1)
+        return _unquote(sheet), cells
+    if default_sheet is None:
+        # اسم الورقة وحده يعني الورقة كاملة
+        return _unquote(a1), None
+    return default_sheet, a1
+
+
+def _unquote(sheet):
+    if sheet.startswith("'") and sheet.endswith("'"):
+        return sheet[1:-1].replace("''", "'")
+    return sheet
+
+
+class FakeSheetsService:
+    """
+    خدمة Google Sheets محلية تحتفظ بجداول البيانات في الذاكرة.
+    تحاكي زمن كل استدعاء وحصص القراءة والكتابة لكل دقيقة (خطأ 429 عند تجاوزها)
+    وأخطاء الخادم، وتحسب عدد الاستدعاءات وحجم البيانات المنقولة لكل دالة،
+    فيمكن قياس أداء طبقة البيانات بنفس مسار الكود المستخدم مع Google.
+    """
+
+    def __init__(self, latency=None, read_quota=None, write_quota=None, error_rate=None, seed=None):
+        """
+        latency: زمن كل استدعاء بالثواني، أو قاموس {اسم الدالة: الزمن} مع المفتاح 'default'
+        read_quota / write_quota: عدد الطلبات المسموح بها في الدقيقة، أو None بلا حد
+        error_rate: نسبة الاستدعاءات التي تفشل عشوائياً بخطأ 503
+        """
+        self.latency = latency if latency is not None else config.FAKE_SHEETS_LATENCY
+        self.quotas = {
+            'read': read_quota if read_quota is not None else config.FAKE_SHEETS_QUOTA,
+            'write': write_quota if write_quota is not None else config.FAKE_SHEETS_QUOTA
+        }
+        self.error_rate = error_rate if error_rate is not None else config.FAKE_SHEETS_ERROR_RATE
+
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+        self._spreadsheets = {}
+        self._next_sheet_id = 0
+        self._requests = {'read': deque(), 'write': deque()}
+        self._injected = deque()
+
+        # الإحصائيات
+        self.calls = {}
+        self.bytes = {}
+        self.errors = {}
+
+    def client(self):
+        """
+        عميل متوافق مع gspread.Client مرتبط بهذه الخدمة
+        """
+        return FakeClient(self)
+
+    def create_spreadsheet(self, title, sheets=None):
+        """
+        إنشاء جدول بيانات بأوراق عمل من القيم {الاسم: [صف الرؤوس، الصفوف...]}
+        """
+        with self._lock:
+            spreadsheet = FakeSpreadsheet(self, title)
+            for name, values in (sheets or {}).items():
+                values = [[_cell_text(value) for value in row] for row in values]
+                width = max((len(row) for row in values), default=0)
+                spreadsheet._add(name, max(1000, len(values)), max(26, width)).values = values
+            self._spreadsheets[title] = spreadsheet
+            return spreadsheet
+
+    def _new_sheet_id(self):
+        with self._lock:
+            self._next_sheet_id += 1
+            return self._next_sheet_id
+
+    def inject_error(self, code=503, count=1, methods=None):
+        """
+        جعل الاستدعاءات التالية تفشل بخطأ محدد
+        methods: أسماء الدوال المستهدفة، أو None لأي استدعاء
+        """
+        with self._lock:
+            for _ in range(count):
+                self._injected.append((code, frozenset(methods) if methods else None))
+
+    def _latency_for(self, method):
+        if isinstance(self.latency, dict):
+            return self.latency.get(method, self.latency.get('default', 0))
+        return self.latency or 0
+
+    def _request(self, kind, method, payload=None):
+        """
+        محاكاة طلب HTTP واحد: الانتظار ثم فحص الحصة والأخطاء المحقونة
+        """
+        delay = self._latency_for(method)
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+            # الأخطاء المحقونة لهذه الدالة
+            for position, (code, methods) in enumerate(self._injected):
+                if methods is None or method in methods:
+                    del self._injected[position]
+                    self.errors[code] = self.errors.get(code, 0) + 1
+                    raise _api_error(code, f"Injected error on {method}")
+
+            # تجاوز حصة الطلبات في الدقيقة
+            quota = self.quotas[kind]
+            if quota is not None:
+                window = self._requests[kind]
+                now = time.monotonic()
+                while window and now - window[0] >= QUOTA_WINDOW:
+                    window.popleft()
+                if len(window) >= quota:
+                    self.errors[429] = self.errors.get(429, 0) + 1
+                    raise _api_error(429, f"Quota exceeded for quota metric '{kind.title()} requests'")
+                window.append(now)
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors[503] = self.errors.get(503, 0) + 1
+                raise _api_error(503, 'The service is currently unavailable.')
+
+            if payload is not None:
+                self._count_bytes(method, payload)
+
+    def _count_bytes(self, method, payload):
+        size = len(json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8'))
+        self.bytes[method] = self.bytes.get(method, 0) + size
+
+    def _respond(self, method, result):
+        """
+        حساب حجم الاستجابة وإرجاعها
+        """
+        with self._lock:
+            self._count_bytes(method, result)
+        return result
+
+    def get_stats(self):
+        """
+        عدد الاستدعاءات والبيانات المنقولة (بالبايت) لكل دالة وعدد الأخطاء حسب الرمز
+        """
+        with self._lock:
+            return {
+                'calls': dict(self.calls),
+                'total_calls': sum(self.calls.values()),
+                'bytes': dict(self.bytes),
+                'total_bytes': sum(self.bytes.values()),
+                'errors': dict(self.errors)
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = {}
+            self.bytes = {}
+            self.errors = {}
+
+
+class FakeClient:
+    """
+    بديل gspread.Client
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    def open(self, title, folder_id=None):
+        self.service._request('read', 'open')
+        spreadsheet = self.service._spreadsheets.get(title)
+        if spreadsheet is None:
+            raise SpreadsheetNotFound(title)
+        return spreadsheet
+
+    def create(self, title, folder_id=None):
+        self.service._request('write', 'create')
+        return self.service.create_spreadsheet(title)
+
+
+class FakeSpreadsheet:
+    """
+    بديل gspread.Spreadsheet
+    """
+
+    def __init__(self, service, title):
+        self.service = service
+        self.title = title
+        self.id = f"fake-{title}"
+        self._worksheets = []
+        self._updated_at = datetime.utcnow()
+
+    def _add(self, title, rows=1000, cols=26):
+        worksheet = FakeWorksheet(self, title, self.service._new_sheet_id(), rows, cols)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    def _touch(self):
+        """
+        تحديث وقت آخر تعديل بقيمة متزايدة دائماً
+        """
+        self._updated_at = max(datetime.utcnow(), self._updated_at + timedelta(microseconds=1))
+
+    def _find(self, title):
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise WorksheetNotFound(title)
+
+    def _by_id(self, sheet_id):
+        for worksheet in self._worksheets:
+            if worksheet.id == sheet_id:
+                return worksheet
+        raise _api_error(400, f"No grid with id: {sheet_id}")
+
+    def worksheet(self, title):
+        self.service._request('read', 'worksheet')
+        return self._find(title)
+
+    def get_worksheet(self, index):
+        self.service._request('read', 'get_worksheet')
+        return self._worksheets[index] if 0 <= index < len(self._worksheets) else None
+
+    def worksheets(self, exclude_hidden=False):
+        self.service._request('read', 'worksheets')
+        return list(self._worksheets)
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        self.service._request('write', 'add_worksheet', {'title': title})
+        with self.service._lock:
+            worksheet = self._add(title, rows, cols)
+            self._touch()
+            return worksheet
+
+    def del_worksheet(self, worksheet):
+        self.service._request('write', 'del_worksheet', {'sheetId': worksheet.id})
+        with self.service._lock:
+            self._worksheets.remove(worksheet)
+            self._touch()
+
+    def get_lastUpdateTime(self):
+        self.service._request('read', 'get_lastUpdateTime')
+        return self._updated_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    def values_get(self, range, params=None):
+        self.service._request('read', 'values_get')
+        return self.service._respond('values_get', self._value_range(range))
+
+    def values_batch_get(self, ranges, params=None):
+        self.service._request('read', 'values_batch_get')
+        result = {
+            'spreadsheetId': self.id,
+            'valueRanges': [self._value_range(a1) for a1 in ranges]
+        }
+        return self.service._respond('values_batch_get', result)
+
+    def _value_range(self, a1):
+        sheet, cells = _split_range(a1)
+        with self.service._lock:
+            values = self._find(sheet)._read(cells)
+        result = {'range': a1, 'majorDimension': 'ROWS'}
+        if values:
+            result['values'] = values
+        return result
+
+    def values_update(self, range, params=None, body=None):
+        self.service._request('write', 'values_update', body)
+        return self._write([{'range': range, 'values': (body or {}).get('values', [])}],
+                           (params or {}).get('valueInputOption'))
+
+    def values_batch_update(self, body=None):
+        self.service._request('write', 'values_batch_update', body)
+        return self._write((body or {}).get('data', []), (body or {}).get('valueInputOption'))
+
+    def _write(self, data, value_input_option=None):
+        convert = _input_text(value_input_option)
+        with self.service._lock:
+            # الطلب كله يفشل إذا تجاوز أحد النطاقات حدود الورقة
+            targets = []
+            for item in data:
+                sheet, cells = _split_range(item['range'])
+                worksheet = self._find(sheet)
+                worksheet._check_grid(cells, item.get('values', []))
+                targets.append((worksheet, cells, item.get('values', [])))
+            for worksheet, cells, values in targets:
+                worksheet._write(cells, values, convert)
+            self._touch()
+        return {'spreadsheetId': self.id, 'totalUpdatedCells': sum(
+            len(row) for item in data for row in item.get('values', []))}
+
+    def batch_update(self, body):
+        """
+        تنفيذ طلبات batchUpdate المستخدمة في المشروع: deleteDimension و updateCells و appendCells
+        يتم التحقق من جميع الطلبات قبل تنفيذ أي منها، فإذا كان أحدها غير صالح لا يتغير شيء كما في Sheets API
+        """
+        self.service._request('write', 'batch_update', body)
+        with self.service._lock:
+            for request in body.get('requests', []):
+                self._apply(request, validate=True)
+            for request in body.get('requests', []):
+                self._apply(request)
+            self._touch()
+        return {'spreadsheetId': self.id, 'replies': [{} for _ in body.get('requests', [])]}
+
+    def _apply(self, request, validate=False):
+        if 'deleteDimension' in request:
+            grid = request['deleteDimension']['range']
+            worksheet = self._by_id(grid['sheetId'])
+            if grid.get('dimension', 'ROWS') == 'ROWS' and not validate:
+                del worksheet.values[grid['startIndex']:grid['endIndex']]
+                worksheet.row_count = max(worksheet.row_count - (grid['endIndex'] - grid['startIndex']),
+                                          len(worksheet.values), 1)
+        elif 'updateCells' in request:
+            update = request['updateCells']
+            start = update['start']
+            worksheet = self._by_id(start['sheetId'])
+            rows = [[_entered_value(cell) for cell in row.get('values', [])] for row in update.get('rows', [])]
+            cells = rowcol_to_a1(start.get('rowIndex', 0) + 1, start.get('columnIndex', 0) + 1)
+            worksheet._check_grid(cells, rows)
+            if not validate:
+                worksheet._write(cells, rows)
+        elif 'appendCells' in request:
+            append = request['appendCells']
+            worksheet = self._by_id(append['sheetId'])
+            if not validate:
+                worksheet._append_values([
+                    [_entered_value(cell) for cell in row.get('values', [])] for row in append.get('rows', [])
+                ])
+        else:
+            raise _api_error(400, f"Unsupported request: {', '.join(request)}")
+
+
+def _entered_value(cell):
+    """
+    نص خلية CellData في طلبات updateCells و appendCells (stringValue يحفظ كما هو دون تحويل)
+    """
+    return _cell_text(next(iter(cell.get('userEnteredValue', {}).values()), ''))
+
+
+class FakeWorksheet:
+    """
+    بديل gspread.Worksheet يحفظ القيم كنصوص كما تعيدها الورقة
+    """
+
+    def __init__(self, spreadsheet, title, sheet_id, rows=1000, cols=26):
+        self.spreadsheet = spreadsheet
+        self.service = spreadsheet.service
+        self.title = title
+        self.id = sheet_id
+        self.spreadsheet_id = spreadsheet.id
+        self.values = []
+        self.frozen_rows = 0
+        # حجم الشبكة: الكتابة في نطاق خارجها تفشل، والإضافة في النهاية توسعها
+        self.row_count = rows
+        self.col_count = cols
+
+    def __repr__(self):
+        return f"<FakeWorksheet '{self.title}' id:{self.id}>"
+
+    # --- التخزين ---
+
+    def _width(self):
+        return max((len(row) for row in self.values), default=0)
+
+    def _grid(self, cells):
+        grid = a1_range_to_grid_range(cells) if cells else {}
+        end_col = grid['endColumnIndex'] if 'endColumnIndex' in grid else self._width()
+        return (
+            grid.get('startRowIndex', 0), grid.get('endRowIndex', len(self.values)),
+            grid.get('startColumnIndex', 0), end_col
+        )
+
+    def _read(self, cells=None):
+        """
+        قيم النطاق بدون الصفوف والأعمدة الفارغة في النهاية، كما يعيدها Sheets API
+        """
+        start_row, end_row, start_col, end_col = self._grid(cells)
+        values = []
+        for row in self.values[start_row:end_row]:
+            row = list(row[start_col:end_col])
+            while row and row[-1] == '':
+                row.pop()
+            values.append(row)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def _check_grid(self, cells, rows):
+        """
+        رفع خطأ 400 كما في Sheets API إذا تجاوز النطاق المكتوب حدود الشبكة
+        """
+        start_row, _, start_col, _ = self._grid(cells)
+        end_row = start_row + len(rows)
+        end_col = start_col + max((len(row) for row in rows), default=0)
+        if end_row > self.row_count or end_col > self.col_count:
+            raise _api_error(400, f"Range ('{self.title}'!{cells}) exceeds grid limits. "
+                                  f"Max rows: {self.row_count}, max columns: {self.col_count}")
+
+    def _write(self, cells, rows, convert=_cell_text):
+        start_row, _, start_col, _ = self._grid(cells)
+        for offset, row in enumerate(rows):
+            position = start_row + offset
+            while len(self.values) <= position:
+                self.values.append([])
+            target = self.values[position]
+            if len(target) < start_col + len(row):
+                target.extend([''] * (start_col + len(row) - len(target)))
+            for col, value in enumerate(row):
+                target[start_col + col] = convert(value)
+
+    def _append_values(self, rows):
+        """
+        الإضافة بعد آخر صف غير فارغ كما يفعل values.append، مع توسيع الشبكة إذا لزم
+        """
+        last = len(self.values)
+        while last and not any(value != '' for value in self.values[last - 1]):
+            last -= 1
+        del self.values[last:]
+        self.values.extend(rows)
+        self.row_count = max(self.row_count, len(self.values))
+        self.col_count = max(self.col_count, self._width())
+
+    def _padded(self, values):
+        width = max((len(row) for row in values), default=0)
+        return [row + [''] * (width - len(row)) for row in values]
+
+    # --- القراءة ---
+
+    def get_all_values(self, **kwargs):
+        self.service._request('read', 'get_all_values')
+        with self.service._lock:
+            values = self._padded(self._read())
+        return self.service._respond('get_all_values', values)
+
+    def get_values(self, range_name=None, **kwargs):
+        self.service._request('read', 'get_values')
+        with self.service._lock:
+            values = self._padded(self._read(range_name))
+        return self.service._respond('get_values', values)
+
+    def get(self, range_name=None, **kwargs):
+        self.service._request('read', 'get')
+        with self.service._lock:
+            values = self._read(range_name)
+        return self.service._respond('get', values)
+
+    def get_all_records(self, head=1, default_blank='', allow_underscores_in_numeric_literals=False,
+                        empty2zero=False, **kwargs):
+        self.service._request('read', 'get_all_records')
+        with self.service._lock:
+            values = self._padded(self._read())
+        self.service._respond('get_all_records', values)
+        if len(values) < head:
+            return []
+        rows = [
+            numericise_all(row, empty2zero, default_blank, allow_underscores_in_numeric_literals)
+            for row in values[head:]
+        ]
+        return to_records(values[head - 1], rows)
+
+    def row_values(self, row, **kwargs):
+        self.service._request('read', 'row_values')
+        with self.service._lock:
+            values = list(self.values[row - 1]) if row - 1 < len(self.values) else []
+        while values and values[-1] == '':
+            values.pop()
+        return self.service._respond('row_values', values)
+
+    def col_values(self, col, **kwargs):
+        self.service._request('read', 'col_values')
+        with self.service._lock:
+            values = [row[col - 1] if col - 1 < len(row) else '' for row in self.values]
+        while values and values[-1] == '':
+            values.pop()
+        return self.service._respond('col_values', values)
+
+    def find(self, query, in_row=None, in_column=None, case_sensitive=True):
+        self.service._request('read', 'find')
+        cells = self._search(query, in_row, in_column, case_sensitive)
+        self.service._respond('find', self.values)
+        return cells[0] if cells else None
+
+    def findall(self, query, in_row=None, in_column=None, case_sensitive=True):
+        self.service._request('read', 'findall')
+        self.service._respond('findall', self.values)
+        return self._search(query, in_row, in_column, case_sensitive)
+
+    def _search(self, query, in_row, in_column, case_sensitive):
+        if isinstance(query, re.Pattern):
+            match = lambda value: query.search(value) is not None
+        elif case_sensitive:
+            match = lambda value: value == str(query)
+        else:
+            match = lambda value: value.lower() == str(query).lower()
+
+        cells = []
+        with self.service._lock:
+            for row_number, row in enumerate(self.values, start=1):
+                if in_row is not None and row_number != in_row:
+                    continue
+                for col_number, value in enumerate(row, start=1):
+                    if in_column is not None and col_number != in_column:
+                        continue
+                    if match(value):
+                        cells.append(Cell(row_number, col_number, value))
+        return cells
+
+    # --- الكتابة ---
+
+    def update(self, values=None, range_name=None, raw=True, value_input_option=None, **kwargs):
+        # دعم ترتيب المعاملات القديم update('A1:J1', [[...]])
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        if values is not None and not isinstance(values, (list, tuple)):
+            values = [[values]]
+        self.service._request('write', 'update', values)
+        with self.service._lock:
+            self._check_grid(range_name or 'A1', values or [])
+            self._write(range_name or 'A1', values or [],
+                        _input_text(value_input_option or ('RAW' if raw else 'USER_ENTERED')))
+            self.spreadsheet._touch()
+        return {'updatedRange': range_name}
+
+    def update_cell(self, row, col, value):
+        self.service._request('write', 'update_cell', value)
+        with self.service._lock:
+            self._check_grid(rowcol_to_a1(row, col), [[value]])
+            self._write(rowcol_to_a1(row, col), [[value]], _user_entered_text)
+            self.spreadsheet._touch()
+        return {}
+
+    def batch_update(self, data, raw=True, value_input_option=None, **kwargs):
+        self.service._request('write', 'batch_update', data)
+        convert = _input_text(value_input_option or ('RAW' if raw else 'USER_ENTERED'))
+        with self.service._lock:
+            for item in data:
+                self._check_grid(item['range'], item.get('values', []))
+            for item in data:
+                self._write(item['range'], item.get('values', []), convert)
+            self.spreadsheet._touch()
+        return {}
+
+    def append_row(self, values, value_input_option='RAW', **kwargs):
+        return self._append('append_row', [values], value_input_option)
+
+    def append_rows(self, values, value_input_option='RAW', **kwargs):
+        return self._append('append_rows', values, value_input_option)
+
+    def _append(self, method, rows, value_input_option='RAW'):
+        self.service._request('write', method, rows)
+        convert = _input_text(value_input_option)
+        with self.service._lock:
+            self._append_values([[convert(value) for value in row] for row in rows])
+            self.spreadsheet._touch()
+        return {}
+
+    def delete_rows(self, start_index, end_index=None):
+        self.service._request('write', 'delete_rows')
+        with self.service._lock:
+            end_index = end_index or start_index
+            del self.values[start_index - 1:end_index]
+            self.row_count = max(self.row_count - (end_index - start_index + 1), len(self.values), 1)
+            self.spreadsheet._touch()
+        return {}
+
+    def clear(self):
+        self.service._request('write', 'clear')
+        with self.service._lock:
+            self.values = []
+            self.spreadsheet._touch()
+        return {}
+
+    def format(self, ranges, format):
+        self.service._request('write', 'format', format)
+        return {}
+
+    def freeze(self, rows=None, cols=None):
+        self.service._request('write', 'freeze')
+        if rows is not None:
+            self.frozen_rows = rows
+        return {}
+
+
+# تحويل DataFrame إلى قيم ورقة
+def frame_to_values(df):
+    """
+    تحويل DataFrame إلى قائمة قيم: صف الرؤوس ثم الصفوف، بالنصوص كما تظهر في الورقة
+    """
+    return [list(df.columns)] + [[_cell_text(value) for value in row] for row in df.itertuples(index=False)]
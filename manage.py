@@ -3,13 +3,14 @@
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 
 import config
 from utils import create_success_message, create_error_message, format_date
 import sheets_api
+from sheets_metrics import traced_action
 
+@traced_action
 def render_manage_page():
     """
     عرض صفحة إدارة الحجوزات
@@ -20,28 +21,19 @@ def render_manage_page():
     في هذه الصفحة يمكنك عرض وإدارة الحجوزات الحالية.
     """)
     
-    # الحصول على جميع الحجوزات
-    bookings = sheets_api.get_bookings()
+    # الحصول على جميع الحجوزات كسجلات Booking
+    bookings = sheets_api.get_booking_records()
     
     if not bookings:
         st.info("لا توجد حجوزات حالية.")
         return
     
-    # تحويل البيانات إلى DataFrame
-    df = pd.DataFrame(bookings)
-    
-    # إضافة عمود لتنسيق التاريخ
-    if "booking_date" in df.columns:
-        df["booking_date_formatted"] = df["booking_date"].apply(format_date)
-    
-    # إضافة عمود لترجمة الحالة
-    if "status" in df.columns:
-        status_map = {
-            "Confirmed": "مؤكد",
-            "Cancelled": "ملغي",
-            "Rescheduled": "مرحل"
-        }
-        df["status_ar"] = df["status"].map(status_map)
+    # ترجمة الحالة الموحدة (confirmed و cancelled و rescheduled)
+    status_map = {
+        "confirmed": "مؤكد",
+        "cancelled": "ملغي",
+        "rescheduled": "مرحل"
+    }
     
     # تصفية الحجوزات حسب الحالة
     status_filter = st.selectbox(
@@ -51,40 +43,38 @@ def render_manage_page():
     )
     
     if status_filter != "الكل":
-        status_en = {v: k for k, v in status_map.items()}.get(status_filter)
-        filtered_df = df[df["status"] == status_en]
+        status_code = {v: k for k, v in status_map.items()}.get(status_filter)
+        filtered_bookings = [booking for booking in bookings if booking.status_code == status_code]
     else:
-        filtered_df = df
+        filtered_bookings = bookings
     
     # البحث عن حجز
     search_query = st.text_input("البحث عن حجز (اسم الشركة، اسم المشروع، رقم الحجز)")
     
     if search_query:
-        # البحث في عدة أعمدة
-        search_columns = ["booking_id", "company_name", "project_name", "representative_name"]
-        search_mask = pd.Series(False, index=filtered_df.index)
-        
-        for column in search_columns:
-            if column in filtered_df.columns:
-                search_mask = search_mask | filtered_df[column].astype(str).str.contains(search_query, case=False)
-        
-        filtered_df = filtered_df[search_mask]
+        # البحث في عدة حقول
+        query = search_query.casefold()
+        filtered_bookings = [
+            booking for booking in filtered_bookings
+            if any(query in value.casefold() for value in (
+                booking.booking_id, booking.company_name, booking.project_name, booking.representative_name))
+        ]
     
     # عرض الحجوزات
-    if not filtered_df.empty:
-        st.markdown(f"### الحجوزات ({len(filtered_df)})")
+    if filtered_bookings:
+        st.markdown(f"### الحجوزات ({len(filtered_bookings)})")
         
-        for _, booking in filtered_df.iterrows():
+        for booking in filtered_bookings:
             # تحديد لون حالة الحجز
             status_class = {
-                "Confirmed": "booking-status-confirmed",
-                "Cancelled": "booking-status-cancelled",
-                "Rescheduled": "booking-status-rescheduled"
-            }.get(booking["status"], "")
+                "confirmed": "booking-status-confirmed",
+                "cancelled": "booking-status-cancelled",
+                "rescheduled": "booking-status-rescheduled"
+            }.get(booking.status_code, "")
             
             # تنسيق التاريخ
-            date_obj = datetime.strptime(booking["booking_date"], "%Y-%m-%d").date()
-            day_name = date_obj.strftime("%A")
+            date_obj = booking.booking_date
+            day_name = date_obj.strftime("%A") if date_obj else ""
             day_name_ar = {
                 "Saturday": "السبت",
                 "Sunday": "الأحد",
@@ -94,18 +84,18 @@ def render_manage_page():
                 "Thursday": "الخميس",
                 "Friday": "الجمعة"
             }.get(day_name, day_name)
-            date_formatted = date_obj.strftime("%d/%m/%Y")
+            date_formatted = date_obj.strftime("%d/%m/%Y") if date_obj else ""
             
             # عرض بطاقة الحجز
             st.markdown(f"""
             <div class="booking-card">
-                <div class="booking-header">{booking["company_name"]} - {booking["project_name"]}</div>
-                <div class="booking-info">رقم الحجز: {booking["booking_id"]}</div>
-                <div class="booking-info">اسم المنطقة: {booking["area_name"]}</div>
-                <div class="booking-info">اسم ممثل الشركة: {booking["representative_name"]}</div>
+                <div class="booking-header">{booking.company_name} - {booking.project_name}</div>
+                <div class="booking-info">رقم الحجز: {booking.booking_id}</div>
+                <div class="booking-info">اسم المنطقة: {booking.area_name}</div>
+                <div class="booking-info">اسم ممثل الشركة: {booking.representative_name}</div>
                 <div class="booking-info">تاريخ الحجز: {day_name_ar} - {date_formatted}</div>
-                <div class="booking-info">وقت الحجز: {booking["booking_time"]}</div>
-                <div class="booking-info">حالة الحجز: <span class="{status_class}">{booking.get("status_ar", booking["status"])}</span></div>
+                <div class="booking-info">وقت الحجز: {booking.booking_time}</div>
+                <div class="booking-info">حالة الحجز: <span class="{status_class}">{status_map.get(booking.status_code, booking.status)}</span></div>
             </div>
             """, unsafe_allow_html=True)
             
@@ -113,18 +103,18 @@ def render_manage_page():
             col1, col2 = st.columns(2)
             
             with col1:
-                if booking["status"] == "Confirmed":
-                    if st.button(f"ترحيل الموعد", key=f"reschedule_{booking['booking_id']}"):
+                if booking.is_confirmed:
+                    if st.button(f"ترحيل الموعد", key=f"reschedule_{booking.booking_id}"):
                         # تخزين معرف الحجز في حالة الجلسة
-                        st.session_state.selected_booking_id = booking["booking_id"]
+                        st.session_state.selected_booking_id = booking.booking_id
                         st.session_state.page = "reschedule"
                         st.rerun()
             
             with col2:
-                if booking["status"] == "Confirmed":
-                    if st.button(f"إلغاء الحجز", key=f"cancel_{booking['booking_id']}"):
+                if booking.is_confirmed:
+                    if st.button(f"إلغاء الحجز", key=f"cancel_{booking.booking_id}"):
                         # تخزين معرف الحجز في حالة الجلسة
-                        st.session_state.selected_booking_id = booking["booking_id"]
+                        st.session_state.selected_booking_id = booking.booking_id
                         st.session_state.page = "cancel"
                         st.rerun()
             
@@ -0,0 +1,302 @@
+"""
+وحدة سجلات البيانات: الحجز والموعد والشركة والمشروع
+كل سجل كائن صغير بـ __slots__ يقرأ من صف الورقة مرة واحدة، بأسماء حقول موحدة
+سواء جاء من ورقة الحجوزات (company_name) أو من ورقة مواعيد العروض (Company Name)
+"""
+
+from datetime import date, datetime
+from itertools import repeat
+
+import pandas as pd
+
+from sheet_schema import parse_bool
+
+# حالات الحجز في الورقتين وما يقابلها
+STATUS_CODES = {
+    'مؤكد': 'confirmed',
+    'ملغي': 'cancelled',
+    'مرحل': 'rescheduled',
+    'Confirmed': 'confirmed',
+    'Cancelled': 'cancelled',
+    'Rescheduled': 'rescheduled'
+}
+
+# حقول الحجز حسب أعمدة ورقة الحجوزات
+BOOKING_COLUMNS = {
+    'booking_id': 'booking_id',
+    'company_name': 'company_name',
+    'area_name': 'area_name',
+    'project_name': 'project_name',
+    'company_representative': 'representative_name',
+    'representative_name': 'representative_name',
+    'contact_info': 'contact_info',
+    'booking_date': 'booking_date',
+    'booking_time': 'booking_time',
+    'status': 'status',
+    'notes': 'notes'
+}
+
+# حقول الحجز حسب أعمدة ورقة مواعيد العروض في SheetsIntegration
+APPOINTMENT_COLUMNS = {
+    'ID': 'booking_id',
+    'Company Name': 'company_name',
+    'Project Name': 'project_name',
+    'Area': 'area_name',
+    'Presentation Date': 'booking_date',
+    'Time': 'booking_time',
+    'Developer Representative': 'representative_name',
+    'Status': 'status',
+    'Created At': 'created_at',
+    'Updated At': 'updated_at'
+}
+
+# حقول الموعد حسب أعمدة ورقة المواعيد المتاحة (booking_date و slot_date في الأوراق القديمة)
+SLOT_COLUMNS = {
+    'date': 'date',
+    'booking_date': 'date',
+    'slot_date': 'date',
+    'time': 'time',
+    'is_available': 'is_available',
+    'booking_id': 'booking_id'
+}
+
+COMPANY_COLUMNS = {
+    'company_id': 'company_id',
+    'company_name': 'company_name',
+    'area_name': 'area_name'
+}
+
+PROJECT_COLUMNS = {
+    'project_id': 'project_id',
+    'project_name': 'project_name',
+    'company_id': 'company_id',
+    'company_name': 'company_name',
+    'area_name': 'area_name'
+}
+
+
+def to_date(value):
+    """
+    تحويل قيمة تاريخ من الورقة (نص YYYY-MM-DD أو Timestamp) إلى date، أو None إذا كانت فارغة أو غير صالحة
+    """
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value).strip()[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def to_datetime(value):
+    """
+    تحويل قيمة وقت من الورقة (نص YYYY-MM-DD HH:MM:SS أو Timestamp) إلى datetime، أو None
+    """
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(str(value).strip(), "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def _text(value):
+    if value is None or value is pd.NA or (isinstance(value, float) and pd.isna(value)):
+        return ''
+    return str(value)
+
+
+class Record:
+    """
+    أساس السجلات: الحقول في __slots__، والقيم النصية الفارغة كنص فارغ
+    الحقول التي تحتاج تحويلاً خاصاً تعرف في _converters
+    """
+
+    __slots__ = ()
+
+    _converters = {}
+
+    def __init__(self, **values):
+        for field in self.__slots__:
+            value = values.get(field)
+            convert = self._converters.get(field, _text)
+            setattr(self, field, convert(value))
+
+    @classmethod
+    def from_row(cls, row, columns):
+        """
+        قراءة سجل من قاموس صف، حيث columns تربط أسماء أعمدة الورقة بأسماء الحقول
+        """
+        values = {}
+        for column, value in row.items():
+            field = columns.get(column)
+            if field is not None and field not in values:
+                values[field] = value
+        return cls(**values)
+
+    @classmethod
+    def from_frame(cls, df, columns):
+        """
+        قراءة قائمة سجلات من DataFrame عموداً بعمود، دون المرور بـ iterrows أو to_dict('records')
+        كل عمود يحول مرة واحدة، ثم تكتب القيم في الحقول مباشرة
+        """
+        fields = []
+        values = []
+        for column in df.columns:
+            field = columns.get(column)
+            if field is not None and field not in fields:
+                fields.append(field)
+                values.append(cls._convert_column(field, df[column]))
+
+        # الحقول التي ليس لها عمود تأخذ القيمة الفارغة
+        for field in cls.__slots__:
+            if field not in fields:
+                fields.append(field)
+                values.append(repeat(cls._converters.get(field, _text)(None), len(df)))
+
+        setters = [getattr(cls, field).__set__ for field in fields]
+        new = object.__new__
+        records = []
+        for row in zip(*values):
+            record = new(cls)
+            for setter, value in zip(setters, row):
+                setter(record, value)
+            records.append(record)
+        return records
+
+    @classmethod
+    def _convert_column(cls, field, column):
+        convert = cls._converters.get(field, _text)
+        if convert is to_date and pd.api.types.is_datetime64_any_dtype(column):
+            return [None if value is pd.NaT else value.date() for value in column.tolist()]
+        if convert is _text and isinstance(column.dtype, (pd.CategoricalDtype, pd.StringDtype)) and not column.hasnans:
+            return column.tolist()
+        return [convert(value) for value in column.tolist()]
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        values = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class Booking(Record):
+    """
+    حجز واحد، من ورقة الحجوزات أو من ورقة مواعيد العروض
+    """
+
+    __slots__ = ('booking_id', 'company_name', 'area_name', 'project_name', 'representative_name',
+                 'contact_info', 'booking_date', 'booking_time', 'status', 'notes', 'created_at', 'updated_at')
+
+    _converters = {
+        'booking_date': to_date,
+        'created_at': to_datetime,
+        'updated_at': to_datetime
+    }
+
+    @classmethod
+    def from_row(cls, row, columns=BOOKING_COLUMNS):
+        return super().from_row(row, columns)
+
+    @classmethod
+    def from_frame(cls, df, columns=BOOKING_COLUMNS):
+        return super().from_frame(df, columns)
+
+    @classmethod
+    def from_appointment(cls, row):
+        """
+        قراءة حجز من صف في ورقة مواعيد العروض
+        """
+        return super().from_row(row, APPOINTMENT_COLUMNS)
+
+    @classmethod
+    def from_appointments(cls, df):
+        return super().from_frame(df, APPOINTMENT_COLUMNS)
+
+    @property
+    def status_code(self):
+        """
+        الحالة موحدة بين الورقتين: 'confirmed' أو 'cancelled' أو 'rescheduled'
+        """
+        return STATUS_CODES.get(self.status, self.status)
+
+    @property
+    def is_confirmed(self):
+        return self.status_code == 'confirmed'
+
+    @property
+    def date_str(self):
+        """
+        تاريخ الحجز بصيغة الورقة YYYY-MM-DD
+        """
+        return self.booking_date.strftime("%Y-%m-%d") if self.booking_date else ''
+
+
+class Slot(Record):
+    """
+    موعد واحد من ورقة المواعيد المتاحة
+    """
+
+    __slots__ = ('date', 'time', 'is_available', 'booking_id')
+
+    _converters = {
+        'date': to_date,
+        'is_available': parse_bool
+    }
+
+    @classmethod
+    def from_row(cls, row, columns=SLOT_COLUMNS):
+        return super().from_row(row, columns)
+
+    @classmethod
+    def from_frame(cls, df, columns=SLOT_COLUMNS):
+        return super().from_frame(df, columns)
+
+    @property
+    def date_str(self):
+        return self.date.strftime("%Y-%m-%d") if self.date else ''
+
+
+class Company(Record):
+    """
+    شركة تطوير عقاري من ورقة الشركات
+    """
+
+    __slots__ = ('company_id', 'company_name', 'area_name')
+
+    @classmethod
+    def from_row(cls, row, columns=COMPANY_COLUMNS):
+        return super().from_row(row, columns)
+
+    @classmethod
+    def from_frame(cls, df, columns=COMPANY_COLUMNS):
+        return super().from_frame(df, columns)
+
+
+class Project(Record):
+    """
+    مشروع من ورقة المشاريع
+    """
+
+    __slots__ = ('project_id', 'project_name', 'company_id', 'company_name', 'area_name')
+
+    @classmethod
+    def from_row(cls, row, columns=PROJECT_COLUMNS):
+        return super().from_row(row, columns)
+
+    @classmethod
+    def from_frame(cls, df, columns=PROJECT_COLUMNS):
+        return super().from_frame(df, columns)
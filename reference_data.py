@@ -0,0 +1,107 @@
+"""
+وحدة البيانات المرجعية: الشركات والمشاريع مع فهارس الربط بينها
+تبنى الفهارس مرة واحدة عند التحميل، فتكون قوائم الاختيار المتتابعة (المنطقة ثم الشركة ثم المشروع)
+بحثاً في الذاكرة دون أي طلب إلى Google Sheets
+"""
+
+from records import Company, Project
+
+
+class ReferenceData:
+    """
+    الشركات والمشاريع وفهارسها (للقراءة فقط)
+    company_id ← الشركة، company_id ← مشاريعها، المنطقة ← مشاريعها وشركاتها
+    المشاريع التي لا تحمل company_id تربط بالشركة عن طريق اسمها
+    """
+
+    def __init__(self, companies=None, projects=None):
+        """
+        companies و projects: DataFrame لورقتي Companies و Projects كما تقرأ من المصدر
+        """
+        self.companies_frame = companies
+        self.projects_frame = projects
+
+        self.companies = Company.from_frame(companies) if companies is not None else []
+        self.projects = Project.from_frame(projects) if projects is not None else []
+
+        self._companies_by_id = {}
+        self._companies_by_name = {}
+        self._projects_by_company = {}
+        self._projects_by_company_name = {}
+        self._projects_by_area = {}
+        self._companies_by_area = {}
+
+        for company in self.companies:
+            if company.company_id:
+                self._companies_by_id.setdefault(company.company_id, company)
+            self._companies_by_name.setdefault(company.company_name, company)
+            self._companies_by_area.setdefault(company.area_name, []).append(company)
+
+        for project in self.projects:
+            company_id = project.company_id or self._company_id_by_name(project.company_name)
+            if company_id:
+                self._projects_by_company.setdefault(company_id, []).append(project)
+            company_name = project.company_name or self._company_name(company_id)
+            if company_name:
+                self._projects_by_company_name.setdefault(company_name, []).append(project)
+            area = project.area_name or self._company_area(company_id, company_name)
+            self._projects_by_area.setdefault(area, []).append(project)
+
+    def _company_id_by_name(self, name):
+        company = self._companies_by_name.get(name)
+        return company.company_id if company is not None else ''
+
+    def _company_name(self, company_id):
+        company = self._companies_by_id.get(company_id)
+        return company.company_name if company is not None else ''
+
+    def _company_area(self, company_id, company_name):
+        company = self._companies_by_id.get(company_id) or self._companies_by_name.get(company_name)
+        return company.area_name if company is not None else ''
+
+    def company(self, company_id):
+        """
+        الشركة حسب المعرف، أو None
+        """
+        return self._companies_by_id.get(str(company_id))
+
+    def company_by_name(self, name):
+        """
+        الشركة حسب الاسم، أو None
+        """
+        return self._companies_by_name.get(name)
+
+    def projects_for_company(self, company_id):
+        """
+        مشاريع الشركة حسب معرفها
+        """
+        return list(self._projects_by_company.get(str(company_id), []))
+
+    def projects_of(self, company):
+        """
+        مشاريع سجل شركة، بالمعرف إن وجد وإلا بالاسم (ورقة شركات بدون company_id)
+        """
+        if company.company_id:
+            return self.projects_for_company(company.company_id)
+        return list(self._projects_by_company_name.get(company.company_name, []))
+
+    def projects_in_area(self, area):
+        """
+        المشاريع في المنطقة
+        """
+        return list(self._projects_by_area.get(area, []))
+
+    def companies_in_area(self, area):
+        """
+        الشركات في المنطقة
+        """
+        return list(self._companies_by_area.get(area, []))
+
+    def areas(self):
+        """
+        أسماء المناطق مرتبة، من الشركات والمشاريع
+        """
+        return sorted(area for area in set(self._companies_by_area) | set(self._projects_by_area) if area)
+
+    def is_empty(self):
+        return not self.companies and not self.projects
@@ -3,13 +3,13 @@
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 
-import config
 from utils import create_success_message, create_error_message, format_date
 import sheets_api
+from sheets_metrics import traced_action
 
+@traced_action
 def render_reschedule_page():
     """
     عرض صفحة ترحيل موعد الحجز
@@ -30,7 +30,7 @@ def render_reschedule_page():
     booking_id = st.session_state.selected_booking_id
     
     # الحصول على بيانات الحجز
-    booking = sheets_api.get_booking_by_id(booking_id)
+    booking = sheets_api.get_booking_record(booking_id)
     
     if not booking:
         st.error("لم يتم العثور على الحجز المحدد.")
@@ -46,8 +46,8 @@ def render_reschedule_page():
     st.markdown("### بيانات الحجز الحالي")
     
     # تنسيق التاريخ
-    date_obj = datetime.strptime(booking["booking_date"], "%Y-%m-%d").date()
-    day_name = date_obj.strftime("%A")
+    date_obj = booking.booking_date
+    day_name = date_obj.strftime("%A") if date_obj else ""
     day_name_ar = {
         "Saturday": "السبت",
         "Sunday": "الأحد",
@@ -57,42 +57,33 @@ def render_reschedule_page():
         "Thursday": "الخميس",
         "Friday": "الجمعة"
     }.get(day_name, day_name)
-    date_formatted = date_obj.strftime("%d/%m/%Y")
+    date_formatted = date_obj.strftime("%d/%m/%Y") if date_obj else ""
     
     st.markdown(f"""
     <div class="booking-card">
-        <div class="booking-header">{booking["company_name"]} - {booking["project_name"]}</div>
-        <div class="booking-info">رقم الحجز: {booking["booking_id"]}</div>
-        <div class="booking-info">اسم المنطقة: {booking["area_name"]}</div>
-        <div class="booking-info">اسم ممثل الشركة: {booking["representative_name"]}</div>
+        <div class="booking-header">{booking.company_name} - {booking.project_name}</div>
+        <div class="booking-info">رقم الحجز: {booking.booking_id}</div>
+        <div class="booking-info">اسم المنطقة: {booking.area_name}</div>
+        <div class="booking-info">اسم ممثل الشركة: {booking.representative_name}</div>
         <div class="booking-info">تاريخ الحجز الحالي: {day_name_ar} - {date_formatted}</div>
-        <div class="booking-info">وقت الحجز: {booking["booking_time"]}</div>
+        <div class="booking-info">وقت الحجز: {booking.booking_time}</div>
     </div>
     """, unsafe_allow_html=True)
     
     # نموذج ترحيل الموعد
     st.markdown("### اختيار موعد جديد")
     
-    # الحصول على المواعيد المتاحة
-    available_slots = sheets_api.get_available_slots()
+    # الحصول على المواعيد كسجلات Slot
+    slots = sheets_api.get_slot_records()
     
-    # تحويل البيانات إلى DataFrame
-    if available_slots:
-        df = pd.DataFrame(available_slots)
-        
-        # تصفية المواعيد المتاحة فقط
-        df = df[df["is_available"] == "Yes"]
-        
-        # ترتيب المواعيد حسب التاريخ
-        df = df.sort_values(by="slot_date")
-        
-        # إنشاء قائمة بالتواريخ المتاحة
-        available_dates = df["slot_date"].unique().tolist()
+    if slots:
+        # إنشاء قائمة مرتبة بتواريخ المواعيد المتاحة فقط
+        available_dates = sorted({slot.date for slot in slots if slot.is_available and slot.date})
         
         # تنسيق التواريخ لعرضها في القائمة المنسدلة
         date_options = []
-        for date_str in available_dates:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+        for date_obj in available_dates:
+            date_str = date_obj.strftime("%Y-%m-%d")
             day_name = date_obj.strftime("%A")
             
             # ترجمة اسم اليوم إلى العربية
@@ -121,13 +112,14 @@ def render_reschedule_page():
             new_booking_date = date_dict[selected_date_label]
             
             # عرض وقت الحجز (ثابت)
-            st.info(f"وقت الحجز: {config.BOOKING_TIME}")
-            new_booking_time = config.BOOKING_TIME
+            booking_time = sheets_api.get_app_settings().booking_time
+            st.info(f"وقت الحجز: {booking_time}")
+            new_booking_time = booking_time
             
             # زر تأكيد الترحيل
             if st.button("تأكيد ترحيل الموعد"):
                 # التحقق من أن التاريخ الجديد مختلف عن التاريخ الحالي
-                if new_booking_date == booking["booking_date"]:
+                if new_booking_date == booking.date_str:
                     st.error("التاريخ الجديد هو نفس التاريخ الحالي. يرجى اختيار تاريخ آخر.")
                 else:
                     # تحديث بيانات الحجز
@@ -140,7 +132,7 @@ def render_reschedule_page():
                     # تحديث الحجز
                     update_result = sheets_api.update_booking(booking_id, updated_data)
                     
-                    if update_result:
+                    if update_result is not False:
                         st.success("تم ترحيل الموعد بنجاح!")
                         
                         # تنسيق التاريخ الجديد
@@ -162,10 +154,10 @@ def render_reschedule_page():
                         
                         st.markdown(f"""
                         <div class="booking-card">
-                            <div class="booking-header">{booking["company_name"]} - {booking["project_name"]}</div>
-                            <div class="booking-info">رقم الحجز: {booking["booking_id"]}</div>
-                            <div class="booking-info">اسم المنطقة: {booking["area_name"]}</div>
-                            <div class="booking-info">اسم ممثل الشركة: {booking["representative_name"]}</div>
+                            <div class="booking-header">{booking.company_name} - {booking.project_name}</div>
+                            <div class="booking-info">رقم الحجز: {booking.booking_id}</div>
+                            <div class="booking-info">اسم المنطقة: {booking.area_name}</div>
+                            <div class="booking-info">اسم ممثل الشركة: {booking.representative_name}</div>
                             <div class="booking-info">تاريخ الحجز الجديد: {new_day_name_ar} - {new_date_formatted}</div>
                             <div class="booking-info">وقت الحجز: {new_booking_time}</div>
                             <div class="booking-info">حالة الحجز: <span class="booking-status-confirmed">مؤكد</span></div>
@@ -0,0 +1,109 @@
+"""
+وحدة فهرسة أرقام الصفوف في أوراق العمل حسب عمود المفتاح
+"""
+
+import threading
+import time
+
+
+class RowIndex:
+    """
+    فهرس في الذاكرة من قيمة عمود المفتاح إلى رقم الصف في الورقة.
+    يتم بناؤه من قراءة عمود واحد، ويتم تحديثه عند الإضافة والحذف
+    حتى لا يحتاج البحث عن صف إلى أي استدعاء لـ API.
+    """
+
+    def __init__(self, key_column=1, header_rows=1, ttl=None):
+        self.key_column = key_column
+        self.header_rows = header_rows
+        self.ttl = ttl
+
+        self._lock = threading.RLock()
+        self._rows = None
+        self._row_count = 0
+        self._loaded_at = None
+
+    def is_loaded(self):
+        """
+        التحقق من أن الفهرس مبني وما زال صالحاً
+        """
+        with self._lock:
+            if self._rows is None:
+                return False
+            if self.ttl is not None and time.monotonic() - self._loaded_at >= self.ttl:
+                return False
+            return True
+
+    def build(self, keys):
+        """
+        بناء الفهرس من قيم عمود المفتاح (بدون صفوف الرؤوس)
+        """
+        with self._lock:
+            rows = {}
+            for position, key in enumerate(keys):
+                # في حالة تكرار المفتاح، يتم اعتماد الصف الأول كما تفعل find()
+                rows.setdefault(str(key), position + self.header_rows + 1)
+            self._rows = rows
+            self._row_count = len(keys)
+            self._loaded_at = time.monotonic()
+
+    def load(self, worksheet):
+        """
+        بناء الفهرس بقراءة عمود المفتاح فقط من ورقة العمل
+        """
+        values = worksheet.col_values(self.key_column)
+        self.build(values[self.header_rows:])
+
+    def get(self, key):
+        """
+        الحصول على رقم الصف لمفتاح معين أو None إذا لم يكن موجوداً
+        """
+        with self._lock:
+            if self._rows is None:
+                return None
+            return self._rows.get(str(key))
+
+    def next_row(self):
+        """
+        رقم الصف التالي بعد آخر صف بيانات
+        """
+        with self._lock:
+            return self.header_rows + self._row_count + 1
+
+    def on_append(self, key):
+        """
+        تسجيل صف جديد أضيف في نهاية الورقة وإرجاع رقمه
+        """
+        with self._lock:
+            if self._rows is None:
+                return None
+            row = self.next_row()
+            self._rows.setdefault(str(key), row)
+            self._row_count += 1
+            return row
+
+    def on_delete(self, start_row, count=1):
+        """
+        تحديث الفهرس بعد حذف صفوف متتالية بدءاً من start_row
+        """
+        with self._lock:
+            if self._rows is None:
+                return
+            end_row = start_row + count
+            rows = {}
+            for key, row in self._rows.items():
+                if row < start_row:
+                    rows[key] = row
+                elif row >= end_row:
+                    rows[key] = row - count
+            self._rows = rows
+            self._row_count = max(0, self._row_count - count)
+
+    def invalidate(self):
+        """
+        إبطال الفهرس لإجبار إعادة بنائه عند البحث التالي
+        """
+        with self._lock:
+            self._rows = None
+            self._row_count = 0
+            self._loaded_at = None
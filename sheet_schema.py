@@ -0,0 +1,219 @@
+"""
+وحدة أنواع أعمدة الأوراق: تحويل القيم النصية مرة واحدة عند التحميل إلى أنواع مضغوطة
+(تواريخ datetime64، وفئات للقيم المتكررة، وقيم منطقية، ونصوص للمعرفات)،
+والتحويل العكسي إلى قيم الورقة عند إرجاع السجلات أو الكتابة
+"""
+
+import pandas as pd
+
+# أنواع الأعمدة
+STRING = 'string'
+CATEGORY = 'category'
+DATE = 'date'
+DATETIME = 'datetime'
+BOOL = 'bool'
+
+# القيم النصية التي تعني "نعم" في أعمدة القيم المنطقية
+TRUE_VALUES = frozenset({'TRUE', 'YES', '1', '1.0', 'نعم'})
+
+# صيغ التواريخ كما تكتب في الورقة
+DATE_FORMAT = '%Y-%m-%d'
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# ورقة الحجوزات
+BOOKINGS_SCHEMA = {
+    'booking_id': STRING,
+    'company_name': CATEGORY,
+    'area_name': CATEGORY,
+    'project_name': CATEGORY,
+    'booking_date': DATE,
+    'booking_time': CATEGORY,
+    'status': CATEGORY
+}
+
+# ورقة المواعيد المتاحة
+SLOTS_SCHEMA = {
+    'date': DATE,
+    'booking_date': DATE,
+    'slot_date': DATE,
+    'time': CATEGORY,
+    'is_available': BOOL,
+    'booking_id': STRING
+}
+
+# ورقة مواعيد العروض في SheetsIntegration
+APPOINTMENTS_SCHEMA = {
+    'ID': STRING,
+    'Company Name': CATEGORY,
+    'Project Name': CATEGORY,
+    'Area': CATEGORY,
+    'Presentation Date': DATE,
+    'Time': CATEGORY,
+    'Status': CATEGORY,
+    'Created At': DATETIME,
+    'Updated At': DATETIME
+}
+
+# أنواع الأعمدة حسب اسم الورقة
+SHEET_SCHEMAS = {
+    'Bookings': BOOKINGS_SCHEMA,
+    'Available_Slots': SLOTS_SCHEMA,
+    'Appointments': APPOINTMENTS_SCHEMA
+}
+
+
+def parse_bool(value):
+    """
+    تحويل قيمة منطقية كما تظهر في الورقة (True أو TRUE أو Yes أو 1) إلى True/False
+    """
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().upper() in TRUE_VALUES
+
+
+def _text(column):
+    """
+    قيم العمود كنصوص، والخلايا المفقودة كنص فارغ
+    """
+    return column.where(column.notna(), '').astype(str)
+
+
+def _convert(column, kind):
+    if kind == DATE or kind == DATETIME:
+        if pd.api.types.is_datetime64_any_dtype(column):
+            return column
+        return pd.to_datetime(_text(column), errors='coerce', format='ISO8601')
+    if kind == BOOL:
+        if pd.api.types.is_bool_dtype(column):
+            return column
+        return _text(column).str.strip().str.upper().isin(TRUE_VALUES)
+    if kind == CATEGORY:
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return column
+        return _text(column).astype('category')
+    if kind == STRING:
+        if isinstance(column.dtype, pd.StringDtype):
+            return column
+        return _text(column).astype('string')
+    return column
+
+
+def apply_schema(df, schema):
+    """
+    تحويل أعمدة DataFrame الموجودة في schema إلى أنواعها، وإرجاع DataFrame جديد
+    التواريخ غير الصالحة تصبح NaT، والأعمدة غير المذكورة تبقى كما هي
+    """
+    columns = [column for column in df.columns if column in schema]
+    if not columns:
+        return df
+
+    df = df.copy(deep=False)
+    for column in columns:
+        df[column] = _convert(df[column], schema[column])
+    return df
+
+
+def to_typed(kind, value):
+    """
+    تحويل قيمة واحدة من قيم الورقة إلى نوع العمود
+    """
+    if kind == DATE or kind == DATETIME:
+        return pd.to_datetime(value, errors='coerce', format='ISO8601') if value not in (None, '') else pd.NaT
+    if kind == BOOL:
+        return parse_bool(value)
+    if kind in (CATEGORY, STRING):
+        return '' if value is None else str(value)
+    return value
+
+
+def to_sheet_value(value, kind=None):
+    """
+    تحويل قيمة من عمود محول إلى قيمتها كما تظهر في الورقة
+    """
+    if value is None or value is pd.NA or value is pd.NaT:
+        return ''
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(DATETIME_FORMAT if kind == DATETIME else DATE_FORMAT)
+    if kind == BOOL or isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and pd.isna(value):
+        return ''
+    return value
+
+
+def to_sheet_record(record, schema):
+    """
+    تحويل قاموس صف من DataFrame محول إلى قيم الورقة (التواريخ كنص YYYY-MM-DD وهكذا)
+    """
+    return {column: to_sheet_value(value, schema.get(column)) for column, value in record.items()}
+
+
+def to_sheet_records(df, schema):
+    return [to_sheet_record(record, schema) for record in df.to_dict('records')]
+
+
+def format_dates(column, kind=DATE):
+    """
+    تحويل عمود تواريخ محول إلى نصوص بصيغة الورقة (النص الفارغ للتواريخ المفقودة)
+    """
+    if not pd.api.types.is_datetime64_any_dtype(column):
+        return _text(column)
+    return column.dt.strftime(DATETIME_FORMAT if kind == DATETIME else DATE_FORMAT).fillna('')
+
+
+def key_mask(df, column, key, schema):
+    """
+    قناع الصفوف التي قيمة column فيها تساوي المفتاح (قيمة من قيم الورقة)
+    """
+    kind = schema.get(column)
+    if kind in (DATE, DATETIME) and pd.api.types.is_datetime64_any_dtype(df[column]):
+        return df[column] == to_typed(kind, key)
+    if isinstance(df[column].dtype, (pd.StringDtype, pd.CategoricalDtype)):
+        return (df[column] == str(key)).fillna(False).astype(bool)
+    return df[column].astype(str) == str(key)
+
+
+def _add_categories(df, column, values):
+    """
+    إضافة القيم الجديدة إلى فئات عمود فئوي قبل الكتابة فيه
+    """
+    missing = [value for value in dict.fromkeys(values) if value not in df[column].cat.categories]
+    if missing:
+        df[column] = df[column].cat.add_categories(missing)
+
+
+def set_values(df, mask, values, schema):
+    """
+    كتابة قيم الورقة {العمود: القيمة} في الصفوف المحددة بالقناع مع تحويلها إلى نوع كل عمود
+    الأعمدة غير الموجودة في df يتم تجاهلها
+    """
+    for column, value in values.items():
+        if column not in df.columns:
+            continue
+        kind = schema.get(column)
+        typed = to_typed(kind, value)
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            _add_categories(df, column, [typed])
+        df.loc[mask, column] = typed
+    return df
+
+
+def append_rows(df, rows, schema):
+    """
+    إضافة صفوف (قواميس بقيم الورقة) إلى DataFrame محول مع الحفاظ على أنواع الأعمدة
+    القيم الجديدة تحول مباشرة إلى نوع كل عمود دون المرور بـ apply_schema
+    """
+    data = {}
+    for column in df.columns:
+        kind = schema.get(column)
+        values = [to_typed(kind, row.get(column)) for row in rows]
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            _add_categories(df, column, values)
+            data[column] = pd.Categorical(values, dtype=df[column].dtype)
+        elif kind is not None:
+            data[column] = pd.Series(values, dtype=dtype)
+        else:
+            data[column] = pd.Series(values, dtype=object)
+
+    return pd.concat([df, pd.DataFrame(data)], ignore_index=True)
@@ -1,35 +1,172 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
-import json
-from utils import format_date, get_day_name, get_available_dates as utils_get_available_dates, generate_booking_id
+import threading
+from functools import partial
+from utils import get_available_dates as utils_get_available_dates, generate_booking_id
+from sheets_connection import SheetsConnectionManager, get_connection_manager
+from sheets_cache import SnapshotCache
+from sheets_metrics import get_metrics
+from snapshot_refresher import SnapshotRefresher
+from sqlite_mirror import SQLiteMirror
+from storage_backends import ConflictError, GSpreadBackend, MemoryBackend, SQLiteBackend
+from fake_sheets import FakeSheetsService, frame_to_values
+from calendar_engine import CalendarEngine
+from availability_index import AvailabilityIndex
+from booking_statistics import BookingStatistics
+from records import Booking, Slot
+from reference_data import ReferenceData
+from app_settings import AppSettings, settings_from_frame
+from booking_archive import archive_cutoff, archive_months, archive_rows, read_archive
+from sheet_schema import (BOOKINGS_SCHEMA, SLOTS_SCHEMA, SHEET_SCHEMAS, append_rows, apply_schema,
+                          format_dates, key_mask, parse_bool, set_values, to_sheet_record, to_sheet_records)
+import config
+
+# مسار ملف الاعتماد
+CREDS_PATH = 'credentials/google_sheets_creds.json'
+
+# اسم ملف Google Sheets
+SPREADSHEET_NAME = 'Real Estate Presentation Bookings'
+
+# حالات الحجز التي تحرر الموعد
+CANCELLED_STATUSES = ('ملغي', 'Cancelled')
+
+# أعمدة ورقة الحجوزات عندما لا تكون رؤوسها معروفة
+BOOKING_SHEET_COLUMNS = ['booking_id', 'company_name', 'area_name', 'project_name', 'company_representative',
+                         'contact_info', 'booking_date', 'booking_time', 'status', 'notes']
+
+# أسماء بديلة لحقول الحجز: نموذج صفحة الحجز يرسل representative_name و contact_email و contact_phone،
+# وورقة الحجوزات قد تحتوي على company_representative و contact_info أو على نفس أسماء النموذج
+BOOKING_FIELD_ALIASES = {
+    'company_representative': ('representative_name',),
+    'representative_name': ('company_representative',)
+}
+
+# مصدر التخزين المشترك (Google Sheets أو الذاكرة أو النسخة المحلية SQLite)
+_backend = None
+_backend_lock = threading.Lock()
+
+# لقطات أوراق الحجوزات والمواعيد المشتركة بين القراءات
+_snapshot_cache = SnapshotCache(ttl=config.SHEETS_CACHE_TTL)
+
+# الأوراق المحفوظة كلقطات مشتركة
+SNAPSHOT_SHEETS = ('Bookings', 'Available_Slots')
+
+# البيانات المرجعية (الشركات والمشاريع) بصلاحية طويلة لأنها نادراً ما تتغير
+REFERENCE_SHEETS = ('Companies', 'Projects')
+_reference_cache = SnapshotCache(ttl=config.REFERENCE_CACHE_TTL)
+
+# الإعدادات المدمجة (AppSettings) تخزن في لقطات الأوراق باسم ورقتها وتعاد قراءتها مع تغير إصدارها
+SETTINGS_SHEET = 'Settings'
+
+# لقطات الأعمدة المحددة المخزنة لكل ورقة {الورقة: {اسم اللقطة: الأعمدة}}
+_projections = {}
+_projections_lock = threading.Lock()
+
+# أعمدة المواعيد التي تحتاجها قراءات التواريخ (booking_date في الأوراق القديمة)
+SLOT_DATE_COLUMNS = ('date', 'booking_date', 'is_available')
+
+# سجلات الحجوزات والمواعيد المبنية من آخر لقطة {الورقة: (الإصدار، السجلات)}
+_records = {}
+_records_lock = threading.Lock()
+
+# تحديث لقطات الحجوزات والمواعيد في الخلفية عند تغير جدول البيانات
+_snapshot_refresher = SnapshotRefresher(_snapshot_cache)
+
+# محرك التقويم المشترك
+_calendar_engine = CalendarEngine()
+
+# فهرس توفر المواعيد المبني من آخر لقطة
+_availability_index = None
+
+# إحصائيات الحجوزات المخزنة حسب إصدار البيانات
+_booking_statistics = BookingStatistics()
+
+# الأوراق التي لها نسخة محلية في وضع التخزين 'sqlite'
+MIRRORED_SHEETS = ('Bookings', 'Available_Slots')
+
+# قفل إنشاء الحجوزات داخل العملية حتى لا يُحجز نفس الموعد مرتين
+_booking_lock = threading.Lock()
+
+# الحصول على مصدر التخزين
+def get_backend():
+    """
+    الحصول على مصدر التخزين المشترك حسب config.STORAGE_MODE
+    يتم إنشاؤه مرة واحدة لكل عملية مع تشغيل التحديث في الخلفية
+    """
+    global _backend
+    
+    with _backend_lock:
+        if _backend is None:
+            backend = _create_backend()
+            
+            # التعديلات الخارجية المكتشفة في المصدر تبطل اللقطات المخزنة
+            backend.subscribe(_on_backend_change)
+            if backend.needs_polling:
+                _start_snapshot_refresher(backend)
+            backend.start()
+            
+            _backend = backend
+        
+        return _backend
+
+# استبدال مصدر التخزين
+def set_backend(backend):
+    """
+    استخدام مصدر تخزين محدد (مثل خدمة محلية للقياس) بدلاً من المصدر حسب الإعدادات
+    يتم مسح جميع اللقطات والبيانات المشتقة المخزنة، ولا يتم تشغيل التحديث في الخلفية
+    """
+    global _backend, _availability_index
+    
+    with _backend_lock:
+        backend.subscribe(_on_backend_change)
+        _backend = backend
+    
+    invalidate_cache()
+    _availability_index = None
+    _booking_statistics.clear()
+    _calendar_engine.clear()
+
+# إنشاء مصدر التخزين
+def _create_backend():
+    """
+    'memory': بيانات مؤقتة في الذاكرة (وأيضاً عند عدم وجود ملف الاعتماد)
+    'sqlite': نسخة محلية مع كتابة مؤجلة إلى Google Sheets
+    'fake': خدمة Google Sheets محلية ببيانات التطوير عبر نفس مسار الكود الفعلي
+    'sheets': Google Sheets مباشرة
+    """
+    if config.STORAGE_MODE == 'fake':
+        remote = GSpreadBackend(create_fake_connection())
+    elif config.STORAGE_MODE == 'memory' or not os.path.exists(CREDS_PATH):
+        return MemoryBackend(create_temp_credentials())
+    else:
+        remote = GSpreadBackend(get_connection_manager(CREDS_PATH, SPREADSHEET_NAME))
+    
+    if config.STORAGE_MODE == 'sqlite':
+        return SQLiteBackend(SQLiteMirror(), remote, MIRRORED_SHEETS)
+    
+    return remote
+
+# إنشاء اتصال بخدمة Google Sheets المحلية
+def create_fake_connection(service=None, tables=None):
+    """
+    إنشاء مدير اتصال بخدمة fake_sheets بدلاً من Google
+    يتم إنشاء جدول البيانات من الجداول المعطاة، وإلا من بيانات التطوير المؤقتة
+    """
+    service = service or FakeSheetsService()
+    tables = tables if tables is not None else create_temp_credentials()
+    service.create_spreadsheet(SPREADSHEET_NAME, {name: frame_to_values(df) for name, df in tables.items()})
+    
+    return SheetsConnectionManager(None, SPREADSHEET_NAME, client_factory=service.client)
 
 # إعداد الاتصال بـ Google Sheets API
 def connect_to_sheets():
     """
-    الاتصال بـ Google Sheets API باستخدام ملف الاعتماد
+    الاتصال بمصدر التخزين
+    يتم التفويض مرة واحدة لكل عملية وإعادة استخدام العميل حتى قرب انتهاء صلاحية الرمز
     """
     try:
-        # تحديد نطاق الوصول
-        scope = ['https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive']
-        
-        # مسار ملف الاعتماد
-        creds_path = 'credentials/google_sheets_creds.json'
-        
-        # إذا لم يكن ملف الاعتماد موجوداً، استخدم اعتماد مؤقت للتطوير
-        if not os.path.exists(creds_path):
-            return create_temp_credentials()
-        
-        # إنشاء اعتماد من ملف JSON
-        creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, scope)
-        
-        # الاتصال بـ Google Sheets
-        client = gspread.authorize(creds)
-        
-        return client
+        return get_backend()
     
     except Exception as e:
         raise Exception(f"خطأ في الاتصال بـ Google Sheets API: {str(e)}")
@@ -37,7 +174,7 @@ def connect_to_sheets():
 # إنشاء اعتماد مؤقت للتطوير
 def create_temp_credentials():
     """
-    إنشاء اعتماد مؤقت للتطوير المحلي
+    إنشاء بيانات مؤقتة للتطوير المحلي بنفس أوراق وأعمدة جدول البيانات
     """
     try:
         # إنشاء بيانات وهمية للتطوير
@@ -55,22 +192,35 @@ def create_temp_credentials():
         })
         
         # إنشاء تواريخ متاحة
-        available_dates = utils_get_available_dates(8)
+        available_dates = utils_get_available_dates()
         available_slots = pd.DataFrame({
             'date': available_dates,  # تأكد من استخدام 'date' كاسم للعمود
             'time': ['12:00 - 12:30'] * len(available_dates),
-            'is_available': [True] * len(available_dates)
+            'is_available': ['TRUE'] * len(available_dates)
         })
         
         # تحديث حالة المواعيد المحجوزة
         for date in bookings['booking_date']:
             if date in available_slots['date'].values:
-                available_slots.loc[available_slots['date'] == date, 'is_available'] = False
+                available_slots.loc[available_slots['date'] == date, 'is_available'] = 'FALSE'
         
-        # إنشاء قاموس يحتوي على البيانات
+        # الشركات والمشاريع المستخرجة من الحجوزات
+        companies = bookings[['company_name', 'area_name']].drop_duplicates().reset_index(drop=True)
+        projects = bookings[['project_name', 'company_name']].drop_duplicates().reset_index(drop=True)
+        
+        # الإعدادات الافتراضية
+        settings = pd.DataFrame({
+            'key': ['company_name', 'app_title', 'booking_time', 'weeks_ahead'],
+            'value': ['شركة التطوير العقاري الرائدة', 'نظام حجز مواعيد العروض التقديمية', '12:00 - 12:30', 8]
+        })
+        
+        # إنشاء قاموس يحتوي على البيانات حسب اسم الورقة
         temp_data = {
-            'bookings': bookings,
-            'available_slots': available_slots
+            'Bookings': bookings,
+            'Available_Slots': available_slots,
+            'Companies': companies,
+            'Projects': projects,
+            'Settings': settings
         }
         
         return temp_data
@@ -78,34 +228,282 @@ def create_temp_credentials():
     except Exception as e:
         raise Exception(f"خطأ في إنشاء بيانات مؤقتة: {str(e)}")
 
+# تحميل ورقة الحجوزات
+def _download_bookings():
+    """
+    تحميل ورقة الحجوزات كاملة من مصدر التخزين وتحويل أعمدتها إلى أنواعها
+    """
+    return apply_schema(get_backend().get_rows('Bookings'), BOOKINGS_SCHEMA)
+
+# تحميل ورقة المواعيد المتاحة
+def _download_available_slots():
+    """
+    تحميل ورقة المواعيد المتاحة كاملة من مصدر التخزين وتحويل أعمدتها إلى أنواعها
+    """
+    return apply_schema(get_backend().get_rows('Available_Slots'), SLOTS_SCHEMA)
+
+# تحميل أعمدة محددة من ورقة
+def _download_projection(sheet_name, columns):
+    """
+    تحميل أعمدة محددة فقط من مصدر التخزين وتحويلها إلى أنواعها
+    """
+    return apply_schema(get_backend().get_projection(sheet_name, list(columns)), SHEET_SCHEMAS.get(sheet_name, {}))
+
+# تشغيل تحديث اللقطات في الخلفية
+def _start_snapshot_refresher(backend):
+    """
+    مراقبة أوراق الحجوزات والمواعيد والإعدادات وتشغيل خيط التحديث
+    """
+    # الصفوف قد تكون أضيفت أو حذفت خارج التطبيق، فيعاد بناء فهارس الصفوف في المصدر
+    # وتُبطل لقطات الأعمدة المحددة
+    _snapshot_refresher.watch('Bookings', _download_bookings, backend.probe,
+                              partial(_on_sheet_reloaded, backend, 'Bookings'))
+    _snapshot_refresher.watch('Available_Slots', _download_available_slots, backend.probe,
+                              partial(_on_sheet_reloaded, backend, 'Available_Slots'))
+    _snapshot_refresher.watch(SETTINGS_SHEET, _download_app_settings, backend.probe)
+    _snapshot_refresher.start()
+
+# بعد إعادة تحميل ورقة تغيرت في الخلفية
+def _on_sheet_reloaded(backend, sheet_name):
+    """
+    إبطال فهارس الصفوف في المصدر ولقطات الأعمدة المحددة للورقة التي أعيد تحميلها
+    """
+    backend.invalidate(sheet_name)
+    _invalidate_projections(sheet_name)
+
+# إبطال اللقطات بعد تعديلات خارجية اكتشفها المصدر
+def _on_backend_change(sheet_names):
+    """
+    إبطال لقطات الأوراق التي تغيرت خارج العملية
+    """
+    for sheet_name in sheet_names:
+        _invalidate_sheet(sheet_name)
+
+# فحص التغييرات الآن
+def refresh_data():
+    """
+    فحص إشارة التغير فوراً وإعادة تحميل الأوراق التي تغيرت
+    تعيد قائمة أسماء الأوراق التي أعيد تحميلها
+    """
+    backend = get_backend()
+    
+    if backend.needs_polling:
+        return _snapshot_refresher.poll()
+    
+    # في وضع 'sqlite' يتم إرسال التعديلات المعلقة ثم مطابقة النسخة المحلية
+    return backend.refresh()
+
+# لقطة الحجوزات المشتركة (للقراءة فقط)
+def _bookings_snapshot():
+    """
+    الحصول على لقطة الحجوزات من الذاكرة المؤقتة دون نسخ
+    """
+    return _snapshot_cache.get('Bookings', _download_bookings)
+
+# لقطة المواعيد المتاحة المشتركة (للقراءة فقط)
+def _slots_snapshot():
+    """
+    الحصول على لقطة المواعيد المتاحة من الذاكرة المؤقتة دون نسخ
+    """
+    return _snapshot_cache.get('Available_Slots', _download_available_slots)
+
+# لقطات الأوراق المخزنة حالياً
+def peek_sheets(sheet_names):
+    """
+    الحصول على لقطات الأوراق المخزنة فقط كقاموس {الورقة: DataFrame} (للقراءة فقط) دون تحميل
+    """
+    frames = {}
+    for name in sheet_names:
+        if name in SNAPSHOT_SHEETS:
+            df = _snapshot_cache.peek(name)
+            if df is not None:
+                frames[name] = df
+    return frames
+
+# تخزين أوراق تم تحميلها معاً
+def store_sheets(frames):
+    """
+    تحويل أوراق اللقطات المحملة للتو إلى أنواعها وتخزينها في اللقطات
+    إذا خزنت لقطة أحدث أثناء التحميل تعاد المخزنة، والأوراق الأخرى تعاد كما هي
+    """
+    result = {}
+    for name, df in frames.items():
+        if name in SNAPSHOT_SHEETS:
+            typed = apply_schema(df, SHEET_SCHEMAS[name])
+            result[name] = _snapshot_cache.get(name, lambda typed=typed: typed)
+        else:
+            result[name] = df
+    return result
+
+# رقم إصدار بيانات الحجوزات والمواعيد
+def get_data_version():
+    """
+    الحصول على رقم إصدار يتغير مع كل تحميل أو تعديل لبيانات الحجوزات والمواعيد
+    """
+    return (_snapshot_cache.version('Bookings'), _snapshot_cache.version('Available_Slots'))
+
+# إبطال الذاكرة المؤقتة
+def invalidate_cache(sheet_name=None):
+    """
+    إبطال لقطات الأوراق المخزنة لإجبار التحميل من جديد
+    """
+    if sheet_name is None:
+        _snapshot_cache.invalidate()
+        with _projections_lock:
+            _projections.clear()
+        with _records_lock:
+            _records.clear()
+        _reference_cache.invalidate()
+    else:
+        _invalidate_sheet(sheet_name)
+
+# إبطال لقطة ورقة مع لقطات أعمدتها المحددة
+def _invalidate_sheet(sheet_name):
+    _snapshot_cache.invalidate(sheet_name)
+    _invalidate_projections(sheet_name)
+    with _records_lock:
+        _records.pop(sheet_name, None)
+    if sheet_name in REFERENCE_SHEETS:
+        _reference_cache.invalidate()
+
+def _invalidate_projections(sheet_name):
+    with _projections_lock:
+        names = list(_projections.pop(sheet_name, {}))
+    for name in names:
+        _snapshot_cache.invalidate(name)
+
+# قراءة أعمدة محددة من ورقة
+def _projection(sheet_name, columns):
+    """
+    الحصول على أعمدة محددة من ورقة (للقراءة فقط)
+    تُستخدم اللقطة الكاملة إن كانت مخزنة، وإلا تتم قراءة هذه الأعمدة فقط من المصدر
+    وتخزينها كلقطة مستقلة تُحدث مع عمليات الكتابة
+    """
+    columns = tuple(columns)
+    
+    full = _snapshot_cache.peek(sheet_name)
+    if full is not None:
+        return full[[column for column in columns if column in full.columns]]
+    
+    name = f"{sheet_name}[{','.join(columns)}]"
+    with _projections_lock:
+        _projections.setdefault(sheet_name, {})[name] = columns
+    
+    return _snapshot_cache.get(name, partial(_download_projection, sheet_name, columns))
+
+# تعديل لقطة الورقة ولقطات أعمدتها المحددة
+def _patch_sheet(sheet_name, apply, keyed=False):
+    """
+    تطبيق الدالة apply(df, columns) على نسخ من اللقطة الكاملة ومن لقطات الأعمدة المحددة للورقة ثم استبدالها
+    columns هي أعمدة الورقة كاملة بترتيبها
+    keyed: التعديل يحتاج إلى عمود المفتاح، فتُبطل لقطات الأعمدة التي لا تحتوي عليه
+    تعيد رقم إصدار اللقطة الكاملة
+    """
+    version = _snapshot_cache.patch(sheet_name, lambda df: apply(df, list(df.columns)))
+    
+    with _projections_lock:
+        projections = dict(_projections.get(sheet_name, {}))
+    if projections:
+        columns = get_backend().get_columns(sheet_name)
+        for name, projected in projections.items():
+            if keyed and (not columns or columns[0] not in projected):
+                with _projections_lock:
+                    _projections.get(sheet_name, {}).pop(name, None)
+                _snapshot_cache.invalidate(name)
+            else:
+                _snapshot_cache.patch(name, lambda df: apply(df, columns))
+    
+    return version
+
+# إضافة صف جديد إلى اللقطة المخزنة
+def _append_to_snapshot(sheet_name, values):
+    """
+    إضافة صف مكتوب في الورقة إلى اللقطة المخزنة بدلاً من إعادة تحميلها
+    """
+    schema = SHEET_SCHEMAS.get(sheet_name, {})
+    
+    def apply(df, columns):
+        return append_rows(df, [dict(zip(columns, values))], schema)
+    
+    return _patch_sheet(sheet_name, apply)
+
+# تحديث صفوف في اللقطة المخزنة
+def _update_snapshot(sheet_name, key, values):
+    """
+    تحديث الصفوف ذات المفتاح المحدد (العمود الأول) في اللقطة المخزنة بعد الكتابة
+    الأعمدة غير الموجودة في اللقطة يتم تجاهلها
+    """
+    schema = SHEET_SCHEMAS.get(sheet_name, {})
+    
+    def apply(df, columns):
+        if len(columns) > 0 and columns[0] in df.columns:
+            set_values(df, key_mask(df, columns[0], key, schema), values, schema)
+        return df
+    
+    return _patch_sheet(sheet_name, apply, keyed=True)
+
 # الحصول على جميع الحجوزات
 def get_all_bookings():
     """
     الحصول على جميع الحجوزات من Google Sheets
     """
     try:
-        client = connect_to_sheets()
-        
-        # إذا كان الاتصال مؤقتاً، استخدم البيانات المؤقتة
-        if isinstance(client, dict):
-            return client['bookings']
-        
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
-        
-        # الوصول إلى ورقة الحجوزات
-        bookings_sheet = sheet.worksheet('Bookings')
-        
-        # الحصول على جميع البيانات
-        data = bookings_sheet.get_all_records()
+        return _bookings_snapshot().copy()
+    
+    except Exception as e:
+        raise Exception(f"خطأ في الحصول على الحجوزات: {str(e)}")
+
+# أرشفة الحجوزات القديمة
+def archive_old_bookings(days=None):
+    """
+    نقل الحجوزات التي مضى على تاريخها أكثر من days يوماً (config.ARCHIVE_AFTER_DAYS افتراضياً)
+    من ورقة الحجوزات إلى أوراق أرشيف شهرية، فتبقى قراءات الحجوزات بحجم البيانات النشطة
+    تعيد قاموس {الشهر YYYY-MM: عدد الحجوزات المنقولة}
+    """
+    try:
+        backend = get_backend()
         
-        # تحويل البيانات إلى DataFrame
-        bookings_df = pd.DataFrame(data)
+        # لا يتم إنشاء حجوزات أثناء حساب مواضع الصفوف وحذفها
+        with _booking_lock:
+            # مطابقة المصدر مع الورقة أولاً حتى تطابق مواضع الصفوف المحسوبة الورقة الفعلية
+            backend.sync()
+            _invalidate_sheet('Bookings')
+            
+            moved = archive_rows(backend, 'Bookings', _bookings_snapshot(), 'booking_date',
+                                 archive_cutoff(days), BOOKINGS_SCHEMA)
+            
+            # مواضع الصفوف تغيرت، لذلك يتم إبطال اللقطة
+            if moved:
+                _invalidate_sheet('Bookings')
         
-        return bookings_df
+        return moved
     
     except Exception as e:
-        raise Exception(f"خطأ في الحصول على الحجوزات: {str(e)}")
+        raise Exception(f"خطأ في أرشفة الحجوزات: {str(e)}")
+
+# الحصول على الحجوزات المؤرشفة
+def get_archived_bookings(start_date=None, end_date=None):
+    """
+    الحصول على الحجوزات المؤرشفة بين تاريخين (YYYY-MM-DD، شاملين) بنفس أعمدة وأنواع get_all_bookings
+    تقرأ أوراق الأشهر المطلوبة فقط، ولا تخزن في الذاكرة المؤقتة
+    """
+    try:
+        archived = read_archive(get_backend(), 'Bookings', 'booking_date', start_date, end_date)
+        return apply_schema(archived, BOOKINGS_SCHEMA)
+    
+    except Exception as e:
+        raise Exception(f"خطأ في الحصول على الحجوزات المؤرشفة: {str(e)}")
+
+# أشهر أرشيف الحجوزات
+def get_archive_months():
+    """
+    الأشهر التي لها أرشيف حجوزات بصيغة YYYY-MM
+    """
+    try:
+        return archive_months(get_backend(), 'Bookings')
+    
+    except Exception as e:
+        raise Exception(f"خطأ في الحصول على أشهر الأرشيف: {str(e)}")
 
 # الحصول على حجز محدد
 def get_booking_by_id(booking_id):
@@ -113,45 +511,81 @@ def get_booking_by_id(booking_id):
     الحصول على حجز محدد بواسطة المعرف
     """
     try:
-        # الحصول على جميع الحجوزات
-        bookings = get_all_bookings()
-        
-        # البحث عن الحجز المطلوب
-        booking = bookings[bookings['booking_id'] == booking_id]
-        
-        if booking.empty:
-            return None
+        # البحث في اللقطة المخزنة إن وجدت
+        bookings = _snapshot_cache.peek('Bookings')
+        if bookings is not None:
+            booking = bookings[key_mask(bookings, 'booking_id', booking_id, BOOKINGS_SCHEMA)]
+            
+            if booking.empty:
+                return None
+            
+            # السجل بقيم الورقة (التاريخ كنص YYYY-MM-DD) كما يُقرأ من المصدر مباشرة
+            return to_sheet_record(booking.iloc[0].to_dict(), BOOKINGS_SCHEMA)
         
-        return booking.iloc[0].to_dict()
+        # وإلا قراءة صف الحجز فقط من المصدر
+        return get_backend().get_range('Bookings', [booking_id]).get(str(booking_id))
     
     except Exception as e:
         raise Exception(f"خطأ في الحصول على الحجز: {str(e)}")
 
+# سجلات لقطة ورقة مبنية مرة واحدة لكل إصدار
+def _snapshot_records(sheet_name, loader, build):
+    """
+    تحويل اللقطة إلى قائمة سجلات وإعادة استخدامها حتى يتغير إصدار اللقطة
+    """
+    data, version = _snapshot_cache.get_versioned(sheet_name, loader)
+    
+    with _records_lock:
+        cached = _records.get(sheet_name)
+        if cached is not None and version is not None and cached[0] == version:
+            return cached[1]
+    
+    records = build(data)
+    
+    # لا تخزن سجلات لقطة تجاوزتها عملية كتابة أثناء التحميل
+    if version is not None:
+        with _records_lock:
+            _records[sheet_name] = (version, records)
+    
+    return records
+
+# الحصول على جميع الحجوزات كسجلات
+def get_booking_records():
+    """
+    الحصول على جميع الحجوزات كقائمة سجلات Booking (للقراءة فقط)
+    """
+    try:
+        return _snapshot_records('Bookings', _download_bookings, Booking.from_frame)
+    
+    except Exception as e:
+        raise Exception(f"خطأ في الحصول على الحجوزات: {str(e)}")
+
+# الحصول على حجز محدد كسجل
+def get_booking_record(booking_id):
+    """
+    الحصول على حجز محدد كسجل Booking، أو None إذا لم يوجد
+    """
+    booking = get_booking_by_id(booking_id)
+    return Booking.from_row(booking) if booking else None
+
 # الحصول على المواعيد المتاحة
 def get_available_slots():
     """
     الحصول على المواعيد المتاحة من Google Sheets
     """
     try:
-        client = connect_to_sheets()
-        
-        # إذا كان الاتصال مؤقتاً، استخدم البيانات المؤقتة
-        if isinstance(client, dict):
-            return client['available_slots']
-        
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
-        
-        # الوصول إلى ورقة المواعيد المتاحة
-        slots_sheet = sheet.worksheet('Available_Slots')
-        
-        # الحصول على جميع البيانات
-        data = slots_sheet.get_all_records()
-        
-        # تحويل البيانات إلى DataFrame
-        slots_df = pd.DataFrame(data)
-        
-        return slots_df
+        return _slots_snapshot().copy()
+    
+    except Exception as e:
+        raise Exception(f"خطأ في الحصول على المواعيد المتاحة: {str(e)}")
+
+# الحصول على المواعيد كسجلات
+def get_slot_records():
+    """
+    الحصول على جميع المواعيد كقائمة سجلات Slot (للقراءة فقط)
+    """
+    try:
+        return _snapshot_records('Available_Slots', _download_available_slots, Slot.from_frame)
     
     except Exception as e:
         raise Exception(f"خطأ في الحصول على المواعيد المتاحة: {str(e)}")
@@ -162,21 +596,21 @@ def get_available_dates():
     الحصول على التواريخ المتاحة للحجز
     """
     try:
-        # الحصول على المواعيد المتاحة
-        slots = get_available_slots()
+        # قراءة عمودي التاريخ والتوفر فقط
+        slots = _projection('Available_Slots', SLOT_DATE_COLUMNS)
         
         # تصفية المواعيد المتاحة فقط
         if 'is_available' in slots.columns:
-            available_slots = slots[slots['is_available'] == True]
+            available_slots = slots[slots['is_available']]
             
-            # الحصول على التواريخ المتاحة
+            # الحصول على التواريخ المتاحة بصيغة YYYY-MM-DD
             date_column = 'date' if 'date' in available_slots.columns else 'booking_date'
-            available_dates = available_slots[date_column].tolist()
+            available_dates = format_dates(available_slots[date_column]).tolist()
             
             return available_dates
         else:
             # إذا لم يكن هناك عمود is_available، استخدم وظيفة get_available_dates من utils
-            return utils_get_available_dates()
+            return utils_get_available_dates(settings=get_app_settings())
     
     except Exception as e:
         raise Exception(f"خطأ في الحصول على التواريخ المتاحة: {str(e)}")
@@ -187,16 +621,16 @@ def get_booked_dates():
     الحصول على التواريخ المحجوزة
     """
     try:
-        # الحصول على المواعيد المتاحة
-        slots = get_available_slots()
+        # قراءة عمودي التاريخ والتوفر فقط
+        slots = _projection('Available_Slots', SLOT_DATE_COLUMNS)
         
         # تصفية المواعيد المحجوزة فقط
         if 'is_available' in slots.columns:
-            booked_slots = slots[slots['is_available'] == False]
+            booked_slots = slots[~slots['is_available']]
             
-            # الحصول على التواريخ المحجوزة
+            # الحصول على التواريخ المحجوزة بصيغة YYYY-MM-DD
             date_column = 'date' if 'date' in booked_slots.columns else 'booking_date'
-            booked_dates = booked_slots[date_column].tolist()
+            booked_dates = format_dates(booked_slots[date_column]).tolist()
             
             return booked_dates
         else:
@@ -212,87 +646,94 @@ def get_upcoming_bookings(limit=5):
     الحصول على الحجوزات القادمة
     """
     try:
-        # الحصول على جميع الحجوزات
-        bookings = get_all_bookings()
+        # لقطة الحجوزات بتواريخ من نوع datetime64
+        bookings = _bookings_snapshot()
         
-        # تصفية الحجوزات المؤكدة فقط
-        confirmed_bookings = bookings[bookings['status'] == 'مؤكد']
+        # تصفية الحجوزات المؤكدة المستقبلية فقط
+        today = pd.Timestamp(datetime.now().date())
+        upcoming_bookings = bookings[(bookings['status'] == 'مؤكد') & (bookings['booking_date'] >= today)]
         
-        # تحويل التاريخ إلى نوع datetime
-        confirmed_bookings['booking_date_obj'] = pd.to_datetime(confirmed_bookings['booking_date'])
+        # أقرب الحجوزات حسب التاريخ
+        upcoming_bookings = upcoming_bookings.nsmallest(limit, 'booking_date')
         
-        # تصفية الحجوزات المستقبلية فقط
-        today = datetime.now().date()
-        upcoming_bookings = confirmed_bookings[confirmed_bookings['booking_date_obj'].dt.date >= today]
-        
-        # ترتيب الحجوزات حسب التاريخ
-        upcoming_bookings = upcoming_bookings.sort_values('booking_date_obj')
-        
-        # تحديد عدد الحجوزات المطلوبة
-        upcoming_bookings = upcoming_bookings.head(limit)
-        
-        # تحويل DataFrame إلى قائمة من القواميس
-        upcoming_bookings_list = upcoming_bookings.to_dict('records')
-        
-        return upcoming_bookings_list
+        # تحويل DataFrame إلى قائمة من القواميس بقيم الورقة
+        return to_sheet_records(upcoming_bookings, BOOKINGS_SCHEMA)
     
     except Exception as e:
         raise Exception(f"خطأ في الحصول على الحجوزات القادمة: {str(e)}")
 
+# قيم صف الحجز بترتيب أعمدة ورقة الحجوزات
+def _booking_row_values(columns, booking_data):
+    """
+    إنشاء قيم صف حجز جديد بحالة 'مؤكد' بترتيب الأعمدة columns
+    حقول النموذج تطابق أعمدة الورقة بالاسم أو بأسمائها البديلة، و contact_info يجمع البريد والهاتف
+    """
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    data = dict(booking_data, status='مؤكد')
+    
+    def value(column):
+        for name in (column,) + BOOKING_FIELD_ALIASES.get(column, ()):
+            if data.get(name) is not None:
+                return data[name]
+        if column == 'contact_info':
+            return ' / '.join(str(data[name]) for name in ('contact_email', 'contact_phone') if data.get(name))
+        if column in ('created_at', 'updated_at'):
+            return now
+        return ''
+    
+    return [value(column) for column in columns]
+
 # إنشاء حجز جديد
 def create_booking(booking_data):
     """
     إنشاء حجز جديد
+    يتم التحقق من أن الموعد ما زال متاحاً ثم كتابة صف الحجز وحالة الموعد كعملية واحدة
+    في مصدر التخزين. تعيد None إذا كان الموعد قد حُجز بالفعل
     """
     try:
-        client = connect_to_sheets()
-        
-        # إذا كان الاتصال مؤقتاً، استخدم البيانات المؤقتة
-        if isinstance(client, dict):
+        backend = get_backend()
+        booking_date = booking_data['booking_date']
+        
+        with _booking_lock:
+            # رفض الحجز مباشرة إذا كانت اللقطة المخزنة تظهر أن الموعد محجوز
+            slots = _snapshot_cache.peek('Available_Slots')
+            if slots is not None and 'is_available' in slots.columns and len(slots.columns) > 0:
+                slot = slots[key_mask(slots, slots.columns[0], booking_date, SLOTS_SCHEMA)]
+                if not slot.empty and not slot['is_available'].iloc[0]:
+                    return None
+            
             # إنشاء معرف فريد للحجز
             booking_id = generate_booking_id()
             
             # إضافة المعرف إلى بيانات الحجز
             booking_data['booking_id'] = booking_id
             
-            # إضافة الحجز إلى قائمة الحجوزات
-            client['bookings'] = pd.concat([client['bookings'], pd.DataFrame([booking_data])], ignore_index=True)
+            row_values = _booking_row_values(backend.get_columns('Bookings') or BOOKING_SHEET_COLUMNS, booking_data)
+            slot_values = {'is_available': 'FALSE', 'booking_id': booking_id}
             
-            # تحديث حالة الموعد
-            update_slot_availability(booking_data['booking_date'], False)
+            # كتابة صف الحجز وحالة الموعد معاً بشرط أن يكون الموعد ما زال متاحاً
+            # ملاحظة: في Google Sheets يتم التحقق من الشرط والكتابة في طلبين منفصلين، و _booking_lock
+            # يمنع التداخل داخل العملية الواحدة فقط، لذلك قد تحجز عمليتان مختلفتان نفس الموعد إذا تحققت
+            # كل منهما قبل كتابة الأخرى. إعادة قراءة الموعد بعد الكتابة لا تكشف ذلك لأن كل عملية قد ترى
+            # قيمتها قبل أن تكتب الأخرى، أما SQLiteBackend فيتحقق ويكتب في معاملة واحدة على النسخة المحلية.
+            # StaleIndexError لا يعني أن الموعد محجوز، لذلك لا يتم التقاطه هنا
+            try:
+                backend.batch_update(
+                    [('Available_Slots', booking_date, slot_values)],
+                    appends=[('Bookings', row_values)],
+                    expect={('Available_Slots', booking_date): {'is_available': parse_bool}}
+                )
+            except ConflictError:
+                # الموعد حُجز من عملية أخرى منذ آخر تحميل
+                _update_snapshot('Available_Slots', booking_date, {'is_available': 'FALSE'})
+                return None
+            
+            # تحديث اللقطات المخزنة
+            version = _append_to_snapshot('Bookings', row_values)
+            _booking_statistics.apply_change(None, dict(booking_data, status='مؤكد'), version - 1, version)
+            _update_snapshot('Available_Slots', booking_date, slot_values)
             
             return booking_id
-        
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
-        
-        # الوصول إلى ورقة الحجوزات
-        bookings_sheet = sheet.worksheet('Bookings')
-        
-        # إنشاء معرف فريد للحجز
-        booking_id = generate_booking_id()
-        
-        # إضافة المعرف إلى بيانات الحجز
-        booking_data['booking_id'] = booking_id
-        
-        # إضافة الحجز إلى الجدول
-        bookings_sheet.append_row([
-            booking_id,
-            booking_data['company_name'],
-            booking_data['area_name'],
-            booking_data['project_name'],
-            booking_data['company_representative'],
-            booking_data['contact_info'],
-            booking_data['booking_date'],
-            booking_data['booking_time'],
-            'مؤكد',  # حالة الحجز
-            ''  # ملاحظات
-        ])
-        
-        # تحديث حالة الموعد
-        update_slot_availability(booking_data['booking_date'], False)
-        
-        return booking_id
     
     except Exception as e:
         raise Exception(f"خطأ في إنشاء الحجز: {str(e)}")
@@ -301,108 +742,103 @@ def create_booking(booking_data):
 def update_booking(booking_id, updated_data):
     """
     تحديث حجز موجود
+    يتم إرسال جميع الأعمدة المتغيرة مع تغييرات حالة المواعيد كعملية واحدة
+    تعيد False إذا لم يتم العثور على الحجز، وإلا عدد استدعاءات API المنفذة
+    (0 نجاح أيضاً، لذلك يتم التحقق بـ "is not False")
+    """
+    with get_metrics().count_calls() as counter:
+        found = _update_booking(booking_id, updated_data)
+    
+    return counter.calls if found else False
+
+def _update_booking(booking_id, updated_data):
+    """
+    تنفيذ تحديث الحجز، وتعيد False إذا لم يتم العثور عليه وإلا True
     """
     try:
-        client = connect_to_sheets()
+        backend = get_backend()
         
-        # إذا كان الاتصال مؤقتاً، استخدم البيانات المؤقتة
-        if isinstance(client, dict):
-            # الحصول على الحجز الحالي
-            bookings = client['bookings']
-            booking_index = bookings[bookings['booking_id'] == booking_id].index
-            
-            if booking_index.empty:
-                return False
-            
-            # تحديث بيانات الحجز
-            for key, value in updated_data.items():
-                bookings.loc[booking_index, key] = value
-            
-            # إذا تم تغيير التاريخ، تحديث حالة المواعيد
-            if 'booking_date' in updated_data:
-                # الحصول على التاريخ القديم
-                old_booking = get_booking_by_id(booking_id)
-                old_date = old_booking['booking_date']
-                
-                # تحديث حالة المواعيد
-                update_slot_availability(old_date, True)  # جعل الموعد القديم متاحاً
-                update_slot_availability(updated_data['booking_date'], False)  # جعل الموعد الجديد محجوزاً
-            
-            return True
+        # الحصول على الحجز الحالي من اللقطة المخزنة أو صفه فقط من المصدر
+        columns = backend.get_columns('Bookings')
+        old_booking = get_booking_by_id(booking_id)
         
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
+        if not old_booking:
+            return False
         
-        # الوصول إلى ورقة الحجوزات
-        bookings_sheet = sheet.worksheet('Bookings')
+        # تحديد الأعمدة التي تغيرت قيمتها
+        changes = {
+            key: value for key, value in updated_data.items()
+            if key in columns and str(old_booking.get(key, '')) != str(value)
+        }
         
-        # البحث عن الحجز
-        cell = bookings_sheet.find(booking_id)
+        # تحديد المواعيد التي تتغير حالتها
+        new_booking = dict(old_booking, **changes)
+        slot_changes = _get_slot_changes(old_booking, new_booking)
         
-        if not cell:
-            return False
+        if not changes and not slot_changes:
+            return True
         
-        # الحصول على الحجز الحالي
-        old_booking = get_booking_by_id(booking_id)
+        # تجميع تحديث الحجز وتغييرات حالة المواعيد في عملية واحدة
+        updates = [('Bookings', booking_id, changes)] if changes else []
+        for date, is_available in slot_changes.items():
+            updates.append(('Available_Slots', date, {'is_available': 'TRUE' if is_available else 'FALSE'}))
         
-        # تحديث بيانات الحجز
-        row = cell.row
-        
-        for key, value in updated_data.items():
-            if key == 'company_name':
-                bookings_sheet.update_cell(row, 2, value)
-            elif key == 'area_name':
-                bookings_sheet.update_cell(row, 3, value)
-            elif key == 'project_name':
-                bookings_sheet.update_cell(row, 4, value)
-            elif key == 'company_representative':
-                bookings_sheet.update_cell(row, 5, value)
-            elif key == 'contact_info':
-                bookings_sheet.update_cell(row, 6, value)
-            elif key == 'booking_date':
-                bookings_sheet.update_cell(row, 7, value)
-                
-                # تحديث حالة المواعيد
-                update_slot_availability(old_booking['booking_date'], True)  # جعل الموعد القديم متاحاً
-                update_slot_availability(value, False)  # جعل الموعد الجديد محجوزاً
-            elif key == 'booking_time':
-                bookings_sheet.update_cell(row, 8, value)
-            elif key == 'status':
-                bookings_sheet.update_cell(row, 9, value)
-            elif key == 'notes':
-                bookings_sheet.update_cell(row, 10, value)
+        missing = backend.batch_update(updates)
+        
+        # الحجز حُذف من الورقة منذ آخر تحميل
+        if ('Bookings', booking_id) in missing:
+            _invalidate_sheet('Bookings')
+            return False
+        
+        # تحديث اللقطات المخزنة
+        if changes:
+            version = _update_snapshot('Bookings', booking_id, changes)
+            _booking_statistics.apply_change(old_booking, new_booking, version - 1, version)
+        for date, is_available in slot_changes.items():
+            if ('Available_Slots', date) not in missing:
+                _update_snapshot('Available_Slots', date, {'is_available': 'TRUE' if is_available else 'FALSE'})
         
         return True
     
     except Exception as e:
         raise Exception(f"خطأ في تحديث الحجز: {str(e)}")
 
+# تحديد تغييرات حالة المواعيد الناتجة عن تحديث حجز
+def _get_slot_changes(old_booking, new_booking):
+    """
+    مقارنة الحجز قبل التحديث وبعده وإرجاع قاموس {التاريخ: هل أصبح متاحاً}
+    """
+    old_active = old_booking.get('status') not in CANCELLED_STATUSES
+    new_active = new_booking.get('status') not in CANCELLED_STATUSES
+    old_date = old_booking.get('booking_date')
+    new_date = new_booking.get('booking_date')
+    
+    slot_changes = {}
+    
+    # تحرير الموعد القديم عند الترحيل أو الإلغاء
+    if old_active and (not new_active or new_date != old_date):
+        slot_changes[old_date] = True
+    
+    # حجز الموعد الجديد عند الترحيل أو إعادة التفعيل
+    if new_active and (not old_active or new_date != old_date):
+        slot_changes[new_date] = False
+    
+    return slot_changes
+
 # إلغاء حجز
 def cancel_booking(booking_id, reason=''):
     """
     إلغاء حجز
     """
     try:
-        # الحصول على الحجز
-        booking = get_booking_by_id(booking_id)
-        
-        if not booking:
-            return False
-        
-        # تحديث حالة الحجز
+        # تحديث حالة الحجز، ويتم تحرير الموعد في نفس الطلب
         updated_data = {
             'status': 'ملغي',
             'notes': reason
         }
         
         # تحديث الحجز
-        update_result = update_booking(booking_id, updated_data)
-        
-        if update_result:
-            # جعل الموعد متاحاً مرة أخرى
-            update_slot_availability(booking['booking_date'], True)
-        
-        return update_result
+        return update_booking(booking_id, updated_data) is not False
     
     except Exception as e:
         raise Exception(f"خطأ في إلغاء الحجز: {str(e)}")
@@ -413,35 +849,14 @@ def update_slot_availability(date, is_available):
     تحديث حالة الموعد (متاح/محجوز)
     """
     try:
-        client = connect_to_sheets()
-        
-        # إذا كان الاتصال مؤقتاً، استخدم البيانات المؤقتة
-        if isinstance(client, dict):
-            # تحديث حالة الموعد
-            slots = client['available_slots']
-            date_column = 'date' if 'date' in slots.columns else 'booking_date'
-            slot_index = slots[slots[date_column] == date].index
-            
-            if not slot_index.empty:
-                slots.loc[slot_index, 'is_available'] = is_available
-            
-            return True
-        
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
+        value = 'TRUE' if is_available else 'FALSE'
         
-        # الوصول إلى ورقة المواعيد المتاحة
-        slots_sheet = sheet.worksheet('Available_Slots')
-        
-        # البحث عن الموعد
-        cell = slots_sheet.find(date)
-        
-        if not cell:
+        # تحديث حالة الموعد في مصدر التخزين
+        if get_backend().batch_update([('Available_Slots', date, {'is_available': value})]):
             return False
         
-        # تحديث حالة الموعد
-        row = cell.row
-        slots_sheet.update_cell(row, 3, 'TRUE' if is_available else 'FALSE')
+        # تحديث اللقطة المخزنة
+        _update_snapshot('Available_Slots', date, {'is_available': value})
         
         return True
     
@@ -454,69 +869,83 @@ def get_calendar_data(year, month):
     الحصول على بيانات التقويم لشهر محدد
     """
     try:
-        # الحصول على التواريخ المتاحة والمحجوزة
-        available_dates = get_available_dates()
-        booked_dates = get_booked_dates()
-        
-        # إنشاء قائمة بجميع أيام الشهر
-        import calendar
-        cal = calendar.monthcalendar(year, month)
-        
-        # تحويل التقويم إلى قائمة من القواميس
-        calendar_data = []
-        
-        for week in cal:
-            week_data = []
-            for day in week:
-                if day == 0:
-                    # يوم فارغ
-                    week_data.append({
-                        'day': 0,
-                        'date': '',
-                        'is_available': False,
-                        'is_booked': False,
-                        'is_past': False
-                    })
-                else:
-                    # تنسيق التاريخ
-                    date_str = f"{year}-{month:02d}-{day:02d}"
-                    date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-                    
-                    # التحقق من حالة اليوم
-                    is_available = date_str in available_dates
-                    is_booked = date_str in booked_dates
-                    is_past = date_obj < datetime.now().date()
-                    
-                    week_data.append({
-                        'day': day,
-                        'date': date_str,
-                        'is_available': is_available,
-                        'is_booked': is_booked,
-                        'is_past': is_past
-                    })
-            
-            calendar_data.append(week_data)
+        return get_calendar_range(year, month, 1)[0]
+    
+    except Exception as e:
+        raise Exception(f"خطأ في الحصول على بيانات التقويم: {str(e)}")
+
+# الحصول على بيانات التقويم لعدة أشهر
+def get_calendar_range(year, month, months=1):
+    """
+    الحصول على بيانات التقويم لعدد من الأشهر المتتالية بدءاً من شهر محدد
+    يتم قراءة حالة المواعيد مرة واحدة، وتخزين شبكة كل شهر حسب إصدار البيانات
+    """
+    try:
+        # الحصول على فهرس التوفر من اللقطة المخزنة
+        index = get_availability_index()
         
-        return calendar_data
+        return _calendar_engine.get_months(
+            year, month, months, index.version,
+            lambda: (index.available_dates(), index.booked_dates())
+        )
     
     except Exception as e:
         raise Exception(f"خطأ في الحصول على بيانات التقويم: {str(e)}")
 
+# الحصول على فهرس توفر المواعيد
+def get_availability_index():
+    """
+    الحصول على فهرس توفر المواعيد حسب (التاريخ، الوقت) مبني من لقطة واحدة
+    يعاد بناء الفهرس فقط عند تغير إصدار بيانات المواعيد
+    """
+    global _availability_index
+    
+    try:
+        slots = _slots_snapshot()
+        version = _snapshot_cache.version('Available_Slots')
+        
+        index = _availability_index
+        if index is None or index.version != version:
+            index = _build_availability_index(slots, version)
+            _availability_index = index
+        
+        return index
+    
+    except Exception as e:
+        raise Exception(f"خطأ في بناء فهرس توفر المواعيد: {str(e)}")
+
+# بناء فهرس توفر المواعيد من لقطة
+def _build_availability_index(slots, version):
+    """
+    تحويل لقطة المواعيد إلى فهرس توفر
+    """
+    date_column = 'date' if 'date' in slots.columns else 'booking_date'
+    time_column = 'time' if 'time' in slots.columns else 'slot_time'
+    
+    # إذا لم يكن هناك عمود is_available، استخدم وظيفة get_available_dates من utils
+    if date_column not in slots.columns or 'is_available' not in slots.columns:
+        dates = utils_get_available_dates()
+        return AvailabilityIndex.from_slots(dates, [None] * len(dates), [True] * len(dates), version=version)
+    
+    times = slots[time_column].astype(str).tolist() if time_column in slots.columns else [None] * len(slots)
+    available = slots['is_available'].tolist()
+    
+    return AvailabilityIndex.from_slots(format_dates(slots[date_column]).tolist(), times, available, version=version)
+
 # التحقق من توفر تاريخ للحجز
 def check_date_availability(date):
     """
     التحقق من توفر تاريخ للحجز
     """
     try:
-        # الحصول على التواريخ المتاحة والمحجوزة
-        available_dates = get_available_dates()
-        booked_dates = get_booked_dates()
+        # الحصول على فهرس توفر المواعيد
+        index = get_availability_index()
         
         # التحقق من توفر التاريخ
-        if date in booked_dates:
+        if index.is_booked(date):
             return False, "هذا التاريخ محجوز مسبقاً"
         
-        if date not in available_dates:
+        if not index.is_available(date):
             return False, "هذا التاريخ غير متاح للحجز"
         
         # التحقق من أن التاريخ ليس في الماضي
@@ -529,115 +958,87 @@ def check_date_availability(date):
     except Exception as e:
         raise Exception(f"خطأ في التحقق من توفر التاريخ: {str(e)}")
 
+# التحقق من توفر مجموعة من التواريخ
+def check_dates_availability(dates):
+    """
+    التحقق من توفر مجموعة من التواريخ باستخدام فهرس واحد
+    تعيد قاموساً {التاريخ: هل هو متاح للحجز}
+    """
+    try:
+        index = get_availability_index()
+        today = datetime.now().strftime("%Y-%m-%d")
+        
+        return {date: index.is_available(date) and str(date) >= today for date in dates}
+    
+    except Exception as e:
+        raise Exception(f"خطأ في التحقق من توفر التواريخ: {str(e)}")
+
 # الحصول على إحصائيات الحجوزات
 def get_booking_statistics():
     """
     الحصول على إحصائيات الحجوزات
+    تحسب جميع الإحصائيات في تمريرة واحدة وتخزن حسب إصدار بيانات الحجوزات
     """
     try:
-        # الحصول على جميع الحجوزات
-        bookings = get_all_bookings()
-        
-        # إجمالي الحجوزات
-        total_bookings = len(bookings)
-        
-        # الحجوزات حسب الحالة
-        confirmed_bookings = len(bookings[bookings['status'] == 'مؤكد'])
-        cancelled_bookings = len(bookings[bookings['status'] == 'ملغي'])
-        rescheduled_bookings = len(bookings[bookings['status'] == 'مرحل'])
-        
-        # الحجوزات حسب اليوم
-        bookings['booking_date_obj'] = pd.to_datetime(bookings['booking_date'])
-        bookings['day_of_week'] = bookings['booking_date_obj'].dt.day_name()
-        
-        # ترجمة أسماء الأيام إلى العربية
-        day_map = {
-            'Monday': 'الإثنين',
-            'Tuesday': 'الثلاثاء',
-            'Wednesday': 'الأربعاء',
-            'Thursday': 'الخميس',
-            'Friday': 'الجمعة',
-            'Saturday': 'السبت',
-            'Sunday': 'الأحد'
-        }
-        
-        bookings['day_of_week_ar'] = bookings['day_of_week'].map(day_map)
-        
-        # الحجوزات حسب اليوم
-        bookings_by_day = bookings['day_of_week_ar'].value_counts().to_dict()
-        
-        # الحجوزات حسب الشهر
-        bookings['month'] = bookings['booking_date_obj'].dt.month
-        bookings['month_name'] = bookings['booking_date_obj'].dt.month_name()
-        
-        # ترجمة أسماء الشهور إلى العربية
-        month_map = {
-            'January': 'يناير',
-            'February': 'فبراير',
-            'March': 'مارس',
-            'April': 'أبريل',
-            'May': 'مايو',
-            'June': 'يونيو',
-            'July': 'يوليو',
-            'August': 'أغسطس',
-            'September': 'سبتمبر',
-            'October': 'أكتوبر',
-            'November': 'نوفمبر',
-            'December': 'ديسمبر'
-        }
-        
-        bookings['month_name_ar'] = bookings['month_name'].map(month_map)
+        # الحصول على لقطة الحجوزات مع رقم إصدارها
+        bookings, version = _snapshot_cache.get_versioned('Bookings', _download_bookings)
         
-        # الحجوزات حسب الشهر
-        bookings_by_month = bookings['month_name_ar'].value_counts().to_dict()
-        
-        # الحجوزات حسب الشركة
-        bookings_by_company = bookings['company_name'].value_counts().to_dict()
-        
-        # إنشاء قاموس الإحصائيات
-        statistics = {
-            'total_bookings': total_bookings,
-            'confirmed_bookings': confirmed_bookings,
-            'cancelled_bookings': cancelled_bookings,
-            'rescheduled_bookings': rescheduled_bookings,
-            'bookings_by_day': bookings_by_day,
-            'bookings_by_month': bookings_by_month,
-            'bookings_by_company': bookings_by_company
-        }
-        
-        return statistics
+        # يعاد الحساب فقط عند تغير الإصدار، وتطبق التغييرات الفردية تدريجياً
+        return _booking_statistics.get(version, bookings)
     
     except Exception as e:
         raise Exception(f"خطأ في الحصول على إحصائيات الحجوزات: {str(e)}")
 
+# تحميل البيانات المرجعية
+def _download_reference_data():
+    """
+    تحميل ورقتي الشركات والمشاريع معاً (طلب واحد إن دعمه المصدر) وبناء فهارسهما
+    """
+    return _build_reference_data(get_backend().get_many(REFERENCE_SHEETS))
+
+def _build_reference_data(frames):
+    return ReferenceData(frames.get('Companies'), frames.get('Projects'))
+
+# الحصول على البيانات المرجعية
+def get_reference_data():
+    """
+    الحصول على الشركات والمشاريع وفهارس الربط بينها (للقراءة فقط)
+    تحمل مرة واحدة خلال config.REFERENCE_CACHE_TTL أو حتى invalidate_reference_data
+    """
+    try:
+        return _reference_cache.get('Reference', _download_reference_data)
+    
+    except Exception as e:
+        raise Exception(f"خطأ في الحصول على البيانات المرجعية: {str(e)}")
+
+# البيانات المرجعية المخزنة حالياً
+def peek_reference_data():
+    """
+    الحصول على البيانات المرجعية المخزنة فقط دون تحميل، أو None
+    """
+    return _reference_cache.peek('Reference')
+
+# تخزين البيانات المرجعية من أوراق تم تحميلها معاً
+def store_reference_data(frames):
+    """
+    بناء البيانات المرجعية من قاموس {الورقة: DataFrame} لورقتي الشركات والمشاريع وتخزينها
+    """
+    return _reference_cache.get('Reference', partial(_build_reference_data, frames))
+
+# إبطال البيانات المرجعية
+def invalidate_reference_data():
+    """
+    إبطال الشركات والمشاريع المخزنة بعد تعديلها في الورقة لإجبار التحميل من جديد
+    """
+    _reference_cache.invalidate()
+
 # الحصول على بيانات الشركات
 def get_companies():
     """
     الحصول على بيانات الشركات
     """
     try:
-        client = connect_to_sheets()
-        
-        # إذا كان الاتصال مؤقتاً، استخدم البيانات المؤقتة
-        if isinstance(client, dict):
-            # استخراج الشركات الفريدة من الحجوزات
-            bookings = client['bookings']
-            companies = bookings[['company_name', 'area_name']].drop_duplicates().to_dict('records')
-            return companies
-        
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
-        
-        # الوصول إلى ورقة الشركات
-        companies_sheet = sheet.worksheet('Companies')
-        
-        # الحصول على جميع البيانات
-        data = companies_sheet.get_all_records()
-        
-        # تحويل البيانات إلى DataFrame
-        companies_df = pd.DataFrame(data)
-        
-        return companies_df.to_dict('records')
+        return get_reference_data().companies_frame.to_dict('records')
     
     except Exception as e:
         raise Exception(f"خطأ في الحصول على بيانات الشركات: {str(e)}")
@@ -648,96 +1049,119 @@ def get_projects():
     الحصول على بيانات المشاريع
     """
     try:
-        client = connect_to_sheets()
-        
-        # إذا كان الاتصال مؤقتاً، استخدم البيانات المؤقتة
-        if isinstance(client, dict):
-            # استخراج المشاريع الفريدة من الحجوزات
-            bookings = client['bookings']
-            projects = bookings[['project_name', 'company_name']].drop_duplicates().to_dict('records')
-            return projects
-        
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
-        
-        # الوصول إلى ورقة المشاريع
-        projects_sheet = sheet.worksheet('Projects')
-        
-        # الحصول على جميع البيانات
-        data = projects_sheet.get_all_records()
-        
-        # تحويل البيانات إلى DataFrame
-        projects_df = pd.DataFrame(data)
-        
-        return projects_df.to_dict('records')
+        return get_reference_data().projects_frame.to_dict('records')
     
     except Exception as e:
         raise Exception(f"خطأ في الحصول على بيانات المشاريع: {str(e)}")
 
-# الحصول على إعدادات التطبيق
-def get_settings():
+# الحصول على الشركات كسجلات
+def get_company_records():
     """
-    الحصول على إعدادات التطبيق
+    الحصول على بيانات الشركات كقائمة سجلات Company
     """
     try:
-        client = connect_to_sheets()
-        
-        # إذا كان الاتصال مؤقتاً، استخدم إعدادات افتراضية
-        if isinstance(client, dict):
-            settings = {
-                'company_name': 'شركة التطوير العقاري الرائدة',
-                'app_title': 'نظام حجز مواعيد العروض التقديمية',
-                'booking_time': '12:00 - 12:30',
-                'weeks_ahead': 8
-            }
-            return settings
-        
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
-        
-        # الوصول إلى ورقة الإعدادات
-        settings_sheet = sheet.worksheet('Settings')
-        
-        # الحصول على جميع البيانات
-        data = settings_sheet.get_all_records()
-        
-        # تحويل البيانات إلى قاموس
-        settings = {}
-        for row in data:
-            settings[row['key']] = row['value']
-        
-        return settings
+        return list(get_reference_data().companies)
+    
+    except Exception as e:
+        raise Exception(f"خطأ في الحصول على بيانات الشركات: {str(e)}")
+
+# الحصول على المشاريع كسجلات
+def get_project_records():
+    """
+    الحصول على بيانات المشاريع كقائمة سجلات Project
+    """
+    try:
+        return list(get_reference_data().projects)
+    
+    except Exception as e:
+        raise Exception(f"خطأ في الحصول على بيانات المشاريع: {str(e)}")
+
+# تحميل الإعدادات ودمجها
+def _download_app_settings():
+    return AppSettings(settings_from_frame(get_backend().get_rows(SETTINGS_SHEET)))
+
+# الحصول على الإعدادات المدمجة
+def get_app_settings():
+    """
+    الحصول على إعدادات AppSettings: قيم ورقة الإعدادات فوق القيم الافتراضية في config.py (للقراءة فقط)
+    تحمل الورقة مرة واحدة ويعاد استخدام نفس الكائن حتى يتغير إصدارها، فلا تكلف إعادة تشغيل الواجهة أي تحميل
+    """
+    try:
+        return _snapshot_cache.get(SETTINGS_SHEET, _download_app_settings)
     
     except Exception as e:
         raise Exception(f"خطأ في الحصول على إعدادات التطبيق: {str(e)}")
 
+# الإعدادات المخزنة حالياً
+def peek_app_settings():
+    """
+    الحصول على الإعدادات المخزنة فقط دون تحميل، أو None
+    """
+    return _snapshot_cache.peek(SETTINGS_SHEET)
+
+# تخزين إعدادات من ورقة تم تحميلها
+def store_app_settings(df):
+    """
+    دمج ورقة الإعدادات المحملة للتو وتخزينها، وإعادة الإعدادات المخزنة
+    """
+    return _snapshot_cache.get(SETTINGS_SHEET, lambda: AppSettings(settings_from_frame(df)))
+
+# رقم إصدار الإعدادات
+def get_settings_version():
+    """
+    رقم إصدار يتغير مع كل تحميل أو تعديل للإعدادات، لتخزين ما يشتق منها
+    """
+    return _snapshot_cache.version(SETTINGS_SHEET)
+
+# الحصول على إعدادات التطبيق
+def get_settings():
+    """
+    الحصول على إعدادات التطبيق كما في ورقة الإعدادات
+    """
+    return dict(get_app_settings().sheet_values)
+
 # تحديث إعدادات التطبيق
 def update_settings(updated_settings):
     """
     تحديث إعدادات التطبيق
+    يتم قراءة ورقة الإعدادات مرة واحدة وكتابة القيم المتغيرة والإعدادات الجديدة في عملية واحدة
     """
     try:
-        client = connect_to_sheets()
-        
-        # إذا كان الاتصال مؤقتاً، تجاهل التحديث
-        if isinstance(client, dict):
-            return True
-        
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
-        
-        # الوصول إلى ورقة الإعدادات
-        settings_sheet = sheet.worksheet('Settings')
-        
-        # تحديث الإعدادات
+        backend = get_backend()
+        
+        # قراءة ورقة الإعدادات مرة واحدة
+        settings = backend.get_rows('Settings')
+        columns = list(settings.columns) if len(settings.columns) > 0 else ['key', 'value']
+        
+        # تحديد عمود القيمة من رؤوس الأعمدة
+        value_column = 'value'
+        for name in ('value', 'setting_value'):
+            if name in columns:
+                value_column = name
+                break
+        
+        current = {}
+        if value_column in settings.columns:
+            current = dict(zip(settings.iloc[:, 0].astype(str), settings[value_column]))
+        
+        # تجميع القيم المتغيرة والإعدادات الجديدة
+        updates = []
+        appends = []
         for key, value in updated_settings.items():
-            # البحث عن الإعداد
-            cell = settings_sheet.find(key)
-            
-            if cell:
-                # تحديث قيمة الإعداد
-                row = cell.row
-                settings_sheet.update_cell(row, 2, value)
+            if str(key) in current:
+                if str(current[str(key)]) != str(value):
+                    updates.append(('Settings', key, {value_column: value}))
+            else:
+                # إضافة الإعداد الجديد في نهاية الورقة
+                new_row = [''] * max(len(columns), 2)
+                new_row[0] = key
+                new_row[columns.index(value_column) if value_column in columns else 1] = value
+                appends.append(('Settings', new_row))
+        
+        # كتابة جميع التغييرات في عملية واحدة
+        if updates or appends:
+            backend.batch_update(updates, appends)
+            _invalidate_sheet(SETTINGS_SHEET)
         
         return True
     
@@ -745,40 +1169,89 @@ def update_settings(updated_settings):
         raise Exception(f"خطأ في تحديث إعدادات التطبيق: {str(e)}")
 
 # إعادة توليد المواعيد المتاحة
-def regenerate_available_slots(weeks_ahead=8):
+def regenerate_available_slots(weeks_ahead=None):
     """
     إعادة توليد المواعيد المتاحة للأسابيع القادمة
+    تتم مقارنة المواعيد المطلوبة بالمواعيد الحالية، ثم تنفيذ الحذف والإضافة فقط
+    في طلب واحد مع الحفاظ على حالة المواعيد الموجودة
+    أيام الحجز ووقته وعدد الأسابيع (إذا لم يحدد weeks_ahead) من إعدادات التطبيق
     """
     try:
-        client = connect_to_sheets()
+        backend = get_backend()
+        settings = get_app_settings()
         
-        # إذا كان الاتصال مؤقتاً، تجاهل العملية
-        if isinstance(client, dict):
-            return True
+        # المواعيد المطلوبة للأسابيع القادمة
+        target_dates = utils_get_available_dates(weeks_ahead, settings)
         
-        # فتح جدول البيانات
-        sheet = client.open('Real Estate Presentation Bookings')
+        # مطابقة المصدر مع الورقة أولاً حتى تطابق مواضع الصفوف المحسوبة الورقة الفعلية
+        backend.sync()
         
-        # الوصول إلى ورقة المواعيد المتاحة
-        slots_sheet = sheet.worksheet('Available_Slots')
+        # قراءة الحالة الحالية للورقة مرة واحدة
+        _invalidate_sheet('Available_Slots')
+        slots = _slots_snapshot()
+        columns = list(slots.columns) if len(slots.columns) > 0 else ['date', 'time', 'is_available']
         
-        # حذف جميع البيانات الحالية (باستثناء الصف الأول)
-        rows = slots_sheet.row_count
-        if rows > 1:
-            slots_sheet.delete_rows(2, rows - 1)
+        # حساب الفروقات بين المواعيد الحالية والمطلوبة
+        delete_positions, new_dates = _plan_slot_regeneration(slots, target_dates)
         
-        # إنشاء المواعيد المتاحة للأسابيع القادمة
-        available_dates = utils_get_available_dates(weeks_ahead)
+        if not delete_positions and not new_dates:
+            return True
         
-        # إضافة المواعيد إلى الجدول
-        for date in available_dates:
-            slots_sheet.append_row([
-                date,
-                '12:00 - 12:30',
-                'TRUE'
-            ])
+        # تنفيذ الحذف والإضافة في طلب واحد
+        backend.replace_rows('Available_Slots', delete_positions, [_new_slot_row(columns, date, settings.booking_time) for date in new_dates])
+        
+        # مواضع الصفوف تغيرت، لذلك يتم إبطال اللقطة
+        _invalidate_sheet('Available_Slots')
         
         return True
     
     except Exception as e:
         raise Exception(f"خطأ في إعادة توليد المواعيد المتاحة: {str(e)}")
+
+# حساب فروقات إعادة توليد المواعيد
+def _plan_slot_regeneration(slots, target_dates):
+    """
+    إرجاع مواضع الصفوف المطلوب حذفها وقائمة التواريخ الجديدة المطلوب إضافتها
+    يتم حذف المواعيد خارج النطاق المطلوب والمكررة، مع الإبقاء على المواعيد
+    المستقبلية المحجوزة حتى لو خرجت من النطاق
+    """
+    date_column = 'date' if 'date' in slots.columns else 'slot_date'
+    target = set(target_dates)
+    today = datetime.now().strftime("%Y-%m-%d")
+    
+    delete_positions = []
+    seen = set()
+    
+    if date_column in slots.columns:
+        dates = format_dates(slots[date_column]).tolist()
+        if 'is_available' in slots.columns:
+            available = slots['is_available'].tolist()
+        else:
+            available = [True] * len(dates)
+        
+        for position, date in enumerate(dates):
+            if date in seen:
+                delete_positions.append(position)
+            elif date not in target and (date < today or available[position]):
+                delete_positions.append(position)
+            seen.add(date)
+    
+    new_dates = [date for date in target_dates if date not in seen]
+    
+    return delete_positions, new_dates
+
+# إنشاء صف موعد جديد حسب رؤوس الأعمدة
+def _new_slot_row(columns, date, time):
+    """
+    إنشاء قيم صف موعد جديد متاح بترتيب أعمدة الورقة
+    """
+    values = {
+        'date': date,
+        'slot_date': date,
+        'time': time,
+        'slot_time': time,
+        'is_available': 'TRUE',
+        'slot_id': f"SL{date.replace('-', '')}",
+        'slot_day': datetime.strptime(date, "%Y-%m-%d").strftime("%A")
+    }
+    return [values.get(column, '') for column in columns]
@@ -0,0 +1,113 @@
+"""
+وحدة الوصول غير المتزامن للبيانات: تحميل الأوراق المستقلة معاً بدلاً من واحدة بعد الأخرى
+عدة أوراق من نفس جدول البيانات تقرأ في طلب values_batch_get واحد إن دعمه مصدر التخزين،
+وإلا تقرأ كل ورقة في خيط منفصل بالتوازي
+الدوال المتزامنة في نهاية الوحدة تستدعي النسخ غير المتزامنة من صفحات Streamlit
+"""
+
+import asyncio
+import concurrent.futures
+
+import sheets_api
+from sheets_metrics import get_metrics
+
+# الأوراق التي تحتاجها صفحة الحجز
+BOOKING_PAGE_SHEETS = ('Available_Slots', 'Companies', 'Projects', 'Settings')
+
+
+async def fetch_sheets(sheet_names, backend=None):
+    """
+    تحميل أوراق من مصدر التخزين مباشرة (دون اللقطات) كقاموس {الورقة: DataFrame}
+    """
+    backend = backend or sheets_api.get_backend()
+    sheet_names = list(dict.fromkeys(sheet_names))
+    if not sheet_names:
+        return {}
+
+    metrics = get_metrics()
+
+    # طلب واحد لجميع الأوراق
+    if backend.batch_reads:
+        return await asyncio.to_thread(metrics.bind(backend.get_many), sheet_names)
+
+    # أو طلب لكل ورقة بالتوازي
+    frames = await asyncio.gather(*(
+        asyncio.to_thread(metrics.bind(backend.get_rows), name) for name in sheet_names
+    ))
+    return dict(zip(sheet_names, frames))
+
+
+async def get_sheets(sheet_names):
+    """
+    الحصول على عدة أوراق كقاموس {الورقة: DataFrame} (للقراءة فقط)
+    لقطات الأوراق المخزنة تقرأ من الذاكرة، والباقي يحمل معاً وتخزن أوراق اللقطات منه
+    """
+    frames = sheets_api.peek_sheets(sheet_names)
+    missing = [name for name in sheet_names if name not in frames]
+    if missing:
+        frames.update(sheets_api.store_sheets(await fetch_sheets(missing)))
+    return {name: frames[name] for name in sheet_names}
+
+
+async def load_booking_page_data():
+    """
+    بيانات صفحة الحجز في تحميل واحد: سجلات المواعيد، والبيانات المرجعية (الشركات والمشاريع
+    وفهارسها)، وإعدادات التطبيق المدمجة (AppSettings)
+    الشركات والمشاريع والإعدادات لا تحمل إذا كانت مخزنة
+    """
+    reference = sheets_api.peek_reference_data()
+    settings = sheets_api.peek_app_settings()
+    skipped = set()
+    if reference is not None:
+        skipped.update(sheets_api.REFERENCE_SHEETS)
+    if settings is not None:
+        skipped.add(sheets_api.SETTINGS_SHEET)
+    frames = await get_sheets([name for name in BOOKING_PAGE_SHEETS if name not in skipped])
+
+    if reference is None:
+        reference = sheets_api.store_reference_data(frames)
+    if settings is None:
+        settings = sheets_api.store_app_settings(frames[sheets_api.SETTINGS_SHEET])
+
+    return {
+        # سجلات المواعيد تبنى من اللقطة المخزنة للتو وتعاد استخدامها حتى تتغير
+        'slots': sheets_api.get_slot_records(),
+        'reference': reference,
+        'companies': reference.companies,
+        'projects': reference.projects,
+        'settings': settings
+    }
+
+
+def run(coroutine):
+    """
+    تشغيل دالة غير متزامنة من كود متزامن وإرجاع نتيجتها
+    إذا كانت هناك حلقة أحداث تعمل في الخيط الحالي تشغل الدالة في خيط منفصل
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(get_metrics().bind(asyncio.run), coroutine).result()
+
+
+def get_sheets_sync(sheet_names):
+    """
+    النسخة المتزامنة من get_sheets
+    """
+    try:
+        return run(get_sheets(sheet_names))
+    except Exception as e:
+        raise Exception(f"خطأ في تحميل الأوراق: {str(e)}")
+
+
+def get_booking_page_data():
+    """
+    النسخة المتزامنة من load_booking_page_data لصفحة الحجز
+    """
+    try:
+        return run(load_booking_page_data())
+    except Exception as e:
+        raise Exception(f"خطأ في تحميل بيانات صفحة الحجز: {str(e)}")
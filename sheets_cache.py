@@ -0,0 +1,135 @@
+"""
+وحدة التخزين المؤقت للقطات أوراق العمل داخل العملية
+"""
+
+import threading
+import time
+
+
+class SnapshotCache:
+    """
+    ذاكرة مؤقتة بإصدارات للقطات أوراق العمل الكاملة.
+    تتم قراءة الورقة مرة واحدة خلال مدة الصلاحية، وتقوم عمليات الكتابة
+    باستبدال اللقطة بنسخة معدلة أو إبطالها، ويزداد رقم الإصدار مع كل تغيير.
+    اللقطة المعادة لا تتغير بعد ذلك، فيمكن قراءتها دون قفل.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._versions = {}
+
+    def version(self, name):
+        """
+        رقم الإصدار الحالي لبيانات الورقة
+        """
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def _bump(self, name):
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def _is_fresh(self, entry):
+        return self.ttl is not None and time.monotonic() - entry['loaded_at'] < self.ttl
+
+    def get(self, name, loader):
+        """
+        الحصول على لقطة الورقة من الذاكرة أو تحميلها باستخدام الدالة loader
+        """
+        return self.get_versioned(name, loader)[0]
+
+    def get_versioned(self, name, loader):
+        """
+        الحصول على اللقطة مع رقم الإصدار المطابق لها
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and self._is_fresh(entry):
+                return entry['data'], self._versions.get(name, 0)
+            version_before = self._versions.get(name, 0)
+
+        return self._load(name, loader, version_before)
+
+    def _load(self, name, loader, version_before):
+        """
+        تحميل اللقطة وتخزينها إذا لم تحدث كتابة أثناء التحميل
+        """
+        # التحميل خارج القفل حتى لا تتعطل القراءات الأخرى
+        data = loader()
+
+        with self._lock:
+            # لا تخزن لقطة بدأ تحميلها قبل عملية كتابة لاحقة، ولا تنسب لها إصداراً
+            if self._versions.get(name, 0) != version_before:
+                return data, None
+            self._entries[name] = {'data': data, 'loaded_at': time.monotonic()}
+            self._bump(name)
+            return data, self._versions[name]
+
+    def refresh(self, name, loader):
+        """
+        إعادة تحميل اللقطة واستبدال المخزنة دون إبطالها أثناء التحميل
+        تعيد True إذا تم تخزين اللقطة الجديدة
+        """
+        with self._lock:
+            version_before = self._versions.get(name, 0)
+
+        return self._load(name, loader, version_before)[1] is not None
+
+    def touch(self, name):
+        """
+        تمديد صلاحية اللقطة المخزنة بعد التأكد من أن الورقة لم تتغير
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return False
+            entry['loaded_at'] = time.monotonic()
+            return True
+
+    def peek(self, name):
+        """
+        الحصول على اللقطة المخزنة إن وجدت دون تحميل
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and self._is_fresh(entry):
+                return entry['data']
+            return None
+
+    def patch(self, name, func):
+        """
+        تعديل نسخة من اللقطة المخزنة بعد عملية كتابة ثم استبدالها بها،
+        فلا تتغير اللقطة التي يقرأها مستخدمون آخرون
+        الدالة func تستقبل النسخة وتعيد اللقطة الجديدة
+        تعيد رقم الإصدار الجديد
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is None:
+                    self._bump(name)
+                    return self._versions[name]
+                version_before = self._versions.get(name, 0)
+
+            # النسخ والتعديل خارج القفل حتى لا تتعطل القراءات الأخرى
+            data = func(entry['data'].copy())
+
+            with self._lock:
+                # إعادة المحاولة على اللقطة الأحدث إذا تغيرت أثناء التعديل
+                if self._versions.get(name, 0) != version_before:
+                    continue
+                entry['data'] = data
+                self._bump(name)
+                return self._versions[name]
+
+    def invalidate(self, name=None):
+        """
+        إبطال لقطة ورقة محددة أو جميع اللقطات
+        """
+        with self._lock:
+            names = [name] if name is not None else list(self._entries)
+            for key in names:
+                self._entries.pop(key, None)
+                self._bump(key)
@@ -0,0 +1,151 @@
+"""
+وحدة إدارة الاتصال المشترك بـ Google Sheets
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+
+from sheets_scheduler import ScheduledSpreadsheet, get_scheduler
+
+# نطاق الوصول المطلوب لـ Google Sheets API
+SCOPES = ['https://spreadsheets.google.com/feeds',
+          'https://www.googleapis.com/auth/drive']
+
+# مدة صلاحية رمز الوصول الافتراضية إذا لم يحددها الاعتماد (بالثواني)
+DEFAULT_TOKEN_LIFETIME = 3600
+
+# هامش تجديد الرمز قبل انتهاء صلاحيته (بالثواني)
+TOKEN_REFRESH_MARGIN = 300
+
+
+class SheetsConnectionManager:
+    """
+    مدير اتصال مشترك على مستوى العملية.
+    يقوم بالتفويض مرة واحدة ويحتفظ بجدول البيانات وأوراق العمل المفتوحة
+    حتى يقترب موعد انتهاء صلاحية رمز الوصول.
+    جميع استدعاءات جدول البيانات وأوراق العمل تمر عبر مجدول الحصص.
+    """
+
+    def __init__(self, creds_path, spreadsheet_name, scope=None, scheduler=None, client_factory=None):
+        """
+        client_factory: دالة اختيارية تعيد عميلاً متوافقاً مع gspread بدلاً من التفويض
+                        بملف الاعتماد (مثل خدمة fake_sheets المحلية)
+        """
+        self.creds_path = creds_path
+        self.spreadsheet_name = spreadsheet_name
+        self.scope = scope or SCOPES
+        self.scheduler = scheduler or get_scheduler()
+        self.client_factory = client_factory
+
+        self._lock = threading.RLock()
+        self._creds = None
+        self._client = None
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._authorized_at = None
+
+    def _token_expires_at(self):
+        """
+        موعد انتهاء صلاحية رمز الوصول الحالي
+        """
+        expiry = getattr(self._creds, 'token_expiry', None)
+        if expiry is not None:
+            return expiry
+        return self._authorized_at + timedelta(seconds=DEFAULT_TOKEN_LIFETIME)
+
+    def _needs_authorization(self):
+        """
+        التحقق مما إذا كان الاتصال يحتاج إلى تفويض جديد
+        """
+        if self._client is None:
+            return True
+
+        remaining = self._token_expires_at() - datetime.utcnow()
+        return remaining.total_seconds() < TOKEN_REFRESH_MARGIN
+
+    def _authorize(self):
+        """
+        إنشاء اعتماد جديد والاتصال بـ Google Sheets
+        """
+        if self.client_factory is not None:
+            self._creds = None
+            self._client = self.client_factory()
+        else:
+            self._creds = ServiceAccountCredentials.from_json_keyfile_name(self.creds_path, self.scope)
+            self._client = gspread.authorize(self._creds)
+        self._authorized_at = datetime.utcnow()
+
+        # المقابض المفتوحة مرتبطة بالعميل القديم
+        self._spreadsheet = None
+        self._worksheets = {}
+
+    def get_client(self):
+        """
+        الحصول على عميل gspread المشترك
+        """
+        with self._lock:
+            if self._needs_authorization():
+                self._authorize()
+            return self._client
+
+    def get_spreadsheet(self):
+        """
+        الحصول على جدول البيانات المفتوح
+        """
+        with self._lock:
+            client = self.get_client()
+            if self._spreadsheet is None:
+                spreadsheet = self.scheduler.call('read', client.open, self.spreadsheet_name)
+                self._spreadsheet = ScheduledSpreadsheet(spreadsheet, self.scheduler)
+            return self._spreadsheet
+
+    def get_worksheet(self, title):
+        """
+        الحصول على ورقة عمل بالاسم مع الاحتفاظ بالمقبض للاستدعاءات التالية
+        """
+        with self._lock:
+            spreadsheet = self.get_spreadsheet()
+            if title not in self._worksheets:
+                self._worksheets[title] = spreadsheet.worksheet(title)
+            return self._worksheets[title]
+
+    def get_worksheet_by_index(self, index):
+        """
+        الحصول على ورقة عمل بالترتيب مع الاحتفاظ بالمقبض
+        """
+        with self._lock:
+            spreadsheet = self.get_spreadsheet()
+            key = ('index', index)
+            if self._worksheets.get(key) is None:
+                self._worksheets[key] = spreadsheet.get_worksheet(index)
+            return self._worksheets[key]
+
+    def reset(self):
+        """
+        إلغاء الاتصال الحالي وإجبار التفويض من جديد عند الاستدعاء التالي
+        """
+        with self._lock:
+            self._creds = None
+            self._client = None
+            self._spreadsheet = None
+            self._worksheets = {}
+            self._authorized_at = None
+
+
+# مديرو الاتصال المشتركون حسب (ملف الاعتماد، اسم جدول البيانات)
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(creds_path, spreadsheet_name):
+    """
+    الحصول على مدير الاتصال المشترك لملف اعتماد وجدول بيانات محددين
+    """
+    key = (creds_path, spreadsheet_name)
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = SheetsConnectionManager(creds_path, spreadsheet_name)
+        return _managers[key]
@@ -6,55 +6,124 @@ for the appointment booking application. It supports both importing data from an
 exporting data to Google Sheets.
 """
 
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
 from datetime import datetime
-import json
+from functools import partial
 import os
+import threading
+
+from sheets_connection import SheetsConnectionManager, get_connection_manager
+from sheets_cache import SnapshotCache
+from snapshot_refresher import SnapshotRefresher
+from storage_backends import GSpreadBackend, MemoryBackend
+from availability_index import AvailabilityIndex
+from app_settings import AppSettings, settings_from_frame
+from sheet_schema import APPOINTMENTS_SCHEMA, apply_schema, format_dates
+from booking_archive import archive_cutoff, archive_rows, read_archive
+import config
+
+# Name of the spreadsheet holding the appointments
+SPREADSHEET_NAME = "Al-Hayah Appointment Bookings"
+
+# Statuses that occupy a slot
+ACTIVE_STATUSES = ['Confirmed', 'Rescheduled']
+
+# Optional worksheet holding the app settings (key/value rows)
+SETTINGS_SHEET = "Settings"
+
+# Header row of the appointments worksheet
+APPOINTMENT_COLUMNS = ["ID", "Company Name", "Project Name", "Area", "Presentation Date",
+                       "Time", "Developer Representative", "Status", "Created At", "Updated At"]
+
+# Appointment fields accepted by update_appointment and their sheet columns
+FIELD_COLUMNS = {
+    'company_name': "Company Name",
+    'project_name': "Project Name",
+    'area': "Area",
+    'presentation_date': "Presentation Date",
+    'time': "Time",
+    'developer_representative': "Developer Representative",
+    'status': "Status"
+}
 
 class SheetsIntegration:
-    def __init__(self, credentials_path="C:\\Users\\DELL\\Documents\\Python\\Project\\al-hayah-booking-app\\credentials.json"):
+    def __init__(self, credentials_path="C:\\Users\\DELL\\Documents\\Python\\Project\\al-hayah-booking-app\\credentials.json",
+                 client_factory=None):
         """
         Initialize the Google Sheets integration.
         
         Args:
             credentials_path: Path to the Google Sheets API credentials JSON file.
                              If None, will look for credentials in environment or create dummy data.
+            client_factory: Optional callable returning a gspread-compatible client
+                            (such as fake_sheets.FakeSheetsService.client) used
+                            instead of authorizing with the credentials file.
         """
         self.scope = ['https://spreadsheets.google.com/feeds',
                      'https://www.googleapis.com/auth/drive']
         
         self.credentials_path = credentials_path
+        self.client_factory = client_factory
+        self.connection = None
         self.client = None
         self.sheet = None
         self.worksheet = None
         
+        # Storage backend holding the appointments worksheet: Google Sheets,
+        # or in-memory tables for development without credentials
+        self.backend = None
+        self.sheet_name = "Appointments"
+        
+        # In-memory appointments snapshot, kept current by a background
+        # thread that re-downloads the sheet only when it has changed
+        self.snapshots = SnapshotCache(ttl=config.SHEETS_CACHE_TTL)
+        self.refresher = SnapshotRefresher(self.snapshots)
+        
+        # Availability index built from one appointments snapshot,
+        # rebuilt when data_version or the snapshot version changes
+        self.data_version = 0
+        self._availability_index = None
+        
+        # Last appointment ID issued, so IDs created within one second stay unique
+        self._last_appointment_id = 0
+        self._id_lock = threading.Lock()
+        
         # For development without actual credentials
-        self.use_dummy_data = credentials_path is None
-        self.dummy_data = []
+        self.use_dummy_data = credentials_path is None and client_factory is None
         
         # Initialize the connection
         self.initialize_connection()
         
     def initialize_connection(self):
         """Initialize connection to Google Sheets or set up dummy data."""
-        if not self.use_dummy_data and os.path.exists(self.credentials_path):
+        if self.client_factory is not None or (not self.use_dummy_data and os.path.exists(self.credentials_path)):
             try:
-                # Connect to Google Sheets
-                credentials = ServiceAccountCredentials.from_json_keyfile_name(
-                    self.credentials_path, self.scope)
-                self.client = gspread.authorize(credentials)
+                # Connect to Google Sheets through the shared, process-wide connection
+                if self.client_factory is not None:
+                    self.connection = SheetsConnectionManager(self.credentials_path, SPREADSHEET_NAME,
+                                                              client_factory=self.client_factory)
+                else:
+                    self.connection = get_connection_manager(self.credentials_path, SPREADSHEET_NAME)
+                self.client = self.connection.get_client()
                 
                 # Open the spreadsheet - you'll need to replace with your actual spreadsheet name
-                self.sheet = self.client.open("Al-Hayah Appointment Bookings")
+                self.sheet = self.connection.get_spreadsheet()
                 
                 # Select the first worksheet
-                self.worksheet = self.sheet.get_worksheet(0)
+                self.worksheet = self.connection.get_worksheet_by_index(0)
                 
                 # If worksheet doesn't exist or is empty, initialize it with headers
                 if not self.worksheet or len(self.worksheet.get_all_values()) == 0:
                     self.initialize_worksheet()
+                
+                # Appointment values are kept as the strings shown in the sheet
+                self.sheet_name = self.worksheet.title
+                self.backend = GSpreadBackend(self.connection, numericise=False)
+                
+                # Keep the appointments snapshot hot in the background
+                self.refresher.watch('Appointments', self._download_appointments, self._probe_appointments,
+                                     partial(self.backend.invalidate, self.sheet_name))
+                self.refresher.start()
                     
                 print("Successfully connected to Google Sheets")
                 return True
@@ -64,22 +133,19 @@ class SheetsIntegration:
         else:
             print("Using dummy data for development")
             self.use_dummy_data = True
-            
-            # Initialize dummy data with headers
-            self.dummy_data = [
-                ["ID", "Company Name", "Project Name", "Area", "Presentation Date", 
-                 "Time", "Developer Representative", "Status", "Created At", "Updated At"]
-            ]
-            
-            # Create sample data for development
-            self.create_sample_data()
+        
+        # Initialize dummy data with headers
+        self.sheet_name = "Appointments"
+        self.backend = MemoryBackend({self.sheet_name: pd.DataFrame(columns=APPOINTMENT_COLUMNS)})
+        
+        # Create sample data for development
+        self.create_sample_data()
         
         return False
     
     def initialize_worksheet(self):
         """Initialize the worksheet with headers if it doesn't exist."""
-        headers = ["ID", "Company Name", "Project Name", "Area", "Presentation Date", 
-                  "Time", "Developer Representative", "Status", "Created At", "Updated At"]
+        headers = APPOINTMENT_COLUMNS
         
         if not self.use_dummy_data:
             # Create a new worksheet if it doesn't exist
@@ -93,36 +159,107 @@ class SheetsIntegration:
             self.worksheet.format('A1:J1', {'textFormat': {'bold': True}})
             self.worksheet.freeze(rows=1)
         
+    def _download_appointments(self):
+        """
+        Download the whole appointments worksheet from the storage backend.
+        
+        Columns are converted once to compact types: dates and timestamps to
+        datetime64, repeated names and statuses to categories, IDs to strings.
+        
+        Returns:
+            pandas.DataFrame: DataFrame containing all appointments
+        """
+        df = self.backend.get_rows(self.sheet_name)
+        
+        # Return empty DataFrame with correct columns
+        if len(df.columns) == 0:
+            df = pd.DataFrame(columns=APPOINTMENT_COLUMNS)
+        
+        return apply_schema(df, APPOINTMENTS_SCHEMA)
+    
+    def _probe_appointments(self):
+        """
+        Read a cheap signal that changes whenever the appointments sheet changes.
+        
+        Uses the spreadsheet's last update time, falling back to the row
+        count and latest 'Updated At' value from a single column read.
+        
+        Returns:
+            Hashable value to compare against the previous poll
+        """
+        try:
+            return self.sheet.get_lastUpdateTime()
+        except Exception:
+            updated_at = self.worksheet.col_values(10)
+            return (len(updated_at), max(updated_at[1:], default=''))
+    
+    def _appointments_snapshot(self):
+        """
+        Get the shared in-memory appointments snapshot without copying it.
+        
+        Returns:
+            pandas.DataFrame: Read-only DataFrame containing all appointments
+        """
+        return self.snapshots.get('Appointments', self._download_appointments)
+    
+    def _download_settings(self):
+        """
+        Download the app settings from the Settings worksheet of this spreadsheet.
+        
+        The worksheet is optional; without it every setting keeps its
+        default from config.py.
+        
+        Returns:
+            AppSettings: The merged settings
+        """
+        if SETTINGS_SHEET not in self.backend.get_sheet_names():
+            return AppSettings()
+        
+        return AppSettings(settings_from_frame(self.backend.get_rows(SETTINGS_SHEET)))
+    
+    def get_app_settings(self):
+        """
+        Get the app settings (booking days, booking time, weeks ahead).
+        
+        Read through this integration's own backend and cached with the
+        other snapshots, so a rerun does not download the settings again.
+        Falls back to the config.py defaults if the settings cannot be read.
+        
+        Returns:
+            AppSettings: Read-only merged settings
+        """
+        try:
+            return self.snapshots.get(SETTINGS_SHEET, self._download_settings)
+        except Exception as e:
+            print(f"Error loading app settings: {e}")
+            return AppSettings()
+    
+    def refresh(self):
+        """
+        Check the sheet for changes now and reload the snapshot if it changed.
+        
+        Returns:
+            list: Names of the snapshots that were reloaded
+        """
+        if self.use_dummy_data:
+            return []
+        
+        return self.refresher.poll()
+    
     def get_all_appointments(self):
         """
         Get all appointments from the Google Sheet.
         
+        Served from the in-memory snapshot kept current by the background refresher.
+        
         Returns:
             pandas.DataFrame: DataFrame containing all appointments
         """
-        if not self.use_dummy_data:
-            try:
-                # Get all data from the worksheet
-                data = self.worksheet.get_all_values()
-                
-                # Convert to DataFrame
-                if len(data) > 1:  # If there's data beyond headers
-                    df = pd.DataFrame(data[1:], columns=data[0])
-                    return df
-                else:
-                    # Return empty DataFrame with correct columns
-                    return pd.DataFrame(columns=data[0])
-            except Exception as e:
-                print(f"Error getting appointments: {e}")
-                return pd.DataFrame()
-        else:
-            # Return dummy data
-            if len(self.dummy_data) > 1:  # If there's data beyond headers
-                df = pd.DataFrame(self.dummy_data[1:], columns=self.dummy_data[0])
-                return df
-            else:
-                # Return empty DataFrame with correct columns
-                return pd.DataFrame(columns=self.dummy_data[0])
+        try:
+            return self._appointments_snapshot().copy()
+        except Exception as e:
+            print(f"Error getting appointments: {e}")
+            return pd.DataFrame()
     
     def add_appointment(self, company_name, project_name, area, presentation_date, 
                        time, developer_representative):
@@ -143,7 +280,7 @@ class SheetsIntegration:
         try:
             # Generate a unique ID
             now = datetime.now()
-            appointment_id = now.strftime("%Y%m%d%H%M%S")
+            appointment_id = self._new_appointment_id(now)
             
             # Create new row
             new_row = [
@@ -159,22 +296,41 @@ class SheetsIntegration:
                 now.strftime("%Y-%m-%d %H:%M:%S")   # Updated at
             ]
             
-            if not self.use_dummy_data:
-                # Append to worksheet
-                self.worksheet.append_row(new_row)
-            else:
-                # Append to dummy data
-                self.dummy_data.append(new_row)
-                
+            # Append to the worksheet
+            self.backend.append_rows(self.sheet_name, [new_row])
+            self.snapshots.invalidate('Appointments')
+            
+            self.data_version += 1
             return True
         except Exception as e:
             print(f"Error adding appointment: {e}")
             return False
     
+    def _new_appointment_id(self, now):
+        """
+        Generate a timestamp appointment ID (YYYYMMDDHHMMSS).
+        
+        IDs issued in the same second are bumped past the last one, so
+        several appointments added together never share an ID.
+        
+        Args:
+            now: datetime of the new appointment
+            
+        Returns:
+            str: The new appointment ID
+        """
+        with self._id_lock:
+            appointment_id = max(int(now.strftime("%Y%m%d%H%M%S")), self._last_appointment_id + 1)
+            self._last_appointment_id = appointment_id
+        return str(appointment_id)
+    
     def update_appointment(self, appointment_id, **kwargs):
         """
         Update an existing appointment.
         
+        All changed cells, including the 'Updated At' timestamp, are written
+        in a single batch request.
+        
         Args:
             appointment_id: Unique ID of the appointment to update
             **kwargs: Fields to update (company_name, project_name, area, 
@@ -184,59 +340,17 @@ class SheetsIntegration:
             bool: True if successful, False otherwise
         """
         try:
-            if not self.use_dummy_data:
-                # Find the row with the matching ID
-                cell = self.worksheet.find(appointment_id)
-                if not cell:
-                    return False
-                
-                row_num = cell.row
-                
-                # Get the current row data
-                row_data = self.worksheet.row_values(row_num)
-                
-                # Update fields
-                if 'company_name' in kwargs:
-                    self.worksheet.update_cell(row_num, 2, kwargs['company_name'])
-                if 'project_name' in kwargs:
-                    self.worksheet.update_cell(row_num, 3, kwargs['project_name'])
-                if 'area' in kwargs:
-                    self.worksheet.update_cell(row_num, 4, kwargs['area'])
-                if 'presentation_date' in kwargs:
-                    self.worksheet.update_cell(row_num, 5, kwargs['presentation_date'])
-                if 'time' in kwargs:
-                    self.worksheet.update_cell(row_num, 6, kwargs['time'])
-                if 'developer_representative' in kwargs:
-                    self.worksheet.update_cell(row_num, 7, kwargs['developer_representative'])
-                if 'status' in kwargs:
-                    self.worksheet.update_cell(row_num, 8, kwargs['status'])
-                
-                # Update the 'updated_at' timestamp
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.worksheet.update_cell(row_num, 10, now)
-            else:
-                # Update dummy data
-                for i, row in enumerate(self.dummy_data):
-                    if i > 0 and row[0] == appointment_id:  # Skip header row
-                        if 'company_name' in kwargs:
-                            row[1] = kwargs['company_name']
-                        if 'project_name' in kwargs:
-                            row[2] = kwargs['project_name']
-                        if 'area' in kwargs:
-                            row[3] = kwargs['area']
-                        if 'presentation_date' in kwargs:
-                            row[4] = kwargs['presentation_date']
-                        if 'time' in kwargs:
-                            row[5] = kwargs['time']
-                        if 'developer_representative' in kwargs:
-                            row[6] = kwargs['developer_representative']
-                        if 'status' in kwargs:
-                            row[7] = kwargs['status']
-                        
-                        # Update the 'updated_at' timestamp
-                        row[9] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        break
+            changes = {FIELD_COLUMNS[field]: value for field, value in kwargs.items() if field in FIELD_COLUMNS}
             
+            # Update the 'updated_at' timestamp
+            changes["Updated At"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            # The appointment was not found
+            if self.backend.batch_update([(self.sheet_name, appointment_id, changes)]):
+                return False
+            self.snapshots.invalidate('Appointments')
+            
+            self.data_version += 1
             return True
         except Exception as e:
             print(f"Error updating appointment: {e}")
@@ -277,41 +391,18 @@ class SheetsIntegration:
         """
         Get a specific appointment by ID.
         
+        Only the appointment's own row is read from the sheet.
+        
         Args:
             appointment_id: Unique ID of the appointment
             
         Returns:
             dict: Appointment data or None if not found
         """
-        if not self.use_dummy_data:
-            try:
-                # Find the row with the matching ID
-                cell = self.worksheet.find(appointment_id)
-                if not cell:
-                    return None
-                
-                row_num = cell.row
-                
-                # Get the row data
-                row_data = self.worksheet.row_values(row_num)
-                
-                # Get headers
-                headers = self.worksheet.row_values(1)
-                
-                # Create dictionary
-                appointment = dict(zip(headers, row_data))
-                return appointment
-            except Exception as e:
-                print(f"Error getting appointment: {e}")
-                return None
-        else:
-            # Search dummy data
-            for i, row in enumerate(self.dummy_data):
-                if i > 0 and row[0] == appointment_id:  # Skip header row
-                    # Create dictionary
-                    appointment = dict(zip(self.dummy_data[0], row))
-                    return appointment
-            
+        try:
+            return self.backend.get_range(self.sheet_name, [appointment_id]).get(str(appointment_id))
+        except Exception as e:
+            print(f"Error getting appointment: {e}")
             return None
     
     def get_appointments_by_date(self, date):
@@ -319,7 +410,7 @@ class SheetsIntegration:
         Get all appointments for a specific date.
         
         Args:
-            date: Date to filter by (YYYY-MM-DD)
+            date: Date to filter by (YYYY-MM-DD or a date object)
             
         Returns:
             pandas.DataFrame: DataFrame containing filtered appointments
@@ -329,10 +420,91 @@ class SheetsIntegration:
         
         # Filter by date
         if not df.empty:
-            return df[df['Presentation Date'] == date]
+            return df[df['Presentation Date'] == pd.to_datetime(date, errors='coerce')]
         
         return df
     
+    def archive_old_appointments(self, days=None):
+        """
+        Move appointments older than the archive cutoff into monthly archive worksheets.
+        
+        Keeps the appointments sheet limited to recent and upcoming appointments,
+        so every snapshot download costs in proportion to the active data.
+        
+        Args:
+            days: Age in days after which an appointment is archived
+                  (defaults to config.ARCHIVE_AFTER_DAYS)
+            
+        Returns:
+            dict: Number of archived appointments per month (YYYY-MM)
+        """
+        try:
+            # Row positions must match the sheet, so start from a fresh snapshot
+            self.snapshots.invalidate('Appointments')
+            moved = archive_rows(self.backend, self.sheet_name, self._appointments_snapshot(),
+                                 'Presentation Date', archive_cutoff(days), APPOINTMENTS_SCHEMA)
+            
+            if moved:
+                self.snapshots.invalidate('Appointments')
+                self.data_version += 1
+            return moved
+        except Exception as e:
+            print(f"Error archiving appointments: {e}")
+            return {}
+    
+    def get_archived_appointments(self, start_date=None, end_date=None):
+        """
+        Get archived appointments between two dates.
+        
+        Only the archive worksheets of the requested months are read.
+        
+        Args:
+            start_date: First presentation date to include (YYYY-MM-DD), or None
+            end_date: Last presentation date to include (YYYY-MM-DD), or None
+            
+        Returns:
+            pandas.DataFrame: DataFrame containing the archived appointments
+        """
+        try:
+            archived = read_archive(self.backend, self.sheet_name, 'Presentation Date', start_date, end_date)
+            return apply_schema(archived, APPOINTMENTS_SCHEMA)
+        except Exception as e:
+            print(f"Error getting archived appointments: {e}")
+            return pd.DataFrame()
+    
+    def get_availability_index(self):
+        """
+        Get the availability index keyed by (date, time).
+        
+        The index is built from the appointments snapshot and reused until an
+        appointment is added or updated, or the snapshot is reloaded.
+        
+        Returns:
+            AvailabilityIndex: Index of booked slots; unbooked slots are available
+        """
+        try:
+            df = self._appointments_snapshot()
+        except Exception as e:
+            print(f"Error getting appointments: {e}")
+            df = pd.DataFrame()
+        
+        index = self._availability_index
+        version = (self.data_version, self.snapshots.version('Appointments'))
+        
+        if index is None or index.version != version:
+            # Only active appointments occupy a slot
+            if not df.empty and {'Presentation Date', 'Time', 'Status'}.issubset(df.columns):
+                active = df[df['Status'].isin(ACTIVE_STATUSES)]
+                index = AvailabilityIndex.from_bookings(
+                    format_dates(active['Presentation Date']).tolist(), active['Time'].astype(str).tolist(),
+                    version=version)
+            else:
+                index = AvailabilityIndex.from_bookings([], [], version=version)
+            
+            self._availability_index = index
+        
+        return index
+    
     def is_slot_available(self, date, time):
         """
         Check if a specific date and time slot is available.
@@ -344,20 +516,20 @@ class SheetsIntegration:
         Returns:
             bool: True if slot is available, False otherwise
         """
-        # Get appointments for the date
-        df = self.get_appointments_by_date(date)
+        return self.get_availability_index().is_available(date, time)
+    
+    def are_slots_available(self, dates, time):
+        """
+        Check the availability of several dates at the same time slot.
         
-        # Check if there's an appointment at the specified time
-        if not df.empty:
-            # Filter by time and active statuses
-            active_statuses = ['Confirmed', 'Rescheduled']
-            filtered = df[(df['Time'] == time) & (df['Status'].isin(active_statuses))]
+        Args:
+            dates: Dates to check (YYYY-MM-DD)
+            time: Time to check (HH:MM)
             
-            # If there are any active appointments at this time, the slot is not available
-            return filtered.empty
-        
-        # No appointments for this date, so the slot is available
-        return True
+        Returns:
+            dict: Mapping of each date to True if available, False otherwise
+        """
+        return self.get_availability_index().check_many(dates, time)
     
     def import_appointments_from_sheet(self):
         """
@@ -365,39 +537,17 @@ class SheetsIntegration:
         This function is used when data is entered directly into the Google Sheet
         and needs to be displayed in the Streamlit app.
         
+        The background refresher picks up edits made in the sheet, so this is
+        served from memory; call refresh() to check for changes immediately.
+        
         Returns:
             pandas.DataFrame: DataFrame containing all appointments from the sheet
         """
-        if not self.use_dummy_data:
-            try:
-                # Refresh the connection to get the latest data
-                credentials = ServiceAccountCredentials.from_json_keyfile_name(
-                    self.credentials_path, self.scope)
-                self.client = gspread.authorize(credentials)
-                self.sheet = self.client.open("Al-Hayah Appointment Bookings")
-                self.worksheet = self.sheet.get_worksheet(0)
-                
-                # Get all data from the worksheet
-                data = self.worksheet.get_all_values()
-                
-                # Convert to DataFrame
-                if len(data) > 1:  # If there's data beyond headers
-                    df = pd.DataFrame(data[1:], columns=data[0])
-                    return df
-                else:
-                    # Return empty DataFrame with correct columns
-                    return pd.DataFrame(columns=data[0])
-            except Exception as e:
-                print(f"Error importing appointments from sheet: {e}")
-                return pd.DataFrame()
-        else:
-            # Return dummy data
-            if len(self.dummy_data) > 1:  # If there's data beyond headers
-                df = pd.DataFrame(self.dummy_data[1:], columns=self.dummy_data[0])
-                return df
-            else:
-                # Return empty DataFrame with correct columns
-                return pd.DataFrame(columns=self.dummy_data[0])
+        try:
+            return self._appointments_snapshot().copy()
+        except Exception as e:
+            print(f"Error importing appointments from sheet: {e}")
+            return pd.DataFrame()
     
     def get_paginated_appointments(self, page=1, per_page=12, status_filter=None):
         """
@@ -438,7 +588,7 @@ class SheetsIntegration:
     def create_sample_data(self):
         """Create sample data for testing purposes."""
         # Only create sample data if we're using dummy data and it's empty
-        if self.use_dummy_data and len(self.dummy_data) <= 1:
+        if self.use_dummy_data and self.backend.get_rows(self.sheet_name).empty:
             sample_data = [
                 {
                     'company_name': 'Al-Manar Development',
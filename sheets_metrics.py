@@ -0,0 +1,319 @@
+"""
+وحدة قياس استدعاءات Google Sheets API وتتبعها لكل إعادة تشغيل لواجهة Streamlit
+"""
+
+import functools
+import math
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import config
+
+# وحدات طبقة البيانات التي تنسب إليها الاستدعاءات (أبعد دالة منها في مكدس الاستدعاء)
+DATA_ACCESS_MODULES = frozenset({'sheets_api', 'sheets_async', 'sheets_integration'})
+
+# أقصى عمق لفحص مكدس الاستدعاء عند تحديد الدالة
+MAX_STACK_DEPTH = 60
+
+# عدد العناصر المقاسة من القوائم الكبيرة عند تقدير حجم البيانات
+SIZE_SAMPLE = 200
+
+# الاسم المستخدم للاستدعاءات خارج أي إجراء في الواجهة (مثل التحديث في الخلفية)
+NO_ACTION = 'background'
+
+
+def payload_size(value):
+    """
+    تقدير حجم البيانات المنقولة بالبايت (طول النص الظاهر في الورقة)
+    القوائم الكبيرة تقاس من عينة أول SIZE_SAMPLE عنصر ثم تضرب في العدد
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(str(key)) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return 0
+        sample = value[:SIZE_SAMPLE]
+        size = sum(payload_size(item) for item in sample) + len(sample)
+        return size * len(value) // len(sample)
+    if isinstance(value, (int, float, bool)):
+        return len(str(value))
+    return 0
+
+
+def _percentile(values, q):
+    """
+    النسبة المئوية q (من 0 إلى 100) لقائمة مرتبة بطريقة أقرب رتبة
+    """
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(q / 100.0 * len(values)) - 1))
+    return values[rank]
+
+
+class RerunTrace:
+    """
+    سجل استدعاءات Google Sheets خلال إعادة تشغيل واحدة للواجهة
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.started_at = time.time()
+        self.duration = None
+        self.events = []
+
+    def summary(self):
+        """
+        ملخص الاستدعاءات لكل إجراء في الواجهة:
+        {الإجراء: {'calls': عدد، 'latency': مجموع الزمن، 'bytes': الحجم، 'operations': {العملية: عدد}}}
+        """
+        actions = {}
+        for event in self.events:
+            action = actions.setdefault(event['action'], {'calls': 0, 'latency': 0.0, 'bytes': 0, 'operations': {}})
+            action['calls'] += 1
+            action['latency'] += event['latency']
+            action['bytes'] += event['bytes']
+            action['operations'][event['operation']] = action['operations'].get(event['operation'], 0) + 1
+        return actions
+
+    def describe(self):
+        """
+        وصف نصي لكل إجراء، مثل: display_calendar_view: 9 get_all_values, 2.70s
+        """
+        lines = []
+        for action, info in self.summary().items():
+            operations = ', '.join(f"{count} {operation}" for operation, count in info['operations'].items())
+            lines.append(f"{action}: {operations}, {info['latency']:.2f}s")
+        return lines
+
+
+class CallCounter:
+    """
+    عدد استدعاءات API داخل كتلة count_calls
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+
+class SheetsMetrics:
+    """
+    سجل مركزي لاستدعاءات Google Sheets API.
+    يحتفظ بآخر الأزمنة لكل دالة في طبقة البيانات ولكل إجراء في الواجهة
+    لحساب p50 و p95، وبآخر سجلات إعادة التشغيل.
+    السجل الحالي والإجراء الحالي خاصان بكل خيط (كل جلسة Streamlit تعمل في خيط).
+    """
+
+    def __init__(self, samples=None, history=None):
+        self.samples = samples or config.SHEETS_METRICS_SAMPLES
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._latencies = {'function': {}, 'action': {}, 'operation': {}}
+        self._counts = {'function': {}, 'action': {}, 'operation': {}}
+        self._totals = {'calls': 0, 'errors': 0, 'bytes': 0, 'latency': 0.0}
+        self._traces = deque(maxlen=history or config.SHEETS_TRACE_HISTORY)
+
+    def _actions(self):
+        actions = getattr(self._local, 'actions', None)
+        if actions is None:
+            actions = self._local.actions = []
+        return actions
+
+    def current_action(self):
+        actions = self._actions()
+        return actions[-1] if actions else NO_ACTION
+
+    def current_trace(self):
+        return getattr(self._local, 'trace', None)
+
+    def _counters(self):
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            counters = self._local.counters = []
+        return counters
+
+    @contextmanager
+    def action(self, name):
+        """
+        نسبة استدعاءات API داخل الكتلة إلى إجراء في الواجهة
+        """
+        actions = self._actions()
+        actions.append(name)
+        try:
+            yield
+        finally:
+            actions.pop()
+
+    @contextmanager
+    def rerun(self, label='rerun'):
+        """
+        تسجيل جميع استدعاءات API في الخيط الحالي حتى نهاية الكتلة في سجل إعادة تشغيل جديد
+        """
+        trace = RerunTrace(label)
+        previous = self.current_trace()
+        self._local.trace = trace
+        started_at = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.duration = time.perf_counter() - started_at
+            self._local.trace = previous
+            with self._lock:
+                self._traces.append(trace)
+
+    @contextmanager
+    def count_calls(self):
+        """
+        عد استدعاءات API في الخيط الحالي (والدوال المربوطة منه بـ bind) حتى نهاية الكتلة
+        """
+        counter = CallCounter()
+        counters = self._counters()
+        counters.append(counter)
+        try:
+            yield counter
+        finally:
+            counters.remove(counter)
+
+    def bind(self, func):
+        """
+        ربط دالة ستعمل في خيط آخر (مثل asyncio.to_thread) بالإجراء وسجل إعادة التشغيل
+        وعدادات الاستدعاءات ودالة طبقة البيانات الحالية، فتنسب استدعاءاتها كما لو تمت في الخيط الحالي
+        """
+        actions = list(self._actions())
+        trace = self.current_trace()
+        function = self._data_access_function()
+        counters = list(self._counters())
+
+        @functools.wraps(func)
+        def bound(*args, **kwargs):
+            saved = (getattr(self._local, 'actions', None), self.current_trace(),
+                     getattr(self._local, 'function', None), getattr(self._local, 'counters', None))
+            (self._local.actions, self._local.trace, self._local.function,
+             self._local.counters) = list(actions), trace, function, list(counters)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.actions, self._local.trace, self._local.function, self._local.counters = saved
+        return bound
+
+    def _data_access_function(self):
+        """
+        أبعد دالة من وحدات طبقة البيانات في مكدس الاستدعاء الحالي
+        """
+        function = None
+        frame = sys._getframe(2)
+        depth = 0
+        while frame is not None and depth < MAX_STACK_DEPTH:
+            module = frame.f_globals.get('__name__')
+            if module in DATA_ACCESS_MODULES:
+                code = frame.f_code
+                function = f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+            frame = frame.f_back
+            depth += 1
+        return function
+
+    def record(self, operation, sheet, latency, size, error=None):
+        """
+        تسجيل استدعاء API واحد
+        """
+        event = {
+            'operation': operation,
+            'sheet': sheet,
+            'latency': latency,
+            'bytes': size,
+            'action': self.current_action(),
+            'function': self._data_access_function() or getattr(self._local, 'function', None) or operation,
+            'error': error,
+            'at': time.time()
+        }
+
+        trace = self.current_trace()
+        if trace is not None:
+            trace.events.append(event)
+
+        with self._lock:
+            for counter in self._counters():
+                counter.calls += 1
+            self._totals['calls'] += 1
+            self._totals['bytes'] += size
+            self._totals['latency'] += latency
+            if error is not None:
+                self._totals['errors'] += 1
+            for group, key in (('function', event['function']), ('action', event['action']),
+                               ('operation', operation)):
+                latencies = self._latencies[group].get(key)
+                if latencies is None:
+                    latencies = self._latencies[group][key] = deque(maxlen=self.samples)
+                latencies.append(latency)
+                self._counts[group][key] = self._counts[group].get(key, 0) + 1
+
+    def traces(self):
+        """
+        آخر سجلات إعادة التشغيل، الأحدث أولاً
+        """
+        with self._lock:
+            return list(reversed(self._traces))
+
+    def get_stats(self, group='function'):
+        """
+        p50 و p95 وعدد الاستدعاءات لكل دالة ('function') أو إجراء ('action') أو عملية ('operation')
+        """
+        with self._lock:
+            samples = {key: sorted(values) for key, values in self._latencies[group].items()}
+            counts = dict(self._counts[group])
+
+        return {
+            key: {
+                'calls': counts[key],
+                'p50': _percentile(values, 50),
+                'p95': _percentile(values, 95),
+                'max': values[-1]
+            }
+            for key, values in samples.items()
+        }
+
+    def get_totals(self):
+        with self._lock:
+            return dict(self._totals)
+
+    def reset(self):
+        with self._lock:
+            for group in self._latencies:
+                self._latencies[group].clear()
+                self._counts[group].clear()
+            self._totals = {'calls': 0, 'errors': 0, 'bytes': 0, 'latency': 0.0}
+            self._traces.clear()
+
+
+# السجل المشترك على مستوى العملية
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    الحصول على سجل القياس المشترك لجميع استدعاءات Google Sheets في العملية
+    """
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = SheetsMetrics()
+        return _metrics
+
+
+def traced_action(func):
+    """
+    مزخرف ينسب استدعاءات API داخل الدالة إلى اسمها كإجراء في الواجهة
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with get_metrics().action(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,410 @@
+"""
+وحدة جدولة طلبات Google Sheets API حسب حصص القراءة والكتابة
+"""
+
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from gspread.exceptions import APIError
+
+import config
+from sheets_metrics import get_metrics, payload_size
+from single_flight import SingleFlight
+
+# أولويات الطلبات (الرقم الأصغر يُنفذ أولاً)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# أولوية كل ورقة عمل: الحجوزات والمواعيد قبل الإعدادات والبيانات المرجعية
+SHEET_PRIORITIES = {
+    'Bookings': PRIORITY_HIGH,
+    'Available_Slots': PRIORITY_HIGH,
+    'Appointments': PRIORITY_HIGH,
+    'Settings': PRIORITY_LOW,
+    'Companies': PRIORITY_LOW,
+    'Projects': PRIORITY_LOW
+}
+
+# رموز الأخطاء التي يعاد فيها إرسال الطلب
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# خطأ الحصة يعني أن الطلب رُفض دون تنفيذ، فهو الخطأ الوحيد الذي يعاد فيه إرسال كتابة غير متكررة الأثر
+# (مثل إضافة صف)، لأن خطأ الخادم قد يصل بعد تنفيذ الكتابة فتتكرر عند إعادتها
+QUOTA_STATUS_CODES = (429,)
+
+# دوال ورقة العمل التي تستهلك حصة القراءة أو الكتابة
+WORKSHEET_READS = frozenset({
+    'get_all_records', 'get_all_values', 'get_values', 'get', 'batch_get',
+    'col_values', 'row_values', 'acell', 'cell', 'range', 'find', 'findall'
+})
+WORKSHEET_WRITES = frozenset({
+    'append_row', 'append_rows', 'update', 'update_cell', 'update_cells',
+    'batch_update', 'batch_clear', 'clear', 'insert_row', 'insert_rows',
+    'delete_rows', 'delete_columns', 'format', 'freeze', 'resize', 'add_rows'
+})
+
+# كتابات ورقة العمل التي تكتب نفس القيم في نطاق ثابت، فلا يتغير أثرها إذا أعيدت
+WORKSHEET_IDEMPOTENT_WRITES = frozenset({
+    'update', 'update_cell', 'update_cells', 'batch_update', 'batch_clear', 'clear',
+    'format', 'freeze', 'resize'
+})
+
+# دوال جدول البيانات التي تستهلك حصة القراءة أو الكتابة
+SPREADSHEET_READS = frozenset({
+    'values_get', 'values_batch_get', 'fetch_sheet_metadata',
+    'get_lastUpdateTime', 'worksheets'
+})
+SPREADSHEET_WRITES = frozenset({
+    'values_update', 'values_batch_update', 'values_append', 'values_clear',
+    'batch_update', 'add_worksheet', 'del_worksheet'
+})
+SPREADSHEET_IDEMPOTENT_WRITES = frozenset({'values_update', 'values_batch_update', 'values_clear'})
+
+# طلبات batchUpdate التي تكتب في خلايا محددة، فيمكن إعادة طلب يحتوي عليها فقط
+IDEMPOTENT_REQUESTS = frozenset({'updateCells', 'repeatCell'})
+
+
+class TokenBucket:
+    """
+    دلو رموز بمعدل ثابت لكل دقيقة وسعة تسمح بدفعة قصيرة من الطلبات
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1, per_minute // 6)
+
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_take(self):
+        """
+        أخذ رمز إن وجد، وإلا إرجاع الوقت اللازم لتوفر رمز (بالثواني)
+        """
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+
+class RequestScheduler:
+    """
+    مجدول مركزي لطلبات Google Sheets API.
+    يفصل بين حصتي القراءة والكتابة، وينفذ الطلبات المنتظرة حسب الأولوية
+    ثم ترتيب الوصول، ويعيد المحاولة عند أخطاء 429 و5xx بتأخير أسي عشوائي
+    (الكتابات التي يتكرر أثرها إذا أعيدت، مثل إضافة صف، تعاد عند 429 فقط).
+    طلبات القراءة المتطابقة المتزامنة تُدمج في طلب واحد قبل انتظار الحصة.
+    """
+
+    def __init__(self, read_per_minute=None, write_per_minute=None,
+                 max_retries=None, backoff_base=1.0, backoff_max=32.0):
+        self.max_retries = max_retries if max_retries is not None else config.SHEETS_MAX_RETRIES
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._condition = threading.Condition()
+        self._buckets = {
+            'read': TokenBucket(read_per_minute or config.SHEETS_READ_QUOTA),
+            'write': TokenBucket(write_per_minute or config.SHEETS_WRITE_QUOTA)
+        }
+        self._queues = {'read': [], 'write': []}
+        self._sequence = itertools.count()
+        self._single_flight = SingleFlight()
+
+        # الإحصائيات
+        self._calls = {'read': 0, 'write': 0}
+        self._retries = 0
+        self._failures = 0
+        self._waits = {'read': deque(maxlen=500), 'write': deque(maxlen=500)}
+        self._max_wait = {'read': 0.0, 'write': 0.0}
+
+    def _acquire(self, kind, priority):
+        """
+        انتظار الدور والحصول على رمز من دلو النوع المطلوب
+        تعيد مدة الانتظار بالثواني
+        """
+        queue = self._queues[kind]
+        ticket = (priority, next(self._sequence))
+        started_at = time.monotonic()
+
+        with self._condition:
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    if queue[0] == ticket:
+                        delay = self._buckets[kind].try_take()
+                        if delay == 0:
+                            heapq.heappop(queue)
+                            break
+                        self._condition.wait(delay)
+                    else:
+                        self._condition.wait()
+            except BaseException:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                raise
+            finally:
+                self._condition.notify_all()
+
+            waited = time.monotonic() - started_at
+            self._waits[kind].append(waited)
+            self._max_wait[kind] = max(self._max_wait[kind], waited)
+            return waited
+
+    def _backoff(self, attempt):
+        """
+        مدة الانتظار قبل إعادة المحاولة: أسية مع عشوائية كاملة
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(self, kind, func, *args, priority=PRIORITY_NORMAL, sheet=None, idempotent=True, **kwargs):
+        """
+        تنفيذ استدعاء API بعد انتظار الحصة، مع إعادة المحاولة عند أخطاء الحصة والخادم
+        kind: 'read' أو 'write'
+        sheet: اسم ورقة العمل المستهدفة، للقياس فقط
+        idempotent: False للكتابات التي يتكرر أثرها إذا أعيدت (مثل إضافة صف)، فتعاد عند خطأ الحصة فقط
+        يتم تسجيل زمن الاستدعاء كاملاً (مع الانتظار وإعادة المحاولة) وحجم البيانات في sheets_metrics
+        """
+        started_at = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = self._call(kind, func, args, kwargs, priority, idempotent)
+            return result
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            size = payload_size(result) if kind == 'read' else payload_size(args) + payload_size(kwargs)
+            get_metrics().record(getattr(func, '__name__', repr(func)), sheet,
+                                 time.perf_counter() - started_at, size, error)
+
+    def _call(self, kind, func, args, kwargs, priority, idempotent=True):
+        """
+        انتظار الحصة وتنفيذ الاستدعاء مع إعادة المحاولة
+        """
+        retry_codes = RETRY_STATUS_CODES if idempotent else QUOTA_STATUS_CODES
+        attempt = 0
+        while True:
+            self._acquire(kind, priority)
+            with self._condition:
+                self._calls[kind] += 1
+            try:
+                return func(*args, **kwargs)
+            except APIError as e:
+                if getattr(e, 'code', None) not in retry_codes or attempt >= self.max_retries:
+                    with self._condition:
+                        self._failures += 1
+                    raise
+            with self._condition:
+                self._retries += 1
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def read_shared(self, key, func, *args, priority=PRIORITY_NORMAL, sheet=None, **kwargs):
+        """
+        تنفيذ استدعاء قراءة مع دمجه مع أي قراءة متطابقة قيد التنفيذ
+        key يحدد الورقة والنطاق المقروء، والنتيجة مشتركة للقراءة فقط
+        """
+        return self._single_flight.do(
+            key, lambda: self.call('read', func, *args, priority=priority, sheet=sheet, **kwargs)
+        )
+
+    def get_stats(self):
+        """
+        إحصائيات المجدول: عمق الطوابير وأوقات الانتظار وعدد الطلبات وإعادات المحاولة
+        وعدد القراءات التي تم توفيرها بالدمج
+        """
+        with self._condition:
+            stats = {
+                'retries': self._retries,
+                'failures': self._failures,
+                'single_flight': self._single_flight.get_stats()
+            }
+            for kind in ('read', 'write'):
+                waits = self._waits[kind]
+                stats[kind] = {
+                    'queue_depth': len(self._queues[kind]),
+                    'calls': self._calls[kind],
+                    'avg_wait': sum(waits) / len(waits) if waits else 0.0,
+                    'max_wait': self._max_wait[kind]
+                }
+            return stats
+
+
+def _read_key(target, name, args, kwargs):
+    """
+    مفتاح دمج القراءة: الكائن المستهدف واسم الدالة ومعاملاتها
+    """
+    return (target, name, repr(args), repr(sorted(kwargs.items())))
+
+
+def sheet_priority(title):
+    """
+    أولوية الطلبات الموجهة إلى ورقة عمل حسب اسمها
+    """
+    return SHEET_PRIORITIES.get(title, PRIORITY_NORMAL)
+
+
+def _ranges_sheets(ranges):
+    """
+    أسماء أوراق العمل المذكورة في نطاقات A1، أو اسم الورقة وحده للورقة كاملة
+    """
+    return [
+        match.group(1) or match.group(2)
+        for match in (re.match(r"^(?:'([^']+)'|([^!]+))(?:!|$)", str(a1)) for a1 in ranges)
+        if match
+    ]
+
+
+def _ranges_priority(ranges):
+    """
+    أعلى أولوية بين أوراق العمل المذكورة في نطاقات A1
+    """
+    priorities = [sheet_priority(title) for title in _ranges_sheets(ranges)]
+    return min(priorities) if priorities else PRIORITY_NORMAL
+
+
+class ScheduledWorksheet:
+    """
+    غلاف لورقة عمل gspread يمرر استدعاءات القراءة والكتابة عبر المجدول
+    """
+
+    def __init__(self, worksheet, scheduler):
+        self._worksheet = worksheet
+        self._scheduler = scheduler
+        self._title = getattr(worksheet, 'title', None)
+        self._priority = sheet_priority(self._title)
+        self._key = (getattr(worksheet, 'spreadsheet_id', None), getattr(worksheet, 'id', id(worksheet)))
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if name in WORKSHEET_READS:
+            kind = 'read'
+        elif name in WORKSHEET_WRITES:
+            kind = 'write'
+        else:
+            return attr
+
+        def scheduled(*args, **kwargs):
+            if kind == 'read':
+                key = _read_key(self._key, name, args, kwargs)
+                return self._scheduler.read_shared(key, attr, *args, priority=self._priority,
+                                                   sheet=self._title, **kwargs)
+            return self._scheduler.call(kind, attr, *args, priority=self._priority, sheet=self._title,
+                                        idempotent=name in WORKSHEET_IDEMPOTENT_WRITES, **kwargs)
+        return scheduled
+
+    def __eq__(self, other):
+        if isinstance(other, ScheduledWorksheet):
+            other = other._worksheet
+        return self._worksheet == other
+
+    def __hash__(self):
+        return hash(self._worksheet)
+
+    def __repr__(self):
+        return repr(self._worksheet)
+
+
+class ScheduledSpreadsheet:
+    """
+    غلاف لجدول بيانات gspread يمرر الاستدعاءات عبر المجدول
+    ويعيد أوراق العمل مغلفة بنفس المجدول
+    """
+
+    def __init__(self, spreadsheet, scheduler):
+        self._spreadsheet = spreadsheet
+        self._scheduler = scheduler
+
+    def worksheet(self, title):
+        return self._wrap(self._scheduler.call(
+            'read', self._spreadsheet.worksheet, title, priority=sheet_priority(title), sheet=title
+        ))
+
+    def get_worksheet(self, index):
+        return self._wrap(self._scheduler.call('read', self._spreadsheet.get_worksheet, index))
+
+    def _wrap(self, worksheet):
+        if worksheet is None:
+            return None
+        return ScheduledWorksheet(worksheet, self._scheduler)
+
+    def _call_ranges(self, name, args, kwargs):
+        """
+        نطاقات A1 المستهدفة في استدعاء على مستوى جدول البيانات
+        """
+        if name == 'values_batch_get':
+            return list(args[0] if args else kwargs.get('ranges', []))
+        if name == 'values_batch_update':
+            body = args[0] if args else kwargs.get('body', {})
+            return [item.get('range', '') for item in body.get('data', [])]
+        if name in ('values_get', 'values_update', 'values_append', 'values_clear') and args:
+            return [args[0]]
+        return []
+
+    def _idempotent(self, name, args, kwargs):
+        """
+        هل يمكن إعادة استدعاء الكتابة دون أن يتكرر أثره
+        batch_update يعاد فقط إذا كانت جميع طلباته كتابة في خلايا محددة
+        """
+        if name == 'batch_update':
+            body = args[0] if args else kwargs.get('body', {})
+            return all(set(request) <= IDEMPOTENT_REQUESTS for request in body.get('requests', []))
+        return name in SPREADSHEET_IDEMPOTENT_WRITES
+
+    def __getattr__(self, name):
+        attr = getattr(self._spreadsheet, name)
+        if name in SPREADSHEET_READS:
+            kind = 'read'
+        elif name in SPREADSHEET_WRITES:
+            kind = 'write'
+        else:
+            return attr
+
+        def scheduled(*args, **kwargs):
+            ranges = self._call_ranges(name, args, kwargs)
+            priority = _ranges_priority(ranges)
+            sheet = ','.join(dict.fromkeys(_ranges_sheets(ranges))) or None
+            if kind == 'read':
+                key = _read_key(getattr(self._spreadsheet, 'id', id(self._spreadsheet)), name, args, kwargs)
+                result = self._scheduler.read_shared(key, attr, *args, priority=priority, sheet=sheet, **kwargs)
+            else:
+                result = self._scheduler.call(kind, attr, *args, priority=priority, sheet=sheet,
+                                              idempotent=self._idempotent(name, args, kwargs), **kwargs)
+            if name == 'add_worksheet':
+                return self._wrap(result)
+            if name == 'worksheets':
+                return [self._wrap(worksheet) for worksheet in result]
+            return result
+        return scheduled
+
+    def __repr__(self):
+        return repr(self._spreadsheet)
+
+
+# المجدول المشترك على مستوى العملية
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    الحصول على المجدول المشترك لجميع اتصالات Google Sheets في العملية
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
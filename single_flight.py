@@ -0,0 +1,78 @@
+"""
+وحدة دمج الطلبات المتزامنة المتطابقة (single-flight)
+"""
+
+import threading
+
+
+class _Flight:
+    """
+    طلب قيد التنفيذ ينتظر نتيجته المستدعون الآخرون
+    """
+
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    أثناء تنفيذ طلب بمفتاح معين، ينتظر المستدعون الآخرون بنفس المفتاح
+    نتيجة الطلب الأول بدلاً من إرسال طلب جديد.
+    النتيجة مشتركة بين جميع المستدعين ويجب التعامل معها للقراءة فقط.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key, func):
+        """
+        تنفيذ func مرة واحدة لكل مجموعة من الاستدعاءات المتزامنة بنفس المفتاح
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._flights[key] = flight
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+        return flight.result
+
+    def get_stats(self):
+        """
+        عدد الطلبات المنفذة فعلياً وعدد الاستدعاءات التي تم توفيرها بالدمج
+        """
+        with self._lock:
+            return {
+                'executed': self._executed,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._flights)
+            }
@@ -0,0 +1,121 @@
+"""
+وحدة تحديث لقطات الأوراق في الخلفية عند تغيرها
+"""
+
+import threading
+import time
+
+import config
+
+
+class SnapshotRefresher:
+    """
+    خيط خلفي يحافظ على لقطات الأوراق في الذاكرة المؤقتة محدثة.
+    يفحص إشارة تغير رخيصة (مثل وقت آخر تعديل لجدول البيانات) ويعيد تحميل
+    الورقة فقط عند تغير الإشارة، وإلا يمدد صلاحية اللقطة الحالية،
+    فتُخدم القراءات من الذاكرة دون انتظار التحميل.
+    """
+
+    def __init__(self, cache, interval=None):
+        self.cache = cache
+        self.interval = interval if interval is not None else config.SHEETS_REFRESH_INTERVAL
+
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._sources = {}
+        self._signals = {}
+        self._thread = None
+        self._stop = threading.Event()
+
+        # الإحصائيات
+        self.polls = 0
+        self.reloads = 0
+        self.last_poll_at = None
+        self.last_error = None
+
+    def watch(self, name, loader, probe, on_change=None):
+        """
+        تسجيل لقطة للمراقبة
+        loader: دالة تحميل الورقة كاملة
+        probe: دالة رخيصة تعيد قيمة تتغير عند تغير الورقة
+        on_change: دالة اختيارية تُستدعى بعد إعادة تحميل اللقطة
+        اللقطات التي تشترك في نفس probe يتم فحصها باستدعاء واحد
+        """
+        with self._lock:
+            self._sources[name] = (loader, probe, on_change)
+
+    def poll(self):
+        """
+        فحص إشارات التغير الآن وإعادة تحميل اللقطات التي تغيرت
+        تعيد قائمة أسماء اللقطات التي أعيد تحميلها
+        """
+        with self._poll_lock:
+            with self._lock:
+                sources = list(self._sources.items())
+
+            signals = []
+            changed = []
+            for name, (loader, probe, on_change) in sources:
+                # استدعاء كل دالة فحص مرة واحدة فقط في كل دورة
+                for known_probe, known_signal in signals:
+                    if known_probe == probe:
+                        signal = known_signal
+                        break
+                else:
+                    signal = probe()
+                    signals.append((probe, signal))
+
+                if signal is None or signal != self._signals.get(name) or self.cache.peek(name) is None:
+                    if self.cache.refresh(name, loader):
+                        self._signals[name] = signal
+                        changed.append(name)
+                        self.reloads += 1
+                        if on_change is not None:
+                            on_change()
+                else:
+                    self.cache.touch(name)
+
+            self.polls += 1
+            self.last_poll_at = time.time()
+            return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as e:
+                # الاحتفاظ باللقطات الحالية والمحاولة في الدورة التالية
+                self.last_error = str(e)
+
+    def start(self):
+        """
+        تشغيل خيط التحديث إذا لم يكن يعمل
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sheets-snapshot-refresher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        إيقاف خيط التحديث
+        """
+        self._stop.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_stats(self):
+        """
+        إحصائيات التحديث: عدد الفحوص وعدد مرات إعادة التحميل وآخر خطأ
+        """
+        return {
+            'running': self.is_running(),
+            'polls': self.polls,
+            'reloads': self.reloads,
+            'last_poll_at': self.last_poll_at,
+            'last_error': self.last_error
+        }
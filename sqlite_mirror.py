@@ -0,0 +1,384 @@
+"""
+وحدة النسخة المحلية (SQLite) من أوراق العمل مع صندوق صادر للكتابة المؤجلة
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sheet_columns (
+    sheet TEXT PRIMARY KEY,
+    columns TEXT NOT NULL,
+    pulled_at REAL
+);
+CREATE TABLE IF NOT EXISTS sheet_rows (
+    sheet TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (sheet, position)
+);
+CREATE INDEX IF NOT EXISTS sheet_rows_key ON sheet_rows (sheet, key);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sheet TEXT NOT NULL,
+    op TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+"""
+
+
+class ExpectationFailed(Exception):
+    """
+    قيمة حالية في النسخة المحلية لا تحقق الشرط المطلوب قبل تطبيق التعديلات
+    """
+
+
+class SQLiteMirror:
+    """
+    نسخة محلية من أوراق العمل في SQLite بوضع WAL.
+    كل صف محفوظ بترتيبه في الورقة وبقيمة عمود المفتاح (العمود الأول).
+    كل تعديل محلي يُسجل في صندوق صادر (outbox) داخل نفس المعاملة،
+    فلا يضيع أي تعديل حتى لو توقفت العملية قبل إرساله إلى Google Sheets.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.SQLITE_MIRROR_PATH
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._conn.executescript(SCHEMA)
+        self._columns = {}
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            with self._conn:
+                yield self._conn
+
+    def get_columns(self, sheet):
+        """
+        أسماء أعمدة الورقة كما في صف الرؤوس، أو None إذا لم يتم استيرادها
+        """
+        with self._lock:
+            if sheet not in self._columns:
+                row = self._conn.execute(
+                    'SELECT columns FROM sheet_columns WHERE sheet = ?', (sheet,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._columns[sheet] = json.loads(row[0])
+            return self._columns[sheet]
+
+    def has_sheet(self, sheet):
+        return self.get_columns(sheet) is not None
+
+    def get_rows(self, sheet):
+        """
+        جميع صفوف الورقة بترتيبها كـ DataFrame
+        """
+        with self._lock:
+            columns = self.get_columns(sheet) or []
+            rows = self._conn.execute(
+                'SELECT data FROM sheet_rows WHERE sheet = ? ORDER BY position', (sheet,)
+            ).fetchall()
+        return pd.DataFrame([json.loads(data) for (data,) in rows], columns=columns)
+
+    def get_value(self, sheet, key, column):
+        """
+        قيمة عمود واحد في الصف ذي المفتاح المحدد، أو None إذا لم يوجد الصف
+        """
+        with self._lock:
+            columns = self.get_columns(sheet) or []
+            row = self._conn.execute(
+                'SELECT data FROM sheet_rows WHERE sheet = ? AND key = ? ORDER BY position LIMIT 1',
+                (sheet, str(key))
+            ).fetchone()
+        if row is None or column not in columns:
+            return None
+        values = json.loads(row[0])
+        position = columns.index(column)
+        return values[position] if position < len(values) else ''
+
+    def get_records(self, sheet, keys):
+        """
+        قيم الصفوف ذات المفاتيح المحددة كقاموس {المفتاح: القيم}
+        المفاتيح غير الموجودة لا تظهر في النتيجة
+        """
+        result = {}
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    'SELECT data FROM sheet_rows WHERE sheet = ? AND key = ? ORDER BY position LIMIT 1',
+                    (sheet, str(key))
+                ).fetchone()
+                if row is not None:
+                    result[str(key)] = json.loads(row[0])
+        return result
+
+    def _replace(self, conn, sheet, columns, rows):
+        conn.execute(
+            'INSERT OR REPLACE INTO sheet_columns (sheet, columns, pulled_at) VALUES (?, ?, ?)',
+            (sheet, json.dumps(columns, ensure_ascii=False), time.time())
+        )
+        conn.execute('DELETE FROM sheet_rows WHERE sheet = ?', (sheet,))
+        conn.executemany(
+            'INSERT INTO sheet_rows (sheet, position, key, data) VALUES (?, ?, ?, ?)',
+            [
+                (sheet, position, str(row[0]) if row else '', json.dumps(list(row), ensure_ascii=False))
+                for position, row in enumerate(rows)
+            ]
+        )
+        self._columns[sheet] = list(columns)
+
+    def replace_rows(self, sheet, columns, rows):
+        """
+        استبدال نسخة الورقة كاملة (الاستيراد الأول)
+        """
+        with self._transaction() as conn:
+            self._replace(conn, sheet, columns, rows)
+
+    def reconcile(self, sheet, columns, rows):
+        """
+        مطابقة النسخة المحلية مع صفوف الورقة البعيدة بعد تعديلها مباشرة
+        يتم التجاهل إذا كانت للورقة تعديلات محلية لم تُرسل بعد
+        تعيد عدد الصفوف المختلفة، أو None إذا تم التجاهل
+        """
+        with self._transaction() as conn:
+            pending = conn.execute('SELECT 1 FROM outbox WHERE sheet = ? LIMIT 1', (sheet,)).fetchone()
+            if pending is not None:
+                return None
+
+            local = {
+                position: data for position, data in conn.execute(
+                    'SELECT position, data FROM sheet_rows WHERE sheet = ?', (sheet,)
+                )
+            }
+            remote = {position: json.dumps(list(row), ensure_ascii=False) for position, row in enumerate(rows)}
+            changed = sum(1 for position in set(local) | set(remote) if local.get(position) != remote.get(position))
+
+            if changed or list(columns) != self.get_columns(sheet):
+                self._replace(conn, sheet, columns, rows)
+            else:
+                conn.execute('UPDATE sheet_columns SET pulled_at = ? WHERE sheet = ?', (time.time(), sheet))
+            return changed
+
+    def apply(self, operations, expect=None):
+        """
+        تطبيق مجموعة تعديلات محلياً وتسجيلها في الصندوق الصادر في معاملة واحدة
+        operations: قائمة من ('append', sheet, values) أو ('update', sheet, key, {column: value})
+        expect: قاموس اختياري {(sheet, key): {column: دالة تحقق}} يتم فحصه داخل نفس المعاملة،
+                وترفع ExpectationFailed دون تطبيق أي تعديل إذا لم تتحقق إحدى الدوال
+        التحديثات التي لا يوجد صفها يتم تجاهلها، وتعاد قائمة (sheet, key) لها
+        """
+        now = time.time()
+        missing = []
+        with self._transaction() as conn:
+            for (sheet, key), predicates in (expect or {}).items():
+                row = conn.execute(
+                    'SELECT data FROM sheet_rows WHERE sheet = ? AND key = ? ORDER BY position LIMIT 1',
+                    (sheet, str(key))
+                ).fetchone()
+                if row is None:
+                    continue
+                record = dict(zip(self.get_columns(sheet) or [], json.loads(row[0])))
+                for column, predicate in predicates.items():
+                    if not predicate(record.get(column, '')):
+                        raise ExpectationFailed(f"{sheet}!{key}.{column}")
+
+            for operation in operations:
+                op, sheet = operation[0], operation[1]
+                columns = self.get_columns(sheet) or []
+
+                if op == 'append':
+                    values = [str(value) for value in operation[2]]
+                    key = values[0]
+                    position = conn.execute(
+                        'SELECT COALESCE(MAX(position) + 1, 0) FROM sheet_rows WHERE sheet = ?', (sheet,)
+                    ).fetchone()[0]
+                    conn.execute(
+                        'INSERT INTO sheet_rows (sheet, position, key, data) VALUES (?, ?, ?, ?)',
+                        (sheet, position, key, json.dumps(values, ensure_ascii=False))
+                    )
+                    payload = values
+                else:
+                    key, changes = str(operation[2]), operation[3]
+                    rows = conn.execute(
+                        'SELECT position, data FROM sheet_rows WHERE sheet = ? AND key = ?', (sheet, key)
+                    ).fetchall()
+                    if not rows:
+                        missing.append((sheet, operation[2]))
+                        continue
+                    for position, data in rows:
+                        values = json.loads(data)
+                        values += [''] * (len(columns) - len(values))
+                        for column, value in changes.items():
+                            if column in columns:
+                                values[columns.index(column)] = str(value)
+                        conn.execute(
+                            'UPDATE sheet_rows SET data = ? WHERE sheet = ? AND position = ?',
+                            (json.dumps(values, ensure_ascii=False), sheet, position)
+                        )
+                    payload = {column: str(value) for column, value in changes.items()}
+
+                conn.execute(
+                    'INSERT INTO outbox (sheet, op, key, payload, created_at) VALUES (?, ?, ?, ?, ?)',
+                    (sheet, op, key, json.dumps(payload, ensure_ascii=False), now)
+                )
+
+        return missing
+
+    def pending(self, limit=100):
+        """
+        التعديلات التي لم تُرسل بعد بترتيب تسجيلها
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, sheet, op, key, payload, attempts FROM outbox ORDER BY id LIMIT ?', (limit,)
+            ).fetchall()
+        return [
+            {'id': id_, 'sheet': sheet, 'op': op, 'key': key, 'payload': json.loads(payload), 'attempts': attempts}
+            for id_, sheet, op, key, payload, attempts in rows
+        ]
+
+    def ack(self, ids):
+        """
+        حذف التعديلات التي تم إرسالها بنجاح من الصندوق الصادر
+        """
+        with self._transaction() as conn:
+            conn.executemany('DELETE FROM outbox WHERE id = ?', [(id_,) for id_ in ids])
+
+    def record_failure(self, id_, error):
+        """
+        تسجيل فشل إرسال أول تعديل في الدفعة لإعادة المحاولة لاحقاً بنفس الترتيب
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                'UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?', (str(error), id_)
+            )
+
+    def outbox_size(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+
+class WriteBehindWorker:
+    """
+    خيط خلفي يرسل تعديلات الصندوق الصادر إلى Google Sheets على دفعات بترتيبها،
+    ثم يسحب التعديلات التي تمت مباشرة في الورقة عندما يكون الصندوق فارغاً.
+    عند فشل الإرسال تبقى الدفعة في الصندوق وتعاد بنفس الترتيب في الدورة التالية.
+    """
+
+    def __init__(self, mirror, flush, pull=None, interval=None, batch_size=100):
+        """
+        flush: دالة تستقبل قائمة تعديلات الصندوق الصادر وترسلها إلى الورقة
+        pull: دالة اختيارية لمطابقة النسخة المحلية مع الورقة
+        """
+        self.mirror = mirror
+        self.flush = flush
+        self.pull = pull
+        self.interval = interval if interval is not None else config.WRITE_BEHIND_INTERVAL
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+        # الإحصائيات
+        self.flushed = 0
+        self.pulls = 0
+        self.last_pull = None
+        self.last_flush_at = None
+        self.last_error = None
+
+    def run_once(self):
+        """
+        إرسال جميع التعديلات المعلقة ثم المطابقة مع الورقة
+        تعيد عدد التعديلات المرسلة
+        """
+        with self._lock:
+            sent = 0
+            while True:
+                entries = self.mirror.pending(self.batch_size)
+                if not entries:
+                    break
+                try:
+                    self.flush(entries)
+                except Exception as e:
+                    self.last_error = str(e)
+                    self.mirror.record_failure(entries[0]['id'], e)
+                    return sent
+                self.mirror.ack([entry['id'] for entry in entries])
+                sent += len(entries)
+                self.flushed += len(entries)
+                self.last_flush_at = time.time()
+
+            self.last_error = None
+            if self.pull is not None:
+                self.last_pull = self.pull()
+                self.pulls += 1
+            return sent
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+
+    def notify(self):
+        """
+        إيقاظ الخيط لإرسال التعديلات الجديدة دون انتظار الفترة كاملة
+        """
+        self._wake.set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sheets-write-behind', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_stats(self):
+        """
+        إحصائيات الكتابة المؤجلة: حجم الصندوق الصادر وعدد التعديلات المرسلة وآخر خطأ
+        """
+        return {
+            'running': self.is_running(),
+            'outbox_size': self.mirror.outbox_size(),
+            'flushed': self.flushed,
+            'pulls': self.pulls,
+            'last_flush_at': self.last_flush_at,
+            'last_error': self.last_error
+        }
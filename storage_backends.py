@@ -0,0 +1,841 @@
+"""
+وحدة واجهات التخزين: Google Sheets والذاكرة والنسخة المحلية SQLite
+"""
+
+import threading
+
+import pandas as pd
+from gspread.utils import absolute_range_name, fill_gaps, numericise_all, rowcol_to_a1, to_records
+
+import config
+from row_index import RowIndex
+from sqlite_mirror import ExpectationFailed, WriteBehindWorker
+
+
+class ConflictError(Exception):
+    """
+    القيمة الحالية لخلية لا تحقق الشرط المتوقع في كتابة مشروطة
+    """
+
+
+class StaleIndexError(Exception):
+    """
+    تعذر تحديد صفوف الكتابة لأن الفهرس بقي قديماً حتى بعد إعادة تحميله
+    (الورقة تتغير من خارج التطبيق أثناء الكتابة)، ولم تتم كتابة أي تعديل
+    """
+
+
+def _cell_data(value):
+    """
+    قيمة خلية لطلبات updateCells و appendCells، تحفظ كنص كما هي دون تحويل
+    """
+    return {'userEnteredValue': {'stringValue': '' if value is None else str(value)}}
+
+
+# تحويل قيم ورقة (صف الرؤوس ثم الصفوف) إلى DataFrame
+def _values_to_frame(values, numericise=True):
+    """
+    تحويل القيم إلى DataFrame بنفس تحويلات get_all_records للأرقام والخلايا الفارغة
+    numericise: تحويل النصوص الرقمية إلى أرقام، وإلا تبقى القيم كما تظهر في الورقة
+    """
+    if not values:
+        return pd.DataFrame()
+
+    header = values[0]
+    rows = [numericise_all(row) if numericise else row for row in values[1:]]
+    if not rows:
+        return pd.DataFrame(columns=header)
+
+    return pd.DataFrame(to_records(header, rows))
+
+
+class StorageBackend:
+    """
+    الواجهة المشتركة لمصادر التخزين.
+    كل ورقة جدول له صف رؤوس، ومفتاح كل صف هو قيمة العمود الأول كنص.
+    الذاكرة المؤقتة وتجميع الكتابات يتمان فوق هذه الواجهة مرة واحدة لجميع المصادر.
+    """
+
+    # اسم المصدر كما في config.STORAGE_MODE
+    name = None
+
+    # هل يجب فحص المصدر دورياً لاكتشاف التعديلات الخارجية
+    needs_polling = False
+
+    # هل يقرأ get_many عدة أوراق في طلب واحد، وإلا يمكن قراءة الأوراق بالتوازي
+    batch_reads = False
+
+    def __init__(self):
+        self._subscribers = []
+
+    def get_rows(self, sheet):
+        """
+        جميع صفوف الورقة كـ DataFrame
+        """
+        raise NotImplementedError
+
+    def get_many(self, sheets):
+        """
+        صفوف عدة أوراق كقاموس {الورقة: DataFrame}
+        """
+        return {sheet: self.get_rows(sheet) for sheet in sheets}
+
+    def get_columns(self, sheet):
+        """
+        أسماء أعمدة الورقة
+        """
+        raise NotImplementedError
+
+    def get_range(self, sheet, keys, columns=None):
+        """
+        صفوف المفاتيح المطلوبة فقط كقاموس {المفتاح: {العمود: القيمة}}
+        المفاتيح غير الموجودة لا تظهر في النتيجة
+        """
+        raise NotImplementedError
+
+    def get_projection(self, sheet, columns, rows=None):
+        """
+        أعمدة محددة فقط من الورقة كـ DataFrame بترتيب columns
+        rows: نطاق اختياري (البداية، النهاية) لمواضع الصفوف بدءاً من 0 بعد الرؤوس،
+              والنهاية غير مشمولة أو None حتى آخر الورقة
+        الأعمدة غير الموجودة في الورقة يتم تجاهلها
+        """
+        df = self.get_rows(sheet)
+        start, stop = rows or (0, None)
+        return df[[column for column in columns if column in df.columns]].iloc[start:stop].reset_index(drop=True)
+
+    def append_rows(self, sheet, rows):
+        """
+        إضافة صفوف (قوائم قيم بترتيب الأعمدة) في نهاية الورقة
+        """
+        raise NotImplementedError
+
+    def batch_update(self, updates, appends=(), expect=None):
+        """
+        تنفيذ مجموعة تعديلات كعملية واحدة
+        updates: قائمة من (الورقة، المفتاح، {العمود: القيمة})
+        appends: قائمة من (الورقة، قيم الصف)
+        expect: قاموس اختياري {(الورقة، المفتاح): {العمود: دالة تحقق}} يتم فحصه قبل الكتابة،
+                وترفع ConflictError دون كتابة أي تعديل إذا لم تتحقق إحدى الدوال
+        ترفع StaleIndexError دون كتابة أي تعديل إذا تعذر تحديد صفوف الكتابة
+        الأعمدة غير الموجودة في الورقة يتم تجاهلها، ولا تتم الكتابة في صف لم يعد يحمل مفتاحه
+        تعيد قائمة (الورقة، المفتاح) للتحديثات التي لم يوجد صفها
+        """
+        raise NotImplementedError
+
+    def replace_rows(self, sheet, delete_positions, rows):
+        """
+        حذف الصفوف في المواضع المحددة (بدءاً من 0 بعد الرؤوس) ثم إضافة صفوف جديدة
+        """
+        raise NotImplementedError
+
+    def get_sheet_names(self):
+        """
+        أسماء جميع أوراق جدول البيانات
+        """
+        raise NotImplementedError
+
+    def create_sheet(self, sheet, columns):
+        """
+        إنشاء ورقة جديدة فارغة بصف الرؤوس columns
+        """
+        raise NotImplementedError
+
+    def probe(self):
+        """
+        إشارة رخيصة تتغير عند تعديل البيانات خارج العملية
+        """
+        return None
+
+    def invalidate(self, sheet=None):
+        """
+        إبطال أي حالة مخزنة عن الورقة (مثل فهارس الصفوف) بعد تغيرها خارجياً
+        """
+
+    def subscribe(self, callback):
+        """
+        تسجيل دالة تُستدعى بقائمة أسماء الأوراق التي تغيرت خارج العملية
+        """
+        self._subscribers.append(callback)
+
+    def _notify(self, sheets):
+        if sheets:
+            for callback in list(self._subscribers):
+                callback(sheets)
+
+    def sync(self):
+        """
+        مطابقة المصدر مع الورقة الأصلية قبل العمليات التي تعتمد على مواضع الصفوف
+        """
+
+    def refresh(self):
+        """
+        فحص التعديلات الخارجية الآن وإرجاع أسماء الأوراق التي تغيرت
+        """
+        return []
+
+    def start(self):
+        """
+        تشغيل أي خيوط خلفية يحتاجها المصدر
+        """
+
+    def get_stats(self):
+        return {'backend': self.name}
+
+
+class GSpreadBackend(StorageBackend):
+    """
+    التخزين في Google Sheets مباشرة عبر مدير الاتصال المشترك.
+    يحتفظ بفهرس أرقام الصفوف ورؤوس الأعمدة لكل ورقة من نفس قراءة التحميل،
+    فتحتاج الكتابة المجمعة إلى طلب واحد فقط.
+    """
+
+    name = 'sheets'
+    needs_polling = True
+    batch_reads = True
+
+    def __init__(self, connection, numericise=True):
+        super().__init__()
+        self.connection = connection
+        self.numericise = numericise
+
+        self._lock = threading.RLock()
+        self._indexes = {}
+        self._columns = {}
+
+    def _worksheet(self, sheet):
+        return self.connection.get_worksheet(sheet)
+
+    def _index(self, sheet):
+        with self._lock:
+            if sheet not in self._indexes:
+                self._indexes[sheet] = RowIndex(key_column=1, ttl=config.SHEETS_CACHE_TTL)
+            return self._indexes[sheet]
+
+    def _loaded_index(self, sheet):
+        """
+        فهرس الصفوف مبنياً، بقراءة عمود المفتاح فقط إذا لزم
+        """
+        index = self._index(sheet)
+        if not index.is_loaded():
+            index.load(self._worksheet(sheet))
+        return index
+
+    def get_values(self, sheet):
+        """
+        القيم الخام للورقة كاملة (صف الرؤوس ثم الصفوف)
+        يتم بناء فهرس الصفوف ورؤوس الأعمدة من نفس القراءة
+        """
+        return self._loaded_values(sheet, self._worksheet(sheet).get_all_values())
+
+    def _loaded_values(self, sheet, values):
+        """
+        بناء فهرس الصفوف ورؤوس الأعمدة من قيم ورقة كاملة مقروءة للتو
+        """
+        with self._lock:
+            self._columns[sheet] = list(values[0]) if values else []
+        self._index(sheet).build([row[0] if row else '' for row in values[1:]])
+
+        return values
+
+    def get_rows(self, sheet):
+        return _values_to_frame(self.get_values(sheet), self.numericise)
+
+    def get_many(self, sheets):
+        """
+        قراءة عدة أوراق كاملة في طلب values_batch_get واحد بدلاً من طلب لكل ورقة
+        """
+        sheets = list(dict.fromkeys(sheets))
+        if not sheets:
+            return {}
+
+        response = self.connection.get_spreadsheet().values_batch_get(
+            [absolute_range_name(sheet) for sheet in sheets])
+
+        frames = {}
+        for sheet, value_range in zip(sheets, response.get('valueRanges', [])):
+            # النطاقات لا تعيد الخلايا الفارغة في نهاية الصفوف، فتكمل كما في get_all_values
+            values = value_range.get('values', [])
+            values = self._loaded_values(sheet, fill_gaps(values) if values else [])
+            frames[sheet] = _values_to_frame(values, self.numericise)
+        return frames
+
+    def get_columns(self, sheet):
+        with self._lock:
+            if sheet not in self._columns:
+                self._columns[sheet] = self._worksheet(sheet).row_values(1)
+            return self._columns[sheet]
+
+    def get_range(self, sheet, keys, columns=None):
+        columns_all = self.get_columns(sheet)
+        keys = [str(key) for key in keys]
+        result = {}
+
+        # إعادة المحاولة مرة واحدة بفهرس جديد إذا تبين أن الفهرس قديم
+        for attempt in range(2):
+            index = self._loaded_index(sheet)
+            found = [(key, index.get(key)) for key in keys if index.get(key) is not None]
+            if not found:
+                break
+
+            ranges = [
+                absolute_range_name(sheet, f"{rowcol_to_a1(row, 1)}:{rowcol_to_a1(row, len(columns_all))}")
+                for key, row in found
+            ]
+            response = self.connection.get_spreadsheet().values_batch_get(ranges)
+
+            stale = []
+            for (key, row), value_range in zip(found, response.get('valueRanges', [])):
+                values = (value_range.get('values') or [[]])[0]
+                if not values or str(values[0]) != key:
+                    stale.append(key)
+                    continue
+                values = values + [''] * (len(columns_all) - len(values))
+                record = dict(zip(columns_all, numericise_all(values) if self.numericise else values))
+                result[key] = {column: record.get(column, '') for column in columns} if columns else record
+
+            if not stale:
+                break
+            index.invalidate()
+            keys = stale
+
+        return result
+
+    def get_projection(self, sheet, columns, rows=None):
+        """
+        قراءة الأعمدة المطلوبة فقط في طلب values_batch_get واحد،
+        بنطاق A1 لكل مجموعة أعمدة متتالية (مثل 'Available_Slots'!A2:A و C2:C)
+        عدد الصفوف هو أطول عمود مقروء، فالصفوف الفارغة في جميع الأعمدة المطلوبة
+        في نهاية الورقة لا تظهر
+        """
+        columns_all = self.get_columns(sheet)
+        selected = [column for column in dict.fromkeys(columns) if column in columns_all]
+        if not selected:
+            return pd.DataFrame()
+
+        start, stop = rows or (0, None)
+        first_row = start + 2
+        last_row = '' if stop is None else stop + 1
+        if stop is not None and stop <= start:
+            return pd.DataFrame(columns=selected)
+
+        positions = sorted(columns_all.index(column) + 1 for column in selected)
+        groups = _group_rows(positions)
+        ranges = [
+            absolute_range_name(sheet, f"{_column_letter(first)}{first_row}:{_column_letter(last)}{last_row}")
+            for first, last in groups
+        ]
+        response = self.connection.get_spreadsheet().values_batch_get(ranges)
+
+        read = {}
+        for (first, last), value_range in zip(groups, response.get('valueRanges', [])):
+            values = value_range.get('values', [])
+            for offset in range(last - first + 1):
+                read[first + offset] = [row[offset] if offset < len(row) else '' for row in values]
+
+        length = max((len(values) for values in read.values()), default=0)
+        data = {}
+        for column in selected:
+            values = read.get(columns_all.index(column) + 1, [])
+            values = values + [''] * (length - len(values))
+            data[column] = numericise_all(values) if self.numericise else values
+
+        return pd.DataFrame(data, columns=selected)
+
+    def _row_range(self, sheet, row, length):
+        return absolute_range_name(sheet, f"{rowcol_to_a1(row, 1)}:{rowcol_to_a1(row, max(length, 1))}")
+
+    def _check(self, updates, expect):
+        """
+        قراءة خلية المفتاح في كل صف سيحدث وصفوف الخلايا المتوقعة في طلب واحد
+        ترفع ConflictError إذا لم يتحقق شرط، وتعيد False إذا تبين أن أحد الفهارس قديم
+        """
+        checks = []
+        checked = set()
+        for (sheet, key), predicates in (expect or {}).items():
+            row = self._loaded_index(sheet).get(key)
+            checked.add((sheet, str(key)))
+            if row is not None:
+                columns = self.get_columns(sheet)
+                checks.append(('row', sheet, str(key), predicates, self._row_range(sheet, row, len(columns))))
+
+        # الصفوف التي ستحدث بدون شروط: يكفي التحقق من أنها ما زالت تحمل مفاتيحها
+        for sheet, key, values in updates:
+            if (sheet, str(key)) in checked:
+                continue
+            checked.add((sheet, str(key)))
+            row = self._loaded_index(sheet).get(key)
+            if row is not None:
+                checks.append(('row', sheet, str(key), {}, absolute_range_name(sheet, rowcol_to_a1(row, 1))))
+
+        if not checks:
+            return True
+
+        response = self.connection.get_spreadsheet().values_batch_get([check[-1] for check in checks])
+
+        for (kind, sheet, key, predicates, a1), value_range in zip(checks, response.get('valueRanges', [])):
+            values = (value_range.get('values') or [[]])[0]
+
+            # الصف لم يعد يحمل المفتاح المتوقع
+            if not values or str(values[0]) != key:
+                self._index(sheet).invalidate()
+                return False
+
+            record = dict(zip(self.get_columns(sheet), values))
+            for column, predicate in predicates.items():
+                if not predicate(record.get(column, '')):
+                    raise ConflictError(f"{sheet}!{key}.{column}")
+
+        return True
+
+    def batch_update(self, updates, appends=(), expect=None):
+        updates = list(updates)
+        appends = list(appends)
+
+        with self._lock:
+            # الفهرس قد يكون قديماً (حذف صف من خارج التطبيق مثلاً)، لذلك يتم التحقق قبل كل كتابة
+            # من مفاتيح الصفوف ومن الشروط في قراءة واحدة،
+            # وإذا كان الفهرس قديماً يعاد تحميله وتحديد الصفوف من جديد
+            for attempt in range(2):
+                if self._check(updates, expect):
+                    break
+            else:
+                raise StaleIndexError('row index changed during write')
+
+            # جميع التعديلات في طلب batchUpdate واحد: updateCells للخلايا و appendCells للصفوف الجديدة،
+            # فتحفظ القيم كنصوص كما هي (مثل الصفر في بداية رقم الهاتف) وتتسع الورقة عند الإضافة
+            requests = []
+            missing = []
+            for sheet, key, values in updates:
+                row = self._loaded_index(sheet).get(key)
+                if row is None:
+                    missing.append((sheet, key))
+                    continue
+                columns = self.get_columns(sheet)
+                sheet_id = self._worksheet(sheet).id
+                for column, value in values.items():
+                    if column in columns:
+                        requests.append({
+                            'updateCells': {
+                                'start': {'sheetId': sheet_id, 'rowIndex': row - 1,
+                                          'columnIndex': columns.index(column)},
+                                'rows': [{'values': [_cell_data(value)]}],
+                                'fields': 'userEnteredValue'
+                            }
+                        })
+
+            appended = {}
+            for sheet, values in appends:
+                appended.setdefault(sheet, []).append(list(values))
+            for sheet, rows in appended.items():
+                requests.append({
+                    'appendCells': {
+                        'sheetId': self._worksheet(sheet).id,
+                        'rows': [{'values': [_cell_data(value) for value in row]} for row in rows],
+                        'fields': 'userEnteredValue'
+                    }
+                })
+
+            if requests:
+                self.connection.get_spreadsheet().batch_update({'requests': requests})
+
+            for sheet, rows in appended.items():
+                for row in rows:
+                    self._index(sheet).on_append(row[0] if row else '')
+
+            return missing
+
+    def append_rows(self, sheet, rows):
+        rows = [list(row) for row in rows]
+        if not rows:
+            return
+        with self._lock:
+            self._worksheet(sheet).append_rows(rows, value_input_option='RAW')
+            for row in rows:
+                self._index(sheet).on_append(row[0] if row else '')
+
+    def replace_rows(self, sheet, delete_positions, rows):
+        worksheet = self._worksheet(sheet)
+        requests = []
+
+        # حذف الصفوف كنطاقات متتالية من الأسفل إلى الأعلى
+        for start_row, end_row in reversed(_group_rows([position + 2 for position in sorted(delete_positions)])):
+            requests.append({
+                'deleteDimension': {
+                    'range': {
+                        'sheetId': worksheet.id,
+                        'dimension': 'ROWS',
+                        'startIndex': start_row - 1,
+                        'endIndex': end_row
+                    }
+                }
+            })
+
+        # إضافة الصفوف الجديدة في نهاية الورقة
+        if rows:
+            requests.append({
+                'appendCells': {
+                    'sheetId': worksheet.id,
+                    'rows': [
+                        {'values': [_cell_data(value) for value in row]}
+                        for row in rows
+                    ],
+                    'fields': 'userEnteredValue'
+                }
+            })
+
+        if not requests:
+            return
+
+        with self._lock:
+            self.connection.get_spreadsheet().batch_update({'requests': requests})
+            # أرقام الصفوف تغيرت
+            self._index(sheet).invalidate()
+
+    def get_sheet_names(self):
+        return [worksheet.title for worksheet in self.connection.get_spreadsheet().worksheets()]
+
+    def create_sheet(self, sheet, columns):
+        columns = [str(column) for column in columns]
+        spreadsheet = self.connection.get_spreadsheet()
+        with self._lock:
+            spreadsheet.add_worksheet(title=sheet, rows=1000, cols=max(len(columns), 1))
+            spreadsheet.values_batch_update({
+                'valueInputOption': 'RAW',
+                'data': [{'range': absolute_range_name(sheet, 'A1'), 'values': [columns]}]
+            })
+            # الورقة الجديدة معروفة بالكامل، فلا حاجة لقراءة رؤوسها أو عمود المفتاح
+            self._loaded_values(sheet, [columns])
+
+    def probe(self):
+        """
+        وقت آخر تعديل لجدول البيانات، وإلا عدد الصفوف في عمود المفتاح لكل ورقة معروفة
+        """
+        try:
+            return self.connection.get_spreadsheet().get_lastUpdateTime()
+        except Exception:
+            with self._lock:
+                sheets = sorted(set(self._indexes) | set(self._columns))
+            return tuple(len(self._worksheet(sheet).col_values(1)) for sheet in sheets)
+
+    def invalidate(self, sheet=None):
+        with self._lock:
+            sheets = [sheet] if sheet is not None else list(self._indexes)
+            for name in sheets:
+                if name in self._indexes:
+                    self._indexes[name].invalidate()
+                self._columns.pop(name, None)
+
+
+class MemoryBackend(StorageBackend):
+    """
+    تخزين في الذاكرة للتطوير والاختبار دون ملف اعتماد
+    tables: قاموس {اسم الورقة: DataFrame}
+    """
+
+    name = 'memory'
+
+    def __init__(self, tables=None):
+        super().__init__()
+        self._lock = threading.RLock()
+        self._tables = {name: df.copy() for name, df in (tables or {}).items()}
+
+    def _table(self, sheet):
+        if sheet not in self._tables:
+            self._tables[sheet] = pd.DataFrame()
+        return self._tables[sheet]
+
+    def _mask(self, df, key):
+        if len(df.columns) == 0:
+            return pd.Series([False] * len(df), index=df.index, dtype=bool)
+        return df.iloc[:, 0].astype(str) == str(key)
+
+    def _first_row(self, df, key):
+        """
+        عنوان أول صف يحمل المفتاح أو None، فالمفتاح المكرر يعامل كما في فهرس صفوف Google Sheets
+        """
+        labels = df.index[self._mask(df, key).to_numpy()]
+        return labels[0] if len(labels) else None
+
+    def get_rows(self, sheet):
+        with self._lock:
+            return self._table(sheet).copy()
+
+    def get_columns(self, sheet):
+        with self._lock:
+            return list(self._table(sheet).columns)
+
+    def get_range(self, sheet, keys, columns=None):
+        with self._lock:
+            df = self._table(sheet)
+            result = {}
+            for key in keys:
+                row = self._first_row(df, key)
+                if row is None:
+                    continue
+                record = df.loc[row].to_dict()
+                result[str(key)] = {column: record.get(column, '') for column in columns} if columns else record
+            return result
+
+    def get_projection(self, sheet, columns, rows=None):
+        with self._lock:
+            df = self._table(sheet)
+            start, stop = rows or (0, None)
+            return df[[column for column in columns if column in df.columns]].iloc[start:stop].reset_index(drop=True)
+
+    def _append(self, sheet, rows):
+        df = self._table(sheet)
+        columns = list(df.columns)
+        new_rows = pd.DataFrame(
+            [list(row)[:len(columns)] + [''] * (len(columns) - len(row)) for row in rows],
+            columns=columns
+        )
+        self._tables[sheet] = pd.concat([df, new_rows], ignore_index=True)
+
+    def append_rows(self, sheet, rows):
+        rows = list(rows)
+        if rows:
+            with self._lock:
+                self._append(sheet, rows)
+
+    def batch_update(self, updates, appends=(), expect=None):
+        with self._lock:
+            for (sheet, key), predicates in (expect or {}).items():
+                df = self._table(sheet)
+                row = self._first_row(df, key)
+                if row is None:
+                    continue
+                for column, predicate in predicates.items():
+                    if not predicate(df.loc[row].get(column, '')):
+                        raise ConflictError(f"{sheet}!{key}.{column}")
+
+            missing = []
+            for sheet, key, values in updates:
+                df = self._table(sheet)
+                row = self._first_row(df, key)
+                if row is None:
+                    missing.append((sheet, key))
+                    continue
+                for column, value in values.items():
+                    if column in df.columns:
+                        df.loc[row, column] = value
+
+            for sheet, values in appends:
+                self._append(sheet, [values])
+
+            return missing
+
+    def replace_rows(self, sheet, delete_positions, rows):
+        with self._lock:
+            df = self._table(sheet)
+            self._tables[sheet] = df.drop(index=df.index[list(delete_positions)]).reset_index(drop=True)
+            if rows:
+                self._append(sheet, rows)
+
+    def get_sheet_names(self):
+        with self._lock:
+            return [name for name, df in self._tables.items() if len(df.columns) > 0]
+
+    def create_sheet(self, sheet, columns):
+        with self._lock:
+            self._tables[sheet] = pd.DataFrame(columns=list(columns))
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    القراءة والكتابة في نسخة محلية SQLite للأوراق المحددة، مع إرسال التعديلات
+    إلى Google Sheets في الخلفية عبر الصندوق الصادر ومطابقة التعديلات الخارجية.
+    الأوراق الأخرى تُقرأ وتُكتب مباشرة في المصدر البعيد.
+    """
+
+    name = 'sqlite'
+    batch_reads = True
+
+    def __init__(self, mirror, remote, sheets):
+        super().__init__()
+        self.mirror = mirror
+        self.remote = remote
+        self.sheets = tuple(sheets)
+
+        self._last_pull_signal = None
+
+        # استيراد الأوراق عند أول استخدام للنسخة المحلية
+        for sheet in self.sheets:
+            if not mirror.has_sheet(sheet):
+                values = remote.get_values(sheet)
+                mirror.replace_rows(sheet, values[0] if values else [], values[1:])
+
+        self.worker = WriteBehindWorker(mirror, self._flush, self._pull)
+
+    def _is_local(self, sheet):
+        return sheet in self.sheets
+
+    def get_rows(self, sheet):
+        if self._is_local(sheet):
+            return self.mirror.get_rows(sheet)
+        return self.remote.get_rows(sheet)
+
+    def get_many(self, sheets):
+        """
+        الأوراق المحلية من النسخة المحلية، والباقي في طلب واحد من المصدر البعيد
+        """
+        remote = [sheet for sheet in sheets if not self._is_local(sheet)]
+        frames = self.remote.get_many(remote) if remote else {}
+        return {sheet: self.mirror.get_rows(sheet) if self._is_local(sheet) else frames[sheet] for sheet in sheets}
+
+    def get_columns(self, sheet):
+        if self._is_local(sheet):
+            return self.mirror.get_columns(sheet) or []
+        return self.remote.get_columns(sheet)
+
+    def get_range(self, sheet, keys, columns=None):
+        if not self._is_local(sheet):
+            return self.remote.get_range(sheet, keys, columns)
+
+        columns_all = self.get_columns(sheet)
+        result = {}
+        for key, values in self.mirror.get_records(sheet, keys).items():
+            record = dict(zip(columns_all, values + [''] * (len(columns_all) - len(values))))
+            result[key] = {column: record.get(column, '') for column in columns} if columns else record
+        return result
+
+    def get_projection(self, sheet, columns, rows=None):
+        if not self._is_local(sheet):
+            return self.remote.get_projection(sheet, columns, rows)
+        return super().get_projection(sheet, columns, rows)
+
+    def append_rows(self, sheet, rows):
+        self.batch_update([], [(sheet, row) for row in rows])
+
+    def batch_update(self, updates, appends=(), expect=None):
+        updates = list(updates)
+        appends = list(appends)
+
+        # التعديلات على الأوراق غير المنسوخة ترسل مباشرة
+        remote_updates = [update for update in updates if not self._is_local(update[0])]
+        remote_appends = [append for append in appends if not self._is_local(append[0])]
+        remote_expect = {key: value for key, value in (expect or {}).items() if not self._is_local(key[0])}
+        missing = []
+        if remote_updates or remote_appends:
+            missing += self.remote.batch_update(remote_updates, remote_appends, remote_expect or None)
+
+        operations = [('append', sheet, values) for sheet, values in appends if self._is_local(sheet)]
+        operations += [('update', sheet, key, values) for sheet, key, values in updates if self._is_local(sheet)]
+        local_expect = {key: value for key, value in (expect or {}).items() if self._is_local(key[0])}
+        if operations:
+            try:
+                missing += self.mirror.apply(operations, local_expect or None)
+            except ExpectationFailed as e:
+                raise ConflictError(str(e))
+            self.worker.notify()
+
+        return missing
+
+    def replace_rows(self, sheet, delete_positions, rows):
+        self.remote.replace_rows(sheet, delete_positions, rows)
+        if self._is_local(sheet):
+            self._pull(force=True)
+
+    def get_sheet_names(self):
+        return self.remote.get_sheet_names()
+
+    def create_sheet(self, sheet, columns):
+        self.remote.create_sheet(sheet, columns)
+
+    def _flush(self, entries):
+        """
+        إرسال دفعة من تعديلات الصندوق الصادر إلى المصدر البعيد في طلب واحد
+        تحديثات الصفوف المضافة في نفس الدفعة تُدمج في قيم الإضافة
+        """
+        appends = {}
+        updates = {}
+        for entry in entries:
+            sheet, key = entry['sheet'], entry['key']
+            if entry['op'] == 'append':
+                appends[(sheet, key)] = list(entry['payload'])
+            elif (sheet, key) in appends:
+                columns = self.mirror.get_columns(sheet) or []
+                values = appends[(sheet, key)]
+                values += [''] * (len(columns) - len(values))
+                for column, value in entry['payload'].items():
+                    if column in columns:
+                        values[columns.index(column)] = value
+            else:
+                updates.setdefault((sheet, key), {}).update(entry['payload'])
+
+        # الإضافة قد تكون أُرسلت قبل توقف العملية دون تأكيدها
+        by_sheet = {}
+        for sheet, key in appends:
+            by_sheet.setdefault(sheet, []).append(key)
+        for sheet, keys in by_sheet.items():
+            for key in self.remote.get_range(sheet, keys):
+                appends.pop((sheet, key), None)
+
+        # الصفوف المحذوفة مباشرة من الورقة تتم مطابقتها في السحب التالي
+        self.remote.batch_update(
+            [(sheet, key, values) for (sheet, key), values in updates.items()],
+            [(sheet, values) for (sheet, key), values in appends.items()]
+        )
+
+    def _pull(self, force=False):
+        """
+        مطابقة النسخة المحلية مع الأوراق عند تغير إشارة جدول البيانات
+        تعيد قائمة أسماء الأوراق التي تغيرت
+        """
+        signal = self.remote.probe()
+        if not force and signal is not None and signal == self._last_pull_signal:
+            return []
+
+        changed = []
+        complete = True
+        for sheet in self.sheets:
+            values = self.remote.get_values(sheet)
+            result = self.mirror.reconcile(sheet, values[0] if values else [], values[1:])
+
+            # للورقة تعديلات محلية معلقة، فتتم مطابقتها بعد إرسالها
+            if result is None:
+                complete = False
+            elif result:
+                changed.append(sheet)
+
+        if complete:
+            self._last_pull_signal = signal
+
+        self._notify(changed)
+        return changed
+
+    def sync(self):
+        self.worker.run_once()
+        self._pull(force=True)
+
+    def refresh(self):
+        self.worker.run_once()
+        return self.worker.last_pull or []
+
+    def start(self):
+        self.worker.start()
+
+    def get_stats(self):
+        return dict(self.worker.get_stats(), backend=self.name)
+
+
+# حرف العمود في ترميز A1
+def _column_letter(col):
+    """
+    تحويل رقم عمود (بدءاً من 1) إلى حروفه، مثل 1 -> A و 27 -> AA
+    """
+    return rowcol_to_a1(1, col)[:-1]
+
+
+# تجميع أرقام الصفوف (أو الأعمدة) في نطاقات متتالية
+def _group_rows(rows):
+    """
+    تحويل قائمة أرقام صفوف أو أعمدة مرتبة إلى قائمة نطاقات (البداية، النهاية)
+    """
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
@@ -0,0 +1,87 @@
+"""
+إعداد الاختبارات: طبقة البيانات على خدمة fake_sheets المحلية ببيانات اصطناعية صغيرة
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+# لا حصص ولا تحديث في الخلفية أثناء الاختبار
+config.SHEETS_READ_QUOTA = 10 ** 9
+config.SHEETS_WRITE_QUOTA = 10 ** 9
+config.SHEETS_REFRESH_INTERVAL = 10 ** 6
+
+import sheets_api
+from benchmarks.datasets import generate_tables
+from fake_sheets import FakeSheetsService, frame_to_values
+from sheets_integration import SPREADSHEET_NAME as APPOINTMENTS_SPREADSHEET, SheetsIntegration
+from storage_backends import GSpreadBackend
+
+
+class FakeSheets:
+    """
+    الخدمة المحلية ومصدر التخزين المستخدمان في اختبار واحد
+    """
+
+    def __init__(self, service, backend, tables):
+        self.service = service
+        self.backend = backend
+        self.tables = tables
+        self.spreadsheet = service._spreadsheets[sheets_api.SPREADSHEET_NAME]
+
+    def values(self, sheet):
+        """
+        قيم الورقة كما هي مخزنة في الخدمة (صف الرؤوس أولاً)
+        """
+        return self.spreadsheet._find(sheet).values
+
+    def row(self, sheet, key):
+        for row in self.values(sheet)[1:]:
+            if row and row[0] == str(key):
+                return dict(zip(self.values(sheet)[0], row))
+        return None
+
+    def api_calls(self):
+        return self.service.get_stats()['total_calls']
+
+
+@pytest.fixture
+def fake_sheets():
+    tables = generate_tables(200, seed=7)
+    tables.pop('Appointments')
+
+    service = FakeSheetsService(latency=0, seed=7)
+    service.quotas = {'read': None, 'write': None}
+    with contextlib.redirect_stdout(io.StringIO()):
+        connection = sheets_api.create_fake_connection(service, tables)
+        backend = GSpreadBackend(connection)
+        sheets_api.set_backend(backend)
+
+    yield FakeSheets(service, backend, tables)
+
+    sheets_api.invalidate_cache()
+
+
+@pytest.fixture
+def integration():
+    """
+    SheetsIntegration على ورقة مواعيد في خدمة fake_sheets
+    """
+    appointments = generate_tables(200, seed=7)['Appointments']
+
+    service = FakeSheetsService(latency=0, seed=7)
+    service.quotas = {'read': None, 'write': None}
+    service.create_spreadsheet(APPOINTMENTS_SPREADSHEET, {'Appointments': frame_to_values(appointments)})
+    with contextlib.redirect_stdout(io.StringIO()):
+        integration = SheetsIntegration(None, client_factory=service.client)
+    integration.refresher.stop()
+    integration.service = service
+
+    yield integration
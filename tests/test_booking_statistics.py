@@ -0,0 +1,35 @@
+"""
+اختبارات BookingStatistics
+"""
+
+import pandas as pd
+
+from booking_statistics import BookingStatistics
+
+
+def _bookings(statuses):
+    return pd.DataFrame({
+        'status': statuses,
+        'booking_date': ['2030-01-05'] * len(statuses),
+        'company_name': ['شركة'] * len(statuses)
+    })
+
+
+def test_unversioned_data_is_always_recomputed():
+    statistics = BookingStatistics()
+
+    assert statistics.get(None, _bookings([]))['total_bookings'] == 0
+
+    result = statistics.get(None, _bookings(['مؤكد', 'ملغي']))
+    assert result['total_bookings'] == 2
+    assert result['confirmed_bookings'] == 1
+    assert result['cancelled_bookings'] == 1
+
+
+def test_same_version_is_not_recomputed():
+    statistics = BookingStatistics()
+
+    statistics.get(1, _bookings(['مؤكد']))
+
+    assert statistics.get(1, _bookings(['مؤكد', 'مؤكد']))['total_bookings'] == 1
+    assert statistics.get(2, _bookings(['مؤكد', 'مؤكد']))['total_bookings'] == 2
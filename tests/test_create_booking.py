@@ -0,0 +1,118 @@
+"""
+اختبارات إنشاء الحجز على خدمة fake_sheets
+"""
+
+import time
+
+import pytest
+
+import sheets_api
+from storage_backends import MemoryBackend
+
+
+def _free_date(fake_sheets):
+    slots = fake_sheets.tables['Available_Slots']
+    today = time.strftime('%Y-%m-%d')
+    return slots[(slots['is_available'] == 'TRUE') & (slots['date'] >= today)]['date'].iloc[0]
+
+
+def _booking(date):
+    return {
+        'company_name': 'شركة الاختبار', 'area_name': 'الرياض', 'project_name': 'مشروع الاختبار',
+        'company_representative': 'ممثل', 'contact_info': '0501234567',
+        'booking_date': date, 'booking_time': '12:00 - 12:30'
+    }
+
+
+def test_create_booking_past_grid_keeps_values_as_written(fake_sheets):
+    date = _free_date(fake_sheets)
+    bookings = fake_sheets.spreadsheet._find('Bookings')
+    sheets_api.get_all_bookings()
+
+    # الورقة ممتلئة حتى آخر صف في الشبكة
+    bookings.row_count = len(bookings.values)
+
+    booking_id = sheets_api.create_booking(_booking(date))
+
+    assert booking_id
+    row = fake_sheets.row('Bookings', booking_id)
+    assert row['contact_info'] == '0501234567'
+    assert row['booking_date'] == date
+    assert fake_sheets.row('Available_Slots', date)['is_available'] == 'FALSE'
+
+
+def test_create_booking_on_slot_taken_elsewhere_writes_nothing(fake_sheets):
+    date = _free_date(fake_sheets)
+    sheets_api.get_available_slots()
+    sheets_api.get_all_bookings()
+
+    # الموعد حُجز من خارج التطبيق بعد تحميل اللقطة
+    slots = fake_sheets.values('Available_Slots')
+    column = slots[0].index('is_available')
+    next(row for row in slots if row[0] == date)[column] = 'FALSE'
+    bookings_before = [list(row) for row in fake_sheets.values('Bookings')]
+    slots_before = [list(row) for row in slots]
+
+    assert sheets_api.create_booking(_booking(date)) is None
+
+    assert 'batch_update' not in fake_sheets.service.get_stats()['calls']
+    assert fake_sheets.values('Bookings') == bookings_before
+    assert fake_sheets.values('Available_Slots') == slots_before
+
+    # اللقطة تعرف الآن أن الموعد محجوز، فيرفض الطلب التالي دون أي استدعاء
+    calls = fake_sheets.api_calls()
+    assert sheets_api.create_booking(_booking(date)) is None
+    assert fake_sheets.api_calls() == calls
+
+
+def test_create_booking_on_stale_index_does_not_mark_slot_taken(fake_sheets, monkeypatch):
+    date = _free_date(fake_sheets)
+    sheets_api.get_available_slots()
+    sheets_api.get_all_bookings()
+
+    # الفهرس يبقى قديماً بعد إعادة التحميل (الورقة تتغير أثناء الكتابة)
+    monkeypatch.setattr(fake_sheets.backend, '_check', lambda updates, expect: False)
+
+    with pytest.raises(Exception, match='row index changed'):
+        sheets_api.create_booking(_booking(date))
+
+    assert fake_sheets.row('Available_Slots', date)['is_available'] == 'TRUE'
+    monkeypatch.undo()
+    assert sheets_api.create_booking(_booking(date))
+
+
+def _form_data(date):
+    """
+    بيانات النموذج كما ترسلها صفحة الحجز (booking.py)
+    """
+    return {
+        "company_name": 'شركة الاختبار', "area_name": 'الرياض', "project_name": 'مشروع الاختبار',
+        "representative_name": 'ممثل', "contact_email": 'rep@example.com', "contact_phone": '0501234567',
+        "booking_date": date, "booking_time": '12:00 - 12:30', "notes": 'ملاحظة'
+    }
+
+
+def test_create_booking_from_page_form_in_memory_mode():
+    tables = sheets_api.create_temp_credentials()
+    sheets_api.set_backend(MemoryBackend(tables))
+    date = tables['Available_Slots']['date'].iloc[0]
+
+    booking_id = sheets_api.create_booking(_form_data(date))
+
+    booking = sheets_api.get_booking_by_id(booking_id)
+    assert booking['company_representative'] == 'ممثل'
+    assert booking['contact_info'] == 'rep@example.com / 0501234567'
+    assert booking['notes'] == 'ملاحظة'
+    assert booking['status'] == 'مؤكد'
+    sheets_api.invalidate_cache()
+
+
+def test_create_booking_from_page_form_fills_sheet_columns(fake_sheets):
+    date = _free_date(fake_sheets)
+
+    booking_id = sheets_api.create_booking(_form_data(date))
+
+    row = fake_sheets.row('Bookings', booking_id)
+    assert row['company_representative'] == 'ممثل'
+    assert row['contact_info'] == 'rep@example.com / 0501234567'
+    assert row['booking_date'] == date
@@ -0,0 +1,37 @@
+"""
+اختبارات كتابة GSpreadBackend على خدمة fake_sheets
+"""
+
+import sheets_api
+
+
+def test_cancel_after_row_deleted_under_warm_index(fake_sheets):
+    bookings = fake_sheets.values('Bookings')
+    deleted_id, target_id, neighbour_id = bookings[10][0], bookings[11][0], bookings[12][0]
+
+    # تحميل الحجوزات يبني فهرس الصفوف
+    sheets_api.get_all_bookings()
+    assert fake_sheets.backend._index('Bookings').get(target_id) == 12
+
+    # حذف صف من خارج التطبيق فتنتقل الصفوف التالية إلى الأعلى
+    fake_sheets.spreadsheet._find('Bookings').values.pop(10)
+    neighbour_before = fake_sheets.row('Bookings', neighbour_id)
+
+    assert sheets_api.cancel_booking(target_id, 'test')
+
+    assert fake_sheets.row('Bookings', deleted_id) is None
+    assert fake_sheets.row('Bookings', target_id)['status'] == 'ملغي'
+    assert fake_sheets.row('Bookings', target_id)['notes'] == 'test'
+    assert fake_sheets.row('Bookings', neighbour_id) == neighbour_before
+
+
+def test_update_of_row_deleted_under_warm_index_writes_nothing(fake_sheets):
+    bookings = fake_sheets.values('Bookings')
+    target_id = bookings[5][0]
+
+    sheets_api.get_all_bookings()
+    fake_sheets.spreadsheet._find('Bookings').values.pop(5)
+    before = [list(row) for row in fake_sheets.values('Bookings')]
+
+    assert sheets_api.update_booking(target_id, {'notes': 'test'}) is False
+    assert fake_sheets.values('Bookings') == before
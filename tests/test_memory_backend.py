@@ -0,0 +1,33 @@
+"""
+اختبارات MemoryBackend: نفس عقد GSpreadBackend للمفاتيح المكررة
+"""
+
+import pandas as pd
+import pytest
+
+from storage_backends import ConflictError, MemoryBackend
+
+
+def _backend():
+    return MemoryBackend({'Sheet': pd.DataFrame({
+        'key': ['a', 'b', 'a'],
+        'value': ['1', '2', '3']
+    })})
+
+
+def test_update_changes_only_first_row_with_key():
+    backend = _backend()
+
+    assert backend.batch_update([('Sheet', 'a', {'value': 'x'})]) == []
+
+    assert backend.get_rows('Sheet')['value'].tolist() == ['x', '2', '3']
+
+
+def test_expect_checks_only_first_row_with_key():
+    backend = _backend()
+
+    backend.batch_update([('Sheet', 'a', {'value': 'y'})], expect={('Sheet', 'a'): {'value': lambda v: v == '1'}})
+    with pytest.raises(ConflictError):
+        backend.batch_update([], expect={('Sheet', 'a'): {'value': lambda v: v == '3'}})
+
+    assert backend.get_rows('Sheet')['value'].tolist() == ['y', '2', '3']
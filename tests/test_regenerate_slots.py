@@ -0,0 +1,69 @@
+"""
+اختبارات إعادة توليد المواعيد المتاحة على خدمة fake_sheets
+"""
+
+import time
+
+import sheets_api
+import utils
+
+
+def _slot_rows(fake_sheets):
+    values = fake_sheets.values('Available_Slots')
+    return {row[0]: dict(zip(values[0], row)) for row in values[1:]}
+
+
+def test_regenerate_writes_only_changed_rows(fake_sheets):
+    today = time.strftime('%Y-%m-%d')
+    before = _slot_rows(fake_sheets)
+    target = set(utils.get_available_dates(None, sheets_api.get_app_settings()))
+
+    assert sheets_api.regenerate_available_slots()
+
+    after = _slot_rows(fake_sheets)
+    writes = fake_sheets.service.get_stats()['calls']
+
+    # الحذف والإضافة في طلب واحد، دون إعادة كتابة الورقة
+    assert writes.get('batch_update') == 1
+    assert 'clear' not in writes and 'values_batch_update' not in writes
+
+    # المواعيد الموجودة في النطاق تبقى كما هي بحالتها
+    for date in target & set(before):
+        assert after[date] == before[date]
+
+    # المواعيد المستقبلية المحجوزة تبقى حتى لو خرجت من النطاق
+    for date, row in before.items():
+        if date >= today and row['is_available'] == 'FALSE':
+            assert after[date] == row
+
+    # المواعيد الماضية والمتاحة خارج النطاق تحذف، والمواعيد الناقصة تضاف متاحة
+    assert all(date >= today for date in after)
+    assert target <= set(after)
+    for date in target - set(before):
+        assert after[date]['is_available'] == 'TRUE'
+
+
+def test_regenerate_again_writes_nothing(fake_sheets):
+    sheets_api.regenerate_available_slots()
+    rows = _slot_rows(fake_sheets)
+    fake_sheets.service.reset_stats()
+
+    assert sheets_api.regenerate_available_slots()
+
+    calls = fake_sheets.service.get_stats()['calls']
+    assert 'batch_update' not in calls
+    assert _slot_rows(fake_sheets) == rows
+
+
+def test_regenerate_writes_booking_time_in_slot_format(fake_sheets):
+    # ورقة إعدادات منشأة بسكربت الإعداد القديم تكتب الوقت دون مسافات
+    settings = fake_sheets.values('Settings')
+    next(row for row in settings if row[0] == 'booking_time')[1] = '12:00-12:30'
+    before = _slot_rows(fake_sheets)
+
+    assert sheets_api.get_app_settings().booking_time == '12:00 - 12:30'
+    assert sheets_api.regenerate_available_slots()
+
+    added = [row for date, row in _slot_rows(fake_sheets).items() if date not in before]
+    assert added
+    assert {row['time'] for row in added} == {'12:00 - 12:30'}
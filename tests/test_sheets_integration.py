@@ -0,0 +1,56 @@
+"""
+اختبارات SheetsIntegration على خدمة fake_sheets
+"""
+
+import contextlib
+import io
+from datetime import datetime
+
+from sheets_integration import SheetsIntegration
+
+
+def test_add_appointment_keeps_values_as_written(integration):
+    assert integration.add_appointment('شركة الاختبار', 'مشروع الاختبار', 'الرياض',
+                                       '2030-01-05', '12:00', 'ممثل')
+
+    worksheet = integration.service._spreadsheets[integration.sheet.title]._find('Appointments')
+    header, row = worksheet.values[0], worksheet.values[-1]
+    record = dict(zip(header, row))
+
+    assert record['Presentation Date'] == '2030-01-05'
+    datetime.strptime(record['Created At'], '%Y-%m-%d %H:%M:%S')
+    datetime.strptime(record['Updated At'], '%Y-%m-%d %H:%M:%S')
+
+    appointment = integration.get_appointment_by_id(record['ID'])
+    assert appointment is not None
+    assert str(appointment['Presentation Date'])[:10] == '2030-01-05'
+
+
+def test_app_settings_default_without_settings_sheet(integration):
+    settings = integration.get_app_settings()
+
+    assert settings.booking_days == ('Saturday', 'Tuesday')
+
+
+def test_app_settings_read_from_own_spreadsheet(integration):
+    spreadsheet = integration.service._spreadsheets[integration.sheet.title]
+    spreadsheet._add('Settings').values = [['key', 'value'], ['booking_days', 'Sunday, Wednesday']]
+
+    settings = integration.get_app_settings()
+
+    assert settings.booking_days == ('Sunday', 'Wednesday')
+    assert settings.booking_days_ar == ('الأحد', 'الأربعاء')
+    assert integration.get_app_settings() is settings
+
+
+def test_dummy_sample_appointments_have_unique_ids():
+    with contextlib.redirect_stdout(io.StringIO()):
+        integration = SheetsIntegration(None)
+    appointments = integration.get_all_appointments()
+    first_id = appointments['ID'].iloc[0]
+
+    assert appointments['ID'].is_unique
+    assert integration.update_appointment(first_id, status='Cancelled')
+
+    statuses = integration.get_all_appointments()['Status'].astype(str)
+    assert (statuses == 'Cancelled').sum() == (appointments['Status'].astype(str) == 'Cancelled').sum() + 1
@@ -0,0 +1,56 @@
+"""
+اختبارات إعادة المحاولة في sheets_scheduler على خدمة fake_sheets
+"""
+
+import pytest
+from gspread.exceptions import APIError
+
+from fake_sheets import FakeSheetsService
+from sheets_scheduler import RequestScheduler, ScheduledSpreadsheet
+
+
+@pytest.fixture
+def spreadsheet():
+    service = FakeSheetsService(latency=0)
+    service.quotas = {'read': None, 'write': None}
+    service.create_spreadsheet('Test', {'Sheet1': [['key', 'value'], ['a', '1']]})
+    scheduler = RequestScheduler(10 ** 6, 10 ** 6, max_retries=3, backoff_base=0)
+    return ScheduledSpreadsheet(service.client().open('Test'), scheduler), service
+
+
+def _append(spreadsheet, key):
+    return spreadsheet.batch_update({'requests': [{'appendCells': {
+        'sheetId': spreadsheet.worksheet('Sheet1').id,
+        'rows': [{'values': [{'userEnteredValue': {'stringValue': key}}]}],
+        'fields': 'userEnteredValue'
+    }}]})
+
+
+def test_append_is_not_retried_on_server_error(spreadsheet):
+    spreadsheet, service = spreadsheet
+    service.inject_error(503, methods={'batch_update'})
+
+    with pytest.raises(APIError):
+        _append(spreadsheet, 'b')
+
+    assert service.get_stats()['calls']['batch_update'] == 1
+
+
+def test_append_is_retried_on_quota_error(spreadsheet):
+    spreadsheet, service = spreadsheet
+    service.inject_error(429, methods={'batch_update'})
+
+    _append(spreadsheet, 'b')
+
+    assert service.get_stats()['calls']['batch_update'] == 2
+    assert [row[0] for row in service._spreadsheets['Test']._find('Sheet1').values] == ['key', 'a', 'b']
+
+
+def test_cell_update_is_retried_on_server_error(spreadsheet):
+    spreadsheet, service = spreadsheet
+    service.inject_error(503, methods={'values_update'})
+
+    spreadsheet.values_update("'Sheet1'!B2", params={'valueInputOption': 'RAW'}, body={'values': [['2']]})
+
+    assert service.get_stats()['calls']['values_update'] == 2
+    assert service._spreadsheets['Test']._find('Sheet1').values[1] == ['a', '2']
@@ -0,0 +1,71 @@
+"""
+اختبارات تحديث الحجز على خدمة fake_sheets
+"""
+
+import sheets_api
+
+
+def _confirmed_booking(fake_sheets):
+    bookings = fake_sheets.tables['Bookings']
+    return bookings[bookings['status'] == 'مؤكد']['booking_id'].iloc[0]
+
+
+def test_update_booking_returns_api_calls_made(fake_sheets):
+    booking_id = _confirmed_booking(fake_sheets)
+    sheets_api.get_all_bookings()
+    before = fake_sheets.api_calls()
+
+    calls = sheets_api.update_booking(booking_id, {'notes': 'first'})
+
+    assert calls == fake_sheets.api_calls() - before
+    assert fake_sheets.service.get_stats()['calls']['batch_update'] == 1
+    assert fake_sheets.row('Bookings', booking_id)['notes'] == 'first'
+
+
+def test_update_booking_without_changes_makes_no_calls(fake_sheets):
+    booking_id = _confirmed_booking(fake_sheets)
+    sheets_api.get_all_bookings()
+    notes = sheets_api.get_booking_by_id(booking_id)['notes']
+    before = fake_sheets.api_calls()
+
+    calls = sheets_api.update_booking(booking_id, {'notes': notes})
+
+    assert calls == 0
+    assert calls is not False
+    assert fake_sheets.api_calls() == before
+
+
+def test_update_booking_of_unknown_booking_returns_false(fake_sheets):
+    sheets_api.get_all_bookings()
+
+    assert sheets_api.update_booking('BK-missing', {'notes': 'x'}) is False
+
+
+def test_reschedule_writes_booking_and_both_slots_in_one_request(fake_sheets):
+    booking_id = _confirmed_booking(fake_sheets)
+    booking = sheets_api.get_booking_by_id(booking_id)
+    slots = fake_sheets.tables['Available_Slots']
+    new_date = slots[slots['is_available'] == 'TRUE']['date'].iloc[0]
+    sheets_api.get_available_slots()
+
+    calls = sheets_api.update_booking(booking_id, {'booking_date': new_date})
+
+    assert calls is not False
+    assert fake_sheets.service.get_stats()['calls']['batch_update'] == 1
+    assert fake_sheets.row('Bookings', booking_id)['booking_date'] == new_date
+    assert fake_sheets.row('Available_Slots', booking['booking_date'])['is_available'] == 'TRUE'
+    assert fake_sheets.row('Available_Slots', new_date)['is_available'] == 'FALSE'
+
+
+def test_update_booking_leaves_snapshot_held_by_reader_unchanged(fake_sheets):
+    booking_id = _confirmed_booking(fake_sheets)
+    reader = sheets_api._bookings_snapshot()
+    before = reader.copy()
+
+    assert sheets_api.cancel_booking(booking_id, 'test')
+
+    # القارئ يحتفظ باللقطة القديمة كما هي، والقراءة التالية ترى التعديل
+    assert reader.equals(before)
+    assert list(reader['status'].cat.categories) == list(before['status'].cat.categories)
+    assert sheets_api._bookings_snapshot() is not reader
+    assert sheets_api.get_booking_by_id(booking_id)['status'] == 'ملغي'
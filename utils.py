@@ -2,6 +2,17 @@ import pandas as pd
 from datetime import datetime, timedelta
 import calendar
 
+from app_settings import AppSettings
+
+# قراءة قيمة تاريخ
+def _to_date(value):
+    """
+    التاريخ كنص بصيغة YYYY-MM-DD أو كقيمة تاريخ جاهزة (date أو Timestamp)
+    """
+    if hasattr(value, "strftime"):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d")
+
 # تنسيق التاريخ بالصيغة العربية
 def format_date(date_str):
     """
@@ -11,7 +22,7 @@ def format_date(date_str):
         return ""
     
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+        date_obj = _to_date(date_str)
         return date_obj.strftime("%d/%m/%Y")
     except:
         return date_str
@@ -25,7 +36,7 @@ def get_day_name(date_str):
         return ""
     
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+        date_obj = _to_date(date_str)
         day_name = date_obj.strftime("%A")
         
         # ترجمة اسم اليوم إلى العربية
@@ -44,10 +55,15 @@ def get_day_name(date_str):
         return ""
 
 # الحصول على التواريخ المتاحة للحجز
-def get_available_dates(weeks_ahead=8):
+def get_available_dates(weeks_ahead=None, settings=None):
     """
-    إنشاء قائمة بالتواريخ المتاحة للحجز (أيام السبت والثلاثاء) للأسابيع القادمة
+    إنشاء قائمة بالتواريخ المتاحة للحجز (أيام الحجز في الإعدادات) للأسابيع القادمة
+    settings: إعدادات AppSettings المحملة، وإلا القيم الافتراضية في config.py
     """
+    settings = settings or AppSettings()
+    if weeks_ahead is None:
+        weeks_ahead = settings.weeks_ahead
+    
     available_dates = []
     
     # تاريخ اليوم
@@ -57,16 +73,17 @@ def get_available_dates(weeks_ahead=8):
     for i in range(weeks_ahead * 7):
         date = today + timedelta(days=i)
         
-        # التحقق من أن اليوم هو السبت (5) أو الثلاثاء (1)
-        if date.weekday() == 5 or date.weekday() == 1:
+        # التحقق من أن اليوم من أيام الحجز
+        if settings.is_booking_day(date):
             available_dates.append(date.strftime("%Y-%m-%d"))
     
     return available_dates
 
 # التحقق من توفر تاريخ للحجز
-def is_date_available(date_str, available_dates, booked_dates):
+def is_date_available(date_str, available_dates, booked_dates=()):
     """
     التحقق مما إذا كان التاريخ متاحاً للحجز
+    يمكن تمرير فهرس AvailabilityIndex أو مجموعات (set) بدلاً من القوائم ليكون التحقق بزمن ثابت
     """
     # التحقق من أن التاريخ ضمن التواريخ المتاحة
     if date_str not in available_dates: